@@ -0,0 +1,154 @@
+from array import array
+from decimal import Decimal
+from heapq import merge
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.amounts import get_amount_minor, get_currency_code, to_decimal
+from src.logger_config import setup_logger
+from src.widget import ACCOUNT_TYPES, mask_account_card, split_account_card
+
+# Создание и получение именованного логгера
+accounts_logger = setup_logger(__name__)
+
+DIRECTIONS = ("in", "out", "both")
+
+
+def parse_account(value: Any) -> Optional[Tuple[str, str]]:
+    """
+    Выделяет тип и номер счета или карты из поля from/to (разбор как в widget.mask_account_card).
+
+    :param value: Строка вида 'Счет 75106830613657916952' или 'Visa Classic 6831982476737658'.
+    :return: Кортеж (тип, номер) или None, если поле пустое или номера в нем нет.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        account_type, number = split_account_card(value.strip())
+    except ValueError:
+        return None
+    return (account_type, number) if account_type and number else None
+
+
+def account_number(value: Any) -> str:
+    """
+    Приводит номер или строку с типом и номером к ключу индекса.
+
+    :param value: Номер ('75106830613657916952') или строка поля from/to.
+    :return: Номер счета или карты.
+    """
+    parsed = parse_account(value)
+    return parsed[1] if parsed else str(value).strip()
+
+
+class AccountIndex:
+    """
+    Индекс счетов и карт набора данных: поля from/to разбираются один раз, и каждому номеру соответствуют
+    позиции строк в array('I') отдельно для списаний и поступлений. Выписка и остаток по счету стоят
+    O(количество операций счета) вместо просмотра всех строк, а маскированная строка для показа
+    вычисляется один раз на счет.
+    """
+
+    def __init__(self, transactions: Sequence[Dict[str, Any]]) -> None:
+        self.rows = transactions
+        self.outgoing: Dict[str, array] = {}
+        self.incoming: Dict[str, array] = {}
+        self.labels: Dict[str, str] = {}
+        self._masked: Dict[str, str] = {}
+        unparsed = 0
+        for position, transaction in enumerate(transactions):
+            for field, positions in (("from", self.outgoing), ("to", self.incoming)):
+                value = transaction.get(field)
+                parsed = parse_account(value)
+                if parsed is None:
+                    unparsed += value is not None and value != ""
+                    continue
+                account_type, number = parsed
+                positions.setdefault(number, array("I")).append(position)
+                self.labels.setdefault(number, account_type)
+        accounts_logger.info(f"Indexed {len(self.labels)} accounts in {len(transactions)} rows "
+                             f"({unparsed} fields without a number)")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, account: object) -> bool:
+        return account_number(account) in self.labels
+
+    def accounts(self) -> List[str]:
+        """Номера всех счетов и карт индекса."""
+        return list(self.labels)
+
+    def is_account(self, account: str) -> bool:
+        """Признак банковского счета (а не карты)."""
+        return self.labels.get(account_number(account), "").lower() in ACCOUNT_TYPES
+
+    def masked(self, account: str) -> str:
+        """
+        Возвращает тип и маскированный номер счета или карты для показа.
+
+        :param account: Номер или строка поля from/to.
+        :return: Строка вида 'Счет **6952' или 'Visa Classic 6831 98** **** 7658'.
+        """
+        number = account_number(account)
+        masked = self._masked.get(number)
+        if masked is None:
+            if number not in self.labels:
+                raise KeyError(f"Unknown account: {account}")
+            masked = self._masked[number] = mask_account_card(f"{self.labels[number]} {number}")
+        return masked
+
+    def positions(self, account: str, direction: str = "both") -> Iterator[int]:
+        """
+        Возвращает позиции операций счета в порядке набора данных.
+
+        :param account: Номер или строка поля from/to.
+        :param direction: 'out' — списания, 'in' — поступления, 'both' — все операции счета.
+        :return: Итератор позиций строк.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction: {direction}")
+        number = account_number(account)
+        outgoing = self.outgoing.get(number, ()) if direction != "in" else ()
+        incoming = self.incoming.get(number, ()) if direction != "out" else ()
+        previous = -1
+        # Перевод между одинаковыми from и to попадает в оба массива, но выдается один раз
+        for position in merge(outgoing, incoming):
+            if position != previous:
+                yield position
+            previous = position
+
+    def statement(self, account: str, direction: str = "both", state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Возвращает выписку: операции счета в порядке набора данных.
+
+        :param account: Номер или строка поля from/to.
+        :param direction: 'out' — списания, 'in' — поступления, 'both' — все операции счета.
+        :param state: Статус операций (без учета регистра), None — все статусы.
+        :return: Список операций.
+        """
+        state = state.lower() if state else None
+        rows = self.rows
+        return [rows[position] for position in self.positions(account, direction)
+                if state is None or str(rows[position].get("state") or "").lower() == state]
+
+    def balance(self, account: str, state: Optional[str] = "EXECUTED") -> Dict[str, Decimal]:
+        """
+        Считает оборот счета по валютам: поступления минус списания.
+
+        :param account: Номер или строка поля from/to.
+        :param state: Статус учитываемых операций (по умолчанию только исполненные), None — все.
+        :return: Словарь {код валюты: сумма}.
+        """
+        number = account_number(account)
+        state = state.lower() if state else None
+        totals: Dict[str, int] = {}
+        for positions, sign in ((self.incoming.get(number, ()), 1), (self.outgoing.get(number, ()), -1)):
+            for position in positions:
+                transaction = self.rows[position]
+                if state is not None and str(transaction.get("state") or "").lower() != state:
+                    continue
+                amount_minor = get_amount_minor(transaction)
+                if amount_minor is not None:
+                    currency = get_currency_code(transaction)
+                    totals[currency] = totals.get(currency, 0) + sign * amount_minor
+        return {currency: to_decimal(total) for currency, total in totals.items()}
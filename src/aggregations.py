@@ -0,0 +1,184 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.amounts import _QUANTUM, MINOR_UNITS, get_amount_minor, get_currency_code, to_decimal
+
+GroupKey = Tuple[Any, ...]
+
+
+def _state(transaction: Dict[str, Any]) -> Optional[str]:
+    return transaction.get("state")
+
+
+def _currency(transaction: Dict[str, Any]) -> Optional[str]:
+    return get_currency_code(transaction) or None
+
+
+def _month(transaction: Dict[str, Any]) -> Optional[str]:
+    date = transaction.get("date")
+    return str(date)[:7] if date else None
+
+
+def _category(transaction: Dict[str, Any]) -> Optional[str]:
+    return transaction.get("description")
+
+
+# Поля, по которым можно группировать операции
+GROUP_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "state": _state,
+    "currency": _currency,
+    "month": _month,
+    "category": _category,
+}
+
+
+class GroupStats:
+    """Накопленные показатели одной группы операций. Суммы хранятся в минимальных единицах."""
+
+    __slots__ = ("count", "amount_count", "total_minor", "min_minor", "max_minor")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.amount_count = 0
+        self.total_minor = 0
+        self.min_minor: Optional[int] = None
+        self.max_minor: Optional[int] = None
+
+    def add(self, amount_minor: Optional[int]) -> None:
+        """Учитывает одну операцию; операции без корректной суммы учитываются только в count."""
+        self.count += 1
+        if amount_minor is None:
+            return
+        self.amount_count += 1
+        self.total_minor += amount_minor
+        if self.min_minor is None or amount_minor < self.min_minor:
+            self.min_minor = amount_minor
+        if self.max_minor is None or amount_minor > self.max_minor:
+            self.max_minor = amount_minor
+
+    def merge(self, other: "GroupStats") -> None:
+        """Добавляет показатели другой группы (например, посчитанной по другому файлу)."""
+        self.count += other.count
+        self.amount_count += other.amount_count
+        self.total_minor += other.total_minor
+        for value in (other.min_minor, other.max_minor):
+            if value is not None:
+                self.min_minor = value if self.min_minor is None else min(self.min_minor, value)
+                self.max_minor = value if self.max_minor is None else max(self.max_minor, value)
+
+    @property
+    def mean(self) -> Optional[Decimal]:
+        """Средняя сумма операции группы."""
+        if not self.amount_count:
+            return None
+        return (Decimal(self.total_minor) / self.amount_count / MINOR_UNITS).quantize(_QUANTUM, rounding=ROUND_HALF_UP)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает показатели группы.
+
+        :return: Словарь с ключами count, sum, min, max, mean (суммы в виде Decimal).
+        """
+        return {
+            "count": self.count,
+            "sum": to_decimal(self.total_minor),
+            "min": to_decimal(self.min_minor) if self.min_minor is not None else None,
+            "max": to_decimal(self.max_minor) if self.max_minor is not None else None,
+            "mean": self.mean,
+        }
+
+
+class Aggregator:
+    """
+    Группировка операций по хешу ключа с накоплением count, sum, min, max и mean.
+    Суммы разных валют не складываются: если currency нет среди ключей, она добавляется последним ключом.
+
+    Результат обновляется по мере поступления новых строк (update), поэтому загрузчики
+    могут передавать операции потоком, а повторный пересчет с нуля не нужен.
+    """
+
+    def __init__(self, keys: Sequence[str] = ("currency",), categories: Optional[Iterable[str]] = None) -> None:
+        """
+        :param keys: Поля группировки: любые из state, currency, month, category (currency добавляется всегда).
+        :param categories: Список категорий; если задан, категорией операции считается первая
+            категория, входящая в описание (как в utils.count_transactions_by_category).
+        """
+        unknown = [key for key in keys if key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown group keys: {', '.join(unknown)}")
+        self.keys = tuple(keys) if "currency" in keys else (*keys, "currency")
+        self.categories = list(categories) if categories is not None else None
+        self.groups: Dict[GroupKey, GroupStats] = {}
+        self.rows = 0
+        self._extractors = [self._categorize if key == "category" and self.categories is not None else GROUP_KEYS[key]
+                            for key in self.keys]
+
+    def _categorize(self, transaction: Dict[str, Any]) -> Optional[str]:
+        description = transaction.get("description") or ""
+        for category in self.categories or ():
+            if category in description:
+                return category
+        return None
+
+    def key_of(self, transaction: Dict[str, Any]) -> GroupKey:
+        """Возвращает ключ группы операции."""
+        return tuple(extract(transaction) for extract in self._extractors)
+
+    def add(self, transaction: Dict[str, Any]) -> None:
+        """Учитывает одну операцию."""
+        key = self.key_of(transaction)
+        stats = self.groups.get(key)
+        if stats is None:
+            stats = self.groups[key] = GroupStats()
+        stats.add(get_amount_minor(transaction))
+        self.rows += 1
+
+    def update(self, transactions: Iterable[Dict[str, Any]]) -> "Aggregator":
+        """
+        Учитывает новые операции, не пересчитывая уже накопленные.
+
+        :param transactions: Операции (список или итератор загрузчика).
+        :return: Этот же объект.
+        """
+        for transaction in transactions:
+            self.add(transaction)
+        return self
+
+    def merge(self, other: "Aggregator") -> "Aggregator":
+        """Объединяет результаты с агрегатором, посчитанным по тем же ключам."""
+        if other.keys != self.keys:
+            raise ValueError("Cannot merge aggregators with different keys")
+        for key, stats in other.groups.items():
+            self.groups.setdefault(key, GroupStats()).merge(stats)
+        self.rows += other.rows
+        return self
+
+    def result(self) -> Dict[GroupKey, Dict[str, Any]]:
+        """
+        Возвращает показатели групп, отсортированные по ключу.
+
+        :return: Словарь {кортеж значений ключей: показатели группы}.
+        """
+        return {key: self.groups[key].as_dict() for key in sorted(self.groups, key=_sort_key)}
+
+    def rows_as_dicts(self) -> List[Dict[str, Any]]:
+        """Возвращает результат в виде плоских записей: поля ключа и показатели."""
+        return [dict(zip(self.keys, key), **stats) for key, stats in self.result().items()]
+
+
+def _sort_key(key: GroupKey) -> Tuple[Tuple[bool, str], ...]:
+    # None и значения разных типов сортируются вместе без ошибок сравнения
+    return tuple((value is None, str(value)) for value in key)
+
+
+def group_by(transactions: Iterable[Dict[str, Any]], keys: Sequence[str] = ("currency",),
+             categories: Optional[Iterable[str]] = None) -> Dict[GroupKey, Dict[str, Any]]:
+    """
+    Группирует операции и считает количество, сумму, минимум, максимум и среднее по каждой группе.
+
+    :param transactions: Нормализованные транзакции.
+    :param keys: Поля группировки: state, currency, month, category (currency добавляется всегда).
+    :param categories: Список категорий для ключа category.
+    :return: Словарь {кортеж значений ключей: показатели группы}.
+    """
+    return Aggregator(keys, categories).update(transactions).result()
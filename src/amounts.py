@@ -0,0 +1,214 @@
+import re
+from array import array
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, cast
+
+# Суммы хранятся в минимальных единицах валюты (копейках, центах)
+MINOR_UNITS = 100
+_QUANTUM = Decimal("0.01")
+
+# Границы сумм в минимальных единицах: колонки сумм хранятся в array('q') (64-битные целые)
+MIN_AMOUNT_MINOR = -2 ** 63
+MAX_AMOUNT_MINOR = 2 ** 63 - 1
+
+_NOT_PARSED = object()
+_PLAIN_AMOUNT = re.compile(r"(-?)(\d+)(?:\.(\d{1,2}))?")
+
+
+def parse_amount_minor(value: Any) -> Optional[int]:
+    """
+    Переводит сумму из выгрузки в целое число копеек (центов) без потери точности.
+
+    :param value: Сумма: строка ("9824.07", "1 000,50"), число или Decimal.
+    :return: Сумма в минимальных единицах или None, если значение не является суммой ('Не указана', пусто),
+        не выражается целым числом копеек ("5.005") или не помещается в 64-битное целое ("1e30"):
+        такие суммы не округляются, а считаются некорректными.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        value_minor = value * MINOR_UNITS
+        return value_minor if MIN_AMOUNT_MINOR <= value_minor <= MAX_AMOUNT_MINOR else None
+    if type(value) is str:
+        return _parse_text(value)
+    if isinstance(value, float):
+        # repr дает кратчайшую запись числа, поэтому 0.1 превращается в Decimal("0.1"), а не в двоичный хвост
+        value = repr(value)
+    return _parse_text(str(value))
+
+
+@lru_cache(maxsize=65536)
+def _parse_text(value: str) -> Optional[int]:
+    # Результат кэшируется: в выгрузках одни и те же суммы повторяются, а словари операций их не хранят
+    match = _PLAIN_AMOUNT.fullmatch(value)
+    if match is not None:
+        # Обычная запись суммы ("9824.07", "-5", "0.5") разбирается без Decimal
+        sign, units, cents = match.groups()
+        plain_minor = int(units) * MINOR_UNITS + int((cents or "0").ljust(2, "0"))
+        plain_minor = -plain_minor if sign else plain_minor
+        return plain_minor if MIN_AMOUNT_MINOR <= plain_minor <= MAX_AMOUNT_MINOR else None
+    text = value.strip().replace(" ", "").replace(" ", "").replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return None
+    if not amount.is_finite():
+        return None
+    minor = amount * MINOR_UNITS
+    if minor != minor.to_integral_value() or not MIN_AMOUNT_MINOR <= minor <= MAX_AMOUNT_MINOR:
+        return None
+    return int(minor)
+
+
+def format_amount_minor(amount_minor: int) -> str:
+    """
+    Возвращает сумму в минимальных единицах в виде строки, как в JSON-выгрузке ("9824.07").
+
+    :param amount_minor: Сумма в минимальных единицах.
+    :return: Строка с суммой.
+    """
+    sign = "-" if amount_minor < 0 else ""
+    units, cents = divmod(abs(amount_minor), MINOR_UNITS)
+    return f"{sign}{units}.{cents:02d}"
+
+
+def to_decimal(amount_minor: int) -> Decimal:
+    """Переводит сумму в минимальных единицах в Decimal с двумя знаками после запятой."""
+    return (Decimal(amount_minor) / MINOR_UNITS).quantize(_QUANTUM)
+
+
+def get_amount_minor(transaction: Dict[str, Any]) -> Optional[int]:
+    """
+    Возвращает сумму операции в минимальных единицах: у записи records.Transaction — разобранную
+    при ее создании, у словаря — разбирая operationAmount.amount (сам словарь не изменяется).
+
+    :param transaction: Нормализованная транзакция.
+    :return: Сумма в минимальных единицах или None.
+    """
+    if type(transaction) is not dict:
+        amount_minor = getattr(transaction, "amount_minor", _NOT_PARSED)
+        if amount_minor is not _NOT_PARSED:
+            return cast(Optional[int], amount_minor)
+    operation_amount = transaction.get("operationAmount") or {}
+    return parse_amount_minor(operation_amount.get("amount"))
+
+
+def get_currency_code(transaction: Dict[str, Any]) -> str:
+    """Возвращает код валюты операции."""
+    operation_amount = transaction.get("operationAmount") or {}
+    return str((operation_amount.get("currency") or {}).get("code") or "")
+
+
+class AmountColumn:
+    """
+    Колонка сумм набора транзакций: целые числа в array('q') и маска корректных значений.
+
+    Некорректные суммы хранятся как 0 и исключаются из агрегатов по маске. Для каждой валюты
+    хранится отдельный массив, поэтому итоги по валютам считаются встроенным sum() без цикла по строкам.
+    """
+
+    def __init__(self, amounts: Iterable[Optional[int]], currencies: Iterable[str]) -> None:
+        self.values = array("q")
+        self.valid = bytearray()
+        self.currencies: List[str] = []
+        self._by_currency: Dict[str, array] = {}
+        for amount, currency in zip(amounts, currencies):
+            self.currencies.append(currency)
+            if amount is None:
+                self.values.append(0)
+                self.valid.append(0)
+                continue
+            self.values.append(amount)
+            self.valid.append(1)
+            column = self._by_currency.get(currency)
+            if column is None:
+                column = self._by_currency[currency] = array("q")
+            column.append(amount)
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict[str, Any]]) -> "AmountColumn":
+        """
+        Строит колонку сумм по списку транзакций.
+
+        :param transactions: Нормализованные транзакции.
+        :return: Колонка сумм.
+        """
+        pairs = [(get_amount_minor(transaction), get_currency_code(transaction)) for transaction in transactions]
+        return cls((amount for amount, _ in pairs), (currency for _, currency in pairs))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def invalid_count(self) -> int:
+        """Количество операций с некорректной суммой."""
+        return len(self.valid) - sum(self.valid)
+
+    def valid_values(self) -> Iterable[int]:
+        """Возвращает корректные суммы в минимальных единицах."""
+        return compress(self.values, self.valid)
+
+    def total_minor(self, currency: Optional[str] = None) -> int:
+        """
+        Сумма корректных значений в минимальных единицах (всех или одной валюты).
+
+        :param currency: Код валюты; если не задан, складываются все суммы.
+        :return: Сумма в минимальных единицах.
+        """
+        if currency is not None:
+            return sum(self._by_currency.get(currency, ()))
+        # Некорректные значения хранятся как 0, поэтому маска для суммы не нужна
+        return sum(self.values)
+
+    def count(self, currency: Optional[str] = None) -> int:
+        """Количество корректных сумм (всех или одной валюты)."""
+        if currency is not None:
+            return len(self._by_currency.get(currency, ()))
+        return sum(self.valid)
+
+    def total(self, currency: Optional[str] = None) -> Decimal:
+        """Точная сумма в виде Decimal."""
+        return to_decimal(self.total_minor(currency))
+
+    def mean(self, currency: Optional[str] = None) -> Optional[Decimal]:
+        """
+        Среднее значение корректных сумм с округлением до копеек.
+
+        :param currency: Код валюты; если не задан, учитываются все суммы.
+        :return: Среднее или None, если корректных сумм нет.
+        """
+        count = self.count(currency)
+        if not count:
+            return None
+        return (Decimal(self.total_minor(currency)) / count / MINOR_UNITS).quantize(_QUANTUM, rounding=ROUND_HALF_UP)
+
+    def totals_by_currency(self) -> Dict[str, Decimal]:
+        """
+        Итоги по каждой валюте.
+
+        :return: Словарь {код валюты: сумма}.
+        """
+        return {currency: to_decimal(sum(column)) for currency, column in self._by_currency.items()}
+
+
+def total_amount(transactions: Iterable[Dict[str, Any]], currency: Optional[str] = None) -> Decimal:
+    """
+    Точная сумма операций (всех или одной валюты).
+
+    :param transactions: Нормализованные транзакции.
+    :param currency: Код валюты.
+    :return: Сумма в виде Decimal.
+    """
+    return AmountColumn.from_transactions(transactions).total(currency)
+
+
+def totals_by_currency(transactions: Iterable[Dict[str, Any]]) -> Dict[str, Decimal]:
+    """
+    Точные итоги операций по валютам.
+
+    :param transactions: Нормализованные транзакции.
+    :return: Словарь {код валюты: сумма}.
+    """
+    return AmountColumn.from_transactions(transactions).totals_by_currency()
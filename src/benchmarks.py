@@ -0,0 +1,310 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src import aggregations, amounts, exporters, index, loaders, main, processing, scan, utils, widget
+from src.memprofile import profile
+from src.synthetic import write_dataset
+
+DEFAULT_THRESHOLD = 0.25
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Библиотеки, которые не должны импортироваться при обработке JSON (нужны только для XLSX и API курсов)
+HEAVY_MODULES = ("pandas", "openpyxl", "requests", "dotenv")
+# Бюджет времени импорта при запуске python -m src.main для JSON-файла (без site — запуска интерпретатора)
+DEFAULT_STARTUP_BUDGET_MS = 100.0
+
+
+class Dataset:
+    """
+    Синтетические файлы одного размера во всех форматах и загруженные из них операции.
+    Файлы, которые создают замеры выгрузки, пишутся в output_dir (по умолчанию data_dir).
+    """
+
+    def __init__(self, data_dir: str, rows: int, formats: Sequence[str], seed: int = 0,
+                 output_dir: Optional[str] = None) -> None:
+        self.rows = rows
+        self.data_dir = data_dir
+        self.output_dir = output_dir or data_dir
+        self.paths: Dict[str, str] = {}
+        for fmt in formats:
+            path = os.path.join(data_dir, f"transactions_{rows}_{seed}.{fmt}")
+            if not os.path.exists(path):
+                write_dataset(path, fmt, rows, seed)
+            self.paths[fmt] = path
+        source = self.paths.get("json") or next(iter(self.paths.values()))
+        self.transactions = loaders.load_transactions(source)
+
+
+class Benchmark:
+    """Замер одной функции: name — имя в отчете, fmt — формат файла (None — работа с загруженными операциями)."""
+
+    def __init__(self, name: str, func: Callable[[Dataset], Any], fmt: Optional[str] = None) -> None:
+        self.name = name
+        self.func = func
+        self.fmt = fmt
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("loaders.load_transactions[json]", lambda d: loaders.load_transactions(d.paths["json"]), "json"),
+    Benchmark("loaders.load_transactions[csv]", lambda d: loaders.load_transactions(d.paths["csv"]), "csv"),
+    Benchmark("loaders.load_transactions[xlsx]", lambda d: loaders.load_transactions(d.paths["xlsx"]), "xlsx"),
+    Benchmark("loaders.load_transactions[csv,compact]",
+              lambda d: loaders.load_transactions(d.paths["csv"], compact=True), "csv"),
+    Benchmark("utils.read_transactions_json", lambda d: utils.read_transactions_json(d.paths["json"]), "json"),
+    Benchmark("utils.read_transactions_csv", lambda d: utils.read_transactions_csv(d.paths["csv"]), "csv"),
+    Benchmark("utils.read_transactions_excel", lambda d: utils.read_transactions_excel(d.paths["xlsx"]), "xlsx"),
+    Benchmark("scan.count_csv", lambda d: scan.count_csv(d.paths["csv"], "EXECUTED", "RUB", "карты"), "csv"),
+    Benchmark("index.load_indexed[csv]", lambda d: index.load_indexed(d.paths["csv"], "CANCELED", "RUB"), "csv"),
+    Benchmark("main.filter_transactions_by_status",
+              lambda d: main.filter_transactions_by_status(d.transactions, "executed")),
+    Benchmark("processing.filter_by_state", lambda d: processing.filter_by_state(d.transactions, "EXECUTED")),
+    Benchmark("processing.sort_by_date", lambda d: processing.sort_by_date(d.transactions)),
+    Benchmark("utils.search_transactions", lambda d: utils.search_transactions(d.transactions, "карты")),
+    Benchmark("utils.count_transactions_by_category",
+              lambda d: utils.count_transactions_by_category(d.transactions, ["Перевод", "вклада", "карты"])),
+    Benchmark("widget.mask_account_card",
+              lambda d: [widget.mask_account_card(t["to"]) for t in d.transactions if t.get("to")]),
+    Benchmark("widget.get_data", lambda d: [widget.get_data(t["date"]) for t in d.transactions]),
+    Benchmark("amounts.AmountColumn", lambda d: amounts.AmountColumn.from_transactions(d.transactions).total()),
+    Benchmark("aggregations.group_by", lambda d: aggregations.group_by(d.transactions, ["month", "currency"])),
+    # Выгрузки замеряются только для форматов, выбранных для набора данных (jsonl — вместе с json)
+    Benchmark("exporters.export[csv]",
+              lambda d: exporters.export(d.transactions, os.path.join(d.output_dir, "export.csv")), "csv"),
+    Benchmark("exporters.export[jsonl]",
+              lambda d: exporters.export(d.transactions, os.path.join(d.output_dir, "export.jsonl")), "json"),
+    Benchmark("exporters.export[xlsx]",
+              lambda d: exporters.export(d.transactions, os.path.join(d.output_dir, "export.xlsx")), "xlsx"),
+]
+
+
+def measure(func: Callable[[], Any], repeat: int = 3, memory: bool = True) -> Dict[str, float]:
+    """
+    Замеряет лучшее время выполнения функции и пиковый объем выделенной памяти.
+
+    :param func: Функция без аргументов.
+    :param repeat: Количество повторов для замера времени.
+    :param memory: Замерить пиковую память (отдельным запуском под tracemalloc).
+    :return: Словарь с ключами seconds и peak_bytes.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    peak = profile(func, top=0, sample_rss=False)[1].peak_bytes if memory else 0
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run_suite(rows: int, formats: Sequence[str] = ("json", "csv", "xlsx"), seed: int = 0, repeat: int = 3,
+              data_dir: Optional[str] = None, memory: bool = True,
+              names: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Генерирует наборы данных (или использует уже созданные в data_dir) и замеряет все функции.
+
+    :param rows: Количество операций в наборе.
+    :param formats: Форматы файлов.
+    :param seed: Начальное значение генератора данных.
+    :param repeat: Количество повторов каждого замера.
+    :param data_dir: Каталог для наборов данных (по умолчанию временный).
+    :param memory: Замерять пиковую память.
+    :param names: Запускать только замеры с этими именами.
+    :return: Словарь {имя замера[rows]: {seconds, peak_bytes, rows, rows_per_second, bytes_per_row}}.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Выгрузки замеров всегда пишутся во временный каталог, даже если наборы данных лежат в data_dir
+        dataset = Dataset(data_dir or temp_dir, rows, formats, seed, output_dir=temp_dir)
+        results = {}
+        for benchmark in BENCHMARKS:
+            if benchmark.fmt is not None and benchmark.fmt not in dataset.paths:
+                continue
+            if names is not None and benchmark.name not in names:
+                continue
+            result = measure(lambda: benchmark.func(dataset), repeat, memory)
+            result["rows"] = rows
+            result["rows_per_second"] = rows / result["seconds"] if result["seconds"] else math.inf
+            result["bytes_per_row"] = result["peak_bytes"] / rows if rows else 0
+            results[f"{benchmark.name}[{rows}]"] = result
+        return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Сравнивает результаты с сохраненной базовой линией.
+
+    :param results: Текущие результаты run_suite.
+    :param baseline: Сохраненные результаты.
+    :param threshold: Допустимое ухудшение (0.25 — на 25%).
+    :return: Список описаний регрессий (пустой, если регрессий нет).
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            old, new = reference.get(metric, 0), result.get(metric, 0)
+            if old and new > old * (1 + threshold):
+                regressions.append(f"{name}: {metric} {old:.6g} -> {new:.6g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_budget(value: str) -> Tuple[str, float]:
+    """Разбирает бюджет памяти вида json=2500 (формат=байт на строку)."""
+    fmt, _, limit = value.partition("=")
+    try:
+        return fmt.strip(), float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ожидается формат=байт_на_строку, получено: {value}")
+
+
+def check_budgets(results: Dict[str, Dict[str, float]], budgets: Dict[str, float]) -> List[str]:
+    """
+    Проверяет бюджеты памяти загрузки: пиковая память loaders.load_transactions на строку для каждого формата.
+
+    :param results: Результаты run_suite (с замером памяти).
+    :param budgets: Словарь {формат: допустимое количество байт на строку}.
+    :return: Список превышений (пустой, если бюджеты соблюдены).
+    """
+    exceeded = []
+    for name, result in results.items():
+        for fmt, limit in budgets.items():
+            if name.startswith(f"loaders.load_transactions[{fmt}]") and result["bytes_per_row"] > limit:
+                exceeded.append(f"{name}: {result['bytes_per_row']:.0f} > {limit:.0f} bytes/row")
+    return exceeded
+
+
+def parse_importtime(output: str) -> List[Tuple[int, str, float]]:
+    """
+    Разбирает вывод python -X importtime.
+
+    :param output: Текст stderr процесса.
+    :return: Список (глубина вложенности, модуль, суммарное время импорта в миллисекундах) в порядке вывода;
+        время модуля включает время вложенных импортов.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Вложенные импорты сдвинуты на два пробела на каждый уровень
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, name.strip(), int(cumulative) / 1000))
+    return imports
+
+
+def measure_startup(file_path: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Замеряет время импортов при холодном запуске python -m src.main для файла в отдельном процессе.
+
+    :param file_path: Файл выгрузки (обычно JSON).
+    :param repeat: Количество запусков (берется лучший результат).
+    :return: Словарь {import_ms: время импортов без site, heavy: импортированные тяжелые библиотеки,
+        slowest: пять самых долгих импортов верхнего уровня}.
+    """
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(max(repeat, 1)):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.main", file_path],
+                                   cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   text=True, encoding="utf-8", errors="replace")
+        imports = parse_importtime(completed.stderr)
+        top_level = [(name, ms) for depth, name, ms in imports if depth == 0 and name != "site"]
+        result = {
+            "import_ms": sum(ms for _, ms in top_level),
+            "heavy": sorted({name.split(".")[0] for _, name, _ in imports} & set(HEAVY_MODULES)),
+            "slowest": sorted(top_level, key=lambda item: item[1], reverse=True)[:5],
+        }
+        if best is None or result["import_ms"] < best["import_ms"]:
+            best = result
+    assert best is not None
+    return best
+
+
+def check_startup(result: Dict[str, Any], budget_ms: float = DEFAULT_STARTUP_BUDGET_MS) -> List[str]:
+    """
+    Проверяет бюджет холодного запуска.
+
+    :param result: Результат measure_startup.
+    :param budget_ms: Допустимое время импортов в миллисекундах.
+    :return: Список нарушений (пустой, если бюджет соблюден).
+    """
+    problems = [f"startup imports heavy module {name}" for name in result["heavy"]]
+    if result["import_ms"] > budget_ms:
+        slowest = ", ".join(f"{name} {ms:.1f} ms" for name, ms in result["slowest"])
+        problems.append(f"startup imports {result['import_ms']:.1f} ms > {budget_ms:.0f} ms ({slowest})")
+    return problems
+
+
+def format_report(results: Dict[str, Dict[str, float]]) -> str:
+    """Возвращает результаты замеров в виде таблицы."""
+    lines = [f"{'benchmark':<50} {'time, ms':>10} {'rows/s':>12} {'peak, MiB':>10} {'B/row':>8}"]
+    for name, result in results.items():
+        lines.append(f"{name:<50} {result['seconds'] * 1000:>10.2f} {result['rows_per_second']:>12.0f} "
+                     f"{result['peak_bytes'] / 2 ** 20:>10.2f} {result.get('bytes_per_row', 0):>8.0f}")
+    return "\n".join(lines)
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа: python -m src.benchmarks --rows 10000 100000 --baseline bench.json
+
+    :return: Код завершения: 0 — регрессий нет, 1 — найдены регрессии или превышен бюджет памяти.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.benchmarks", description="Замеры производительности.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000], help="Размеры наборов данных.")
+    parser.add_argument("--formats", default="json,csv,xlsx", help="Форматы файлов через запятую.")
+    parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора данных.")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов каждого замера.")
+    parser.add_argument("--data-dir", help="Каталог для повторного использования сгенерированных наборов.")
+    parser.add_argument("--no-memory", action="store_true", help="Не замерять пиковую память.")
+    parser.add_argument("--baseline", help="JSON-файл базовой линии для сравнения.")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты в файл --baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимое ухудшение относительно базовой линии (по умолчанию 0.25).")
+    parser.add_argument("--memory-budget", type=parse_budget, action="append", default=[], metavar="FMT=BYTES",
+                        help="Бюджет пиковой памяти загрузки на строку, например xlsx=2500 (можно несколько раз).")
+    parser.add_argument("--startup-budget", type=float, metavar="MS",
+                        help="Бюджет времени импортов при запуске python -m src.main для JSON-файла "
+                             f"(например {DEFAULT_STARTUP_BUDGET_MS:.0f}).")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    results: Dict[str, Dict[str, float]] = {}
+    for rows in args.rows:
+        results.update(run_suite(rows, formats, args.seed, args.repeat, args.data_dir, not args.no_memory))
+    print(format_report(results))
+
+    exceeded = check_budgets(results, dict(args.memory_budget)) if not args.no_memory else []
+    if args.startup_budget is not None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            startup_file = os.path.join(temp_dir, "startup.json")
+            write_dataset(startup_file, "json", 10)
+            startup = measure_startup(startup_file, args.repeat)
+        print(f"startup imports: {startup['import_ms']:.1f} ms")
+        exceeded.extend(check_startup(startup, args.startup_budget))
+    for message in exceeded:
+        print(f"BUDGET EXCEEDED {message}", file=sys.stderr)
+    if not args.baseline:
+        return 1 if exceeded else 0
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return 1 if exceeded else 0
+    with open(args.baseline, encoding="utf-8") as file:
+        regressions = compare(results, json.load(file), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions or exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
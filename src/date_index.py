@@ -0,0 +1,295 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence as SequenceABC
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.dedup import dedup_key
+from src.records import parse_timestamp
+from src.utils import compile_search_pattern
+
+DEFAULT_PAGE_SIZE = 50
+
+# Операции без даты стоят в начале порядка по дате (как в records.date_sort_key)
+MISSING_TIMESTAMP = -math.inf
+
+SortKey = Tuple[float, int]
+DateBound = Union[None, str, date, datetime, float]
+
+
+def sort_key(transaction: Dict[str, Any]) -> SortKey:
+    """
+    Ключ порядка в индексе: UNIX-время операции и 64-битный ключ ее идентификатора (dedup.dedup_key),
+    чтобы операции с одинаковой датой шли в постоянном порядке.
+
+    :param transaction: Нормализованная транзакция.
+    :return: Кортеж (время, ключ идентификатора).
+    """
+    timestamp = parse_timestamp(transaction.get("date"))
+    return MISSING_TIMESTAMP if timestamp is None else timestamp, dedup_key(transaction)[1]
+
+
+def bound_timestamp(value: DateBound) -> Optional[float]:
+    """
+    Переводит границу диапазона дат в UNIX-время.
+
+    :param value: Строка ISO 8601 ('2019-08-01' или '2019-08-01T10:00:00Z'), date, datetime или UNIX-время;
+        даты без часового пояса считаются UTC.
+    :return: UNIX-время или None, если граница не задана.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp()
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        raise ValueError(f"Invalid date: {value}")
+    return timestamp
+
+
+class RowSlice(SequenceABC):
+    """Непрерывный участок строк индекса без копирования: хранит ссылку на список и границы."""
+
+    __slots__ = ("_rows", "start", "stop")
+
+    def __init__(self, rows: List[Dict[str, Any]], start: int, stop: int) -> None:
+        self._rows = rows
+        self.start = start
+        self.stop = max(stop, start)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, item: Any) -> Any:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:
+                return RowSlice(self._rows, self.start + start, self.start + stop)
+            return [self._rows[self.start + position] for position in range(start, stop, step)]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("RowSlice index out of range")
+        return self._rows[self.start + item]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return islice(self._rows, self.start, self.stop)
+
+    def __repr__(self) -> str:
+        return f"RowSlice({self.start}:{self.stop})"
+
+
+class DateIndex:
+    """
+    Операции набора данных, упорядоченные по дате один раз: ключи хранятся в массивах array('d') и array('q'),
+    поэтому позиция любой даты или курсора находится делением пополам за O(log n).
+    Подмножества по статусу и валюте строятся из уже упорядоченных строк без повторной сортировки и кэшируются.
+    """
+
+    def __init__(self, transactions: Sequence[Dict[str, Any]]) -> None:
+        keyed = sorted(((sort_key(transaction), transaction) for transaction in transactions),
+                       key=lambda pair: pair[0])
+        self._set_rows([key for key, _ in keyed], [transaction for _, transaction in keyed])
+
+    def _set_rows(self, keys: List[SortKey], rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+        self.timestamps = array("d", (timestamp for timestamp, _ in keys))
+        self.ids = array("q", (key for _, key in keys))
+        self._subsets: Dict[Tuple[Optional[str], Optional[str]], "DateIndex"] = {}
+
+    @classmethod
+    def _from_sorted(cls, keys: List[SortKey], rows: List[Dict[str, Any]]) -> "DateIndex":
+        index = cls.__new__(cls)
+        index._set_rows(keys, rows)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def key_at(self, position: int) -> SortKey:
+        """Ключ порядка строки с заданной позицией."""
+        return self.timestamps[position], self.ids[position]
+
+    def position_after(self, key: SortKey) -> int:
+        """Позиция первой строки с ключом больше заданного."""
+        return bisect_right(range(len(self.rows)), key, key=self.key_at)
+
+    def position_before(self, key: SortKey) -> int:
+        """Позиция первой строки с ключом не меньше заданного (строки левее имеют ключ меньше)."""
+        return bisect_left(range(len(self.rows)), key, key=self.key_at)
+
+    def date_positions(self, start: DateBound = None, end: DateBound = None) -> Tuple[int, int]:
+        """
+        Находит границы диапазона дат двумя делениями пополам по массиву времени.
+
+        :param start: Начало диапазона (включительно), None — без ограничения.
+        :param end: Конец диапазона (не включительно), None — без ограничения.
+        :return: Кортеж (первая позиция, позиция за последней).
+        """
+        start_ts, end_ts = bound_timestamp(start), bound_timestamp(end)
+        # Операции без даты (MISSING_TIMESTAMP) попадают только в диапазон без начала
+        low = bisect_left(self.timestamps, start_ts) if start_ts is not None else 0
+        high = bisect_left(self.timestamps, end_ts) if end_ts is not None else len(self.rows)
+        return low, max(high, low)
+
+    def filter_by_date_range(self, start: DateBound = None, end: DateBound = None, state: Optional[str] = None,
+                             currency: Optional[str] = None) -> RowSlice:
+        """
+        Возвращает операции с датой в полуинтервале [start, end) в порядке по дате.
+
+        :param start: Начало диапазона (включительно), None — без ограничения.
+        :param end: Конец диапазона (не включительно), None — без ограничения.
+        :param state: Статус операций (без учета регистра).
+        :param currency: Код валюты (без учета регистра).
+        :return: Участок строк индекса (без копирования).
+        """
+        index = self.subset(state, currency)
+        low, high = index.date_positions(start, end)
+        return RowSlice(index.rows, low, high)
+
+    def subset(self, state: Optional[str] = None, currency: Optional[str] = None) -> "DateIndex":
+        """
+        Возвращает индекс операций с заданным статусом и/или валютой (без учета регистра).
+
+        :param state: Статус операции.
+        :param currency: Код валюты.
+        :return: Индекс подмножества (сам индекс, если фильтры не заданы).
+        """
+        cache_key = (state.lower() if state else None, currency.lower() if currency else None)
+        if cache_key == (None, None):
+            return self
+        subset = self._subsets.get(cache_key)
+        if subset is None:
+            state_filter, currency_filter = cache_key
+            positions = [
+                position for position, transaction in enumerate(self.rows)
+                if (state_filter is None or str(transaction.get("state") or "").lower() == state_filter)
+                and (currency_filter is None or str(_currency_code(transaction) or "").lower() == currency_filter)
+            ]
+            subset = self._subsets[cache_key] = DateIndex._from_sorted(
+                [self.key_at(position) for position in positions], [self.rows[position] for position in positions])
+        return subset
+
+
+def _currency_code(transaction: Dict[str, Any]) -> Any:
+    return (transaction.get("operationAmount") or {}).get("currency", {}).get("code")
+
+
+class Page:
+    """Страница результата: операции и непрозрачный курсор следующей страницы (None — страниц больше нет)."""
+
+    def __init__(self, items: List[Dict[str, Any]], next_cursor: Optional[str]) -> None:
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def _fingerprint(*parts: Any) -> str:
+    return hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def encode_cursor(key: SortKey, passed: int, fingerprint: str) -> str:
+    """
+    Кодирует позицию в порядке по дате в непрозрачную строку для URL.
+
+    :param key: Ключ последней выданной строки.
+    :param passed: Сколько строк с этим ключом уже пройдено (больше 1 только для повторяющихся операций).
+    :param fingerprint: Отпечаток запроса, для которого выдан курсор.
+    :return: Курсор.
+    """
+    timestamp, id_key = key
+    payload = json.dumps([None if timestamp == MISSING_TIMESTAMP else timestamp, id_key, passed, fingerprint])
+    return base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[SortKey, int, str]:
+    """
+    Разбирает курсор encode_cursor.
+
+    :param cursor: Курсор.
+    :return: Кортеж (ключ последней выданной строки, пройдено строк с этим ключом, отпечаток запроса).
+    """
+    try:
+        timestamp, id_key, passed, fingerprint = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key = (MISSING_TIMESTAMP if timestamp is None else float(timestamp), int(id_key))
+        return key, int(passed), str(fingerprint)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def paginate(index: DateIndex, page_size: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+             descending: bool = False, state: Optional[str] = None, rub_only: bool = False,
+             search: Optional[Sequence[str]] = None, search_mode: str = "all", date_from: DateBound = None,
+             date_to: DateBound = None) -> Page:
+    """
+    Возвращает страницу операций в порядке по дате, продолжая с места, закодированного в курсоре.
+
+    Курсор содержит ключ последней выданной строки (дата и id), поэтому следующая страница находится
+    делением пополам по индексу, а не повторной фильтрацией и сортировкой всего набора: стоимость страницы —
+    O(log n + просмотренные строки), где для фильтра по статусу и валюте просматриваются только строки подмножества.
+
+    :param index: Индекс набора данных.
+    :param page_size: Количество операций на странице.
+    :param cursor: Курсор из предыдущей страницы (None — первая страница).
+    :param descending: Порядок от новых операций к старым.
+    :param state: Статус операций.
+    :param rub_only: Только рублевые операции.
+    :param search: Строки для поиска в описании.
+    :param search_mode: 'all' — должны встречаться все строки, 'any' — хотя бы одна.
+    :param date_from: Начало диапазона дат (включительно).
+    :param date_to: Конец диапазона дат (не включительно).
+    :return: Страница.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    terms = tuple(term for term in ([search] if isinstance(search, str) else search or ()) if term)
+    source = index.subset(state, "RUB" if rub_only else None)
+    low, high = source.date_positions(date_from, date_to)
+    fingerprint = _fingerprint(state.lower() if state else None, rub_only, terms, search_mode, descending, low, high)
+    if cursor is None:
+        start = high - 1 if descending else low
+    else:
+        key, passed, cursor_fingerprint = decode_cursor(cursor)
+        if cursor_fingerprint != fingerprint:
+            raise ValueError("Cursor does not match the query")
+        if descending:
+            start = source.position_after(key) - passed - 1
+        else:
+            start = source.position_before(key) + passed
+    positions = range(min(start, high - 1), low - 1, -1) if descending else range(max(start, low), high)
+    matches = _matching_positions(source, positions, terms, search_mode)
+    items = []
+    last = None
+    for position in matches:
+        items.append(source.rows[position])
+        last = position
+        if len(items) == page_size:
+            break
+    # Курсор выдается, только если после страницы есть хотя бы одна подходящая строка
+    if last is None or len(items) < page_size or next(matches, None) is None:
+        return Page(items, None)
+    key = source.key_at(last)
+    passed = source.position_after(key) - last if descending else last - source.position_before(key) + 1
+    return Page(items, encode_cursor(key, passed, fingerprint))
+
+
+def _matching_positions(index: DateIndex, positions: range, terms: Tuple[str, ...],
+                        search_mode: str) -> Iterator[int]:
+    if not terms:
+        return iter(positions)
+    search = compile_search_pattern(terms, search_mode).search
+    rows = index.rows
+    return (position for position in positions if search(rows[position].get("description") or ""))
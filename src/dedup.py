@@ -0,0 +1,257 @@
+import hashlib
+import json
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from src.logger_config import setup_logger
+from src.records import as_export_dict
+
+# Создание и получение именованного логгера
+dedup_logger = setup_logger(__name__)
+
+INT64_MIN = -(2 ** 63)
+INT64_MAX = 2 ** 63 - 1
+# Значение пустой ячейки хеш-таблицы (идентификатор с таким значением хешируется как содержимое)
+EMPTY = INT64_MIN
+# Множитель хеширования Фибоначчи (2 ** 64 / золотое сечение)
+_FIBONACCI = 0x9E3779B97F4A7C15
+_MASK64 = 2 ** 64 - 1
+# Начальная емкость фильтра Блума, если ожидаемое количество операций неизвестно (затем удваивается)
+DEFAULT_BLOOM_CAPACITY = 65_536
+
+
+class IntHashSet:
+    """
+    Множество 64-битных целых чисел с открытой адресацией в array('q'): 8 байт на ячейку
+    (около 16 байт на элемент при заполнении до половины) вместо объекта int и записи set на каждый элемент.
+    """
+
+    __slots__ = ("_table", "_bits", "_size")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._bits = max(int(math.ceil(math.log2(max(capacity, 8) * 2))), 3)
+        self._table = array("q", [EMPTY]) * (1 << self._bits)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти таблицы в байтах."""
+        return len(self._table) * self._table.itemsize
+
+    def _slot(self, value: int) -> int:
+        mask = len(self._table) - 1
+        slot = ((value * _FIBONACCI) & _MASK64) >> (64 - self._bits)
+        table = self._table
+        while True:
+            current = table[slot]
+            if current == value or current == EMPTY:
+                return slot
+            slot = (slot + 1) & mask
+
+    def add(self, value: int) -> bool:
+        """
+        Добавляет число в множество.
+
+        :param value: Целое число в диапазоне int64 (кроме EMPTY).
+        :return: True, если числа в множестве не было.
+        """
+        if value == EMPTY:
+            raise ValueError("Value is reserved for empty slots")
+        slot = self._slot(value)
+        if self._table[slot] == value:
+            return False
+        self._table[slot] = value
+        self._size += 1
+        if self._size * 2 > len(self._table):
+            self._grow()
+        return True
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int) or value == EMPTY:
+            return False
+        return self._table[self._slot(value)] == value
+
+    def __iter__(self) -> Iterator[int]:
+        return (value for value in self._table if value != EMPTY)
+
+    def _grow(self) -> None:
+        old = self._table
+        self._bits += 1
+        self._table = array("q", [EMPTY]) * (1 << self._bits)
+        for value in old:
+            if value != EMPTY:
+                self._table[self._slot(value)] = value
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: вероятностное множество с заданной долей ложных срабатываний.
+    Для 1% ошибок требуется около 1,2 байта на элемент независимо от размера ключей.
+    """
+
+    __slots__ = ("_bits", "_size", "_hashes", "count", "capacity", "error_rate")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 64)
+        self._size = bits
+        self._bits = bytearray((bits + 7) // 8)
+        self._hashes = max(int(round(bits / max(capacity, 1) * math.log(2))), 1)
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти битового массива в байтах."""
+        return len(self._bits)
+
+    def _positions(self, key: int) -> Iterator[int]:
+        # Двойное хеширование: k позиций из двух независимых 64-битных хешей
+        first = (key * _FIBONACCI) & _MASK64
+        second = ((key ^ (key >> 31)) * 0xBF58476D1CE4E5B9 & _MASK64) | 1
+        for number in range(self._hashes):
+            yield (first + number * second) % self._size
+
+    def add(self, key: int) -> bool:
+        """
+        Добавляет ключ в фильтр.
+
+        :param key: Целочисленный ключ.
+        :return: True, если ключ точно не встречался раньше.
+        """
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, int):
+            return False
+        return all(self._bits[position // 8] & (1 << position % 8) for position in self._positions(key))
+
+
+def _hash64(data: str) -> int:
+    digest = hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little", signed=True)
+    return value if value != EMPTY else EMPTY + 1
+
+
+def content_hash(transaction: Dict[str, Any]) -> int:
+    """
+    Возвращает 64-битный хеш содержимого операции (blake2b от записи в каноническом JSON).
+
+    :param transaction: Нормализованная транзакция (словарь или Transaction).
+    :return: Хеш в диапазоне int64.
+    """
+    # amount_minor вычисляется загрузчиком из amount и в хеш не входит
+    return _hash64(json.dumps(as_export_dict(transaction), sort_keys=True, ensure_ascii=False, default=str))
+
+
+def dedup_key(transaction: Dict[str, Any]) -> tuple:
+    """
+    Возвращает ключ для поиска дубликатов: идентификатор операции или, если его нет, хеш содержимого.
+
+    :param transaction: Нормализованная транзакция.
+    :return: Кортеж (пространство ключей, целое число): ("id", id) или ("content", хеш).
+    """
+    transaction_id = transaction.get("id")
+    if type(transaction_id) is int and EMPTY < transaction_id <= INT64_MAX:
+        return "id", transaction_id
+    if transaction_id is not None and transaction_id != "":
+        return "id", _hash64(f"id:{transaction_id}")
+    return "content", content_hash(transaction)
+
+
+class Deduplicator:
+    """
+    Потоковое удаление дубликатов операций из нескольких источников за один проход.
+
+    Ключи хранятся в IntHashSet (отдельно идентификаторы и хеши содержимого).
+    С bloom_error_rate перед множествами проверяется фильтр Блума: новый ключ обычно отсеивается
+    по битовому массиву без поиска в таблице, а совпадение в фильтре всегда подтверждается точным множеством,
+    поэтому уникальные операции не теряются. Фильтр удваивается, когда ключей становится больше его емкости.
+    """
+
+    def __init__(self, expected: Optional[int] = None, bloom_error_rate: Optional[float] = None) -> None:
+        self.bloom: Optional[BloomFilter] = None
+        if bloom_error_rate is not None:
+            self.bloom = BloomFilter(expected or DEFAULT_BLOOM_CAPACITY, bloom_error_rate)
+        self.ids = IntHashSet(expected or 1024)
+        self.contents = IntHashSet()
+        self.duplicates = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти структур для поиска дубликатов в байтах."""
+        bloom_bytes = self.bloom.nbytes if self.bloom is not None else 0
+        return self.ids.nbytes + self.contents.nbytes + bloom_bytes
+
+    def _grow_bloom(self, bloom: BloomFilter) -> BloomFilter:
+        grown = BloomFilter(bloom.capacity * 2, bloom.error_rate)
+        for key in self.ids:
+            grown.add(key)
+        for key in self.contents:
+            grown.add(key ^ _FIBONACCI)
+        dedup_logger.info(f"Bloom filter grown to {grown.capacity} keys")
+        return grown
+
+    def add(self, transaction: Dict[str, Any]) -> bool:
+        """
+        Запоминает операцию.
+
+        :param transaction: Нормализованная транзакция.
+        :return: True, если операция встретилась впервые.
+        """
+        space, key = dedup_key(transaction)
+        keys = self.ids if space == "id" else self.contents
+        bloom = self.bloom
+        if bloom is None:
+            is_new = keys.add(key)
+        else:
+            # Хеши содержимого смешиваются с константой, чтобы не совпадать с идентификаторами
+            if bloom.add(key if space == "id" else key ^ _FIBONACCI):
+                # Ключа точно не было: поиск в таблице не нужен
+                keys.add(key)
+                is_new = True
+            else:
+                is_new = keys.add(key)
+            if bloom.count > bloom.capacity:
+                self.bloom = self._grow_bloom(bloom)
+        if not is_new:
+            self.duplicates += 1
+        return is_new
+
+    def filter(self, transactions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Пропускает только первые вхождения операций (порядок сохраняется).
+
+        :param transactions: Итерируемый объект с транзакциями (список или итератор загрузчика).
+        :return: Итератор уникальных транзакций.
+        """
+        for transaction in transactions:
+            if self.add(transaction):
+                yield transaction
+
+
+def deduplicate(transactions: Iterable[Dict[str, Any]], bloom_error_rate: Optional[float] = None) -> list:
+    """
+    Удаляет дубликаты операций по id (по содержимому, если id нет).
+
+    :param transactions: Транзакции из одного или нескольких источников.
+    :param bloom_error_rate: Проверять ключи фильтром Блума с заданной долей ошибок перед точным множеством.
+    :return: Список уникальных транзакций в исходном порядке.
+    """
+    expected = len(transactions) if isinstance(transactions, list) else None
+    deduplicator = Deduplicator(expected, bloom_error_rate)
+    result = list(deduplicator.filter(transactions))
+    dedup_logger.info(f"Removed {deduplicator.duplicates} duplicates, {len(result)} unique operations")
+    return result
@@ -0,0 +1,244 @@
+import csv
+import json
+import os
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+from src.logger_config import setup_logger
+from src.records import as_export_dict
+
+# Создание и получение именованного логгера
+exporters_logger = setup_logger(__name__)
+
+# Поля плоской выгрузки в том же порядке, что и в выгрузках банка (читаются loaders без изменений)
+EXPORT_FIELDS = ["id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description"]
+
+EXPORT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".xlsx": "xlsx"}
+
+# Количество строк, которые накапливаются перед записью в файл
+CHUNK_SIZE = 1000
+
+# Суффикс временного файла, в который пишется выгрузка до успешного закрытия
+TEMP_SUFFIX = ".part"
+
+
+def flat_row(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Переводит нормализованную операцию в плоскую строку выгрузки (сумма и валюта — отдельными колонками).
+
+    :param transaction: Словарь или records.Transaction.
+    :return: Словарь с полями EXPORT_FIELDS (отсутствующие поля — пустые строки).
+    """
+    operation_amount = transaction.get("operationAmount") or {}
+    currency = operation_amount.get("currency") or {}
+    row = {field: transaction.get(field, "") for field in EXPORT_FIELDS}
+    row["amount"] = operation_amount.get("amount", "")
+    row["currency_name"] = currency.get("name", "")
+    row["currency_code"] = currency.get("code", "")
+    return row
+
+
+class Exporter:
+    """
+    Потоковая запись операций в файл: строки накапливаются пачками по chunk_size и сразу записываются,
+    поэтому весь результат в памяти не хранится. Строки пишутся во временный файл рядом с итоговым,
+    который заменяет итоговый только при успешном закрытии. Используется как контекстный менеджер:
+    при исключении внутри блока временный файл удаляется, а существующий файл не изменяется.
+    """
+
+    fmt = ""
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        self.file_path = file_path
+        self.temp_path = file_path + TEMP_SUFFIX
+        self.chunk_size = max(chunk_size, 1)
+        self.rows = 0
+        self._chunk: List[Any] = []
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> "Exporter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _convert(self, transaction: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def _write_chunk(self, chunk: List[Any]) -> None:
+        raise NotImplementedError
+
+    def write(self, transaction: Dict[str, Any]) -> None:
+        """Добавляет одну операцию в выгрузку."""
+        self._chunk.append(self._convert(transaction))
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, transactions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Добавляет операции в выгрузку по мере их получения.
+
+        :param transactions: Итерируемый объект с транзакциями (список или генератор).
+        :return: Количество записанных операций.
+        """
+        written = self.rows + len(self._chunk)
+        for transaction in transactions:
+            self.write(transaction)
+        return self.rows + len(self._chunk) - written
+
+    def flush(self) -> None:
+        """Записывает накопленную пачку строк."""
+        if self._chunk:
+            self._write_chunk(self._chunk)
+            self.rows += len(self._chunk)
+            self._chunk = []
+
+    def _release(self) -> None:
+        """Закрывает временный файл."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _finish(self) -> None:
+        """Дописывает и закрывает временный файл."""
+        self._release()
+
+    def close(self) -> None:
+        """Записывает оставшиеся строки и заменяет итоговый файл временным."""
+        try:
+            self.flush()
+            self._finish()
+            os.replace(self.temp_path, self.file_path)
+        except BaseException:
+            self.discard()
+            raise
+        exporters_logger.info(f"Exported {self.rows} rows to {self.file_path} ({self.fmt})")
+
+    def discard(self) -> None:
+        """Отменяет выгрузку: закрывает и удаляет временный файл, итоговый файл не изменяется."""
+        self._chunk = []
+        try:
+            self._release()
+        finally:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+        exporters_logger.warning(f"Export to {self.file_path} discarded after {self.rows} rows")
+
+
+class CsvExporter(Exporter):
+    """Выгрузка в CSV с разделителем ';' и заголовком, как в выгрузках банка."""
+
+    fmt = "csv"
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        super().__init__(file_path, chunk_size)
+        self._file = open(self.temp_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS, delimiter=";", lineterminator="\n",
+                                      extrasaction="ignore")
+        self._writer.writeheader()
+
+    def _convert(self, transaction: Dict[str, Any]) -> Any:
+        return flat_row(transaction)
+
+    def _write_chunk(self, chunk: List[Any]) -> None:
+        self._writer.writerows(chunk)
+
+
+class JsonLinesExporter(Exporter):
+    """Выгрузка в JSON Lines: одна операция в формате JSON-выгрузки банка на строку."""
+
+    fmt = "jsonl"
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        super().__init__(file_path, chunk_size)
+        self._file = open(self.temp_path, "w", encoding="utf-8")
+
+    def _convert(self, transaction: Dict[str, Any]) -> Any:
+        return json.dumps(as_export_dict(transaction), ensure_ascii=False, default=str)
+
+    def _write_chunk(self, chunk: List[Any]) -> None:
+        assert self._file is not None
+        self._file.write("\n".join(chunk) + "\n")
+
+
+class XlsxExporter(Exporter):
+    """Выгрузка в XLSX через openpyxl в режиме write-only: строки сразу сериализуются во временный файл листа."""
+
+    fmt = "xlsx"
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        import openpyxl  # type: ignore[import-untyped]
+
+        super().__init__(file_path, chunk_size)
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append(EXPORT_FIELDS)
+
+    def _convert(self, transaction: Dict[str, Any]) -> Any:
+        row = flat_row(transaction)
+        return [row[field] if row[field] != "" else None for field in EXPORT_FIELDS]
+
+    def _write_chunk(self, chunk: List[Any]) -> None:
+        for row in chunk:
+            self._sheet.append(row)
+
+    def _finish(self) -> None:
+        """Сохраняет книгу во временный файл."""
+        self._workbook.save(self.temp_path)
+
+    def _release(self) -> None:
+        """
+        Сохраняет незавершенную книгу во временный файл выгрузки, который затем удаляет discard():
+        при сохранении openpyxl сам закрывает и удаляет временный файл листа.
+        """
+        if not self._sheet.closed:
+            self._workbook.save(self.temp_path)
+
+
+EXPORTERS = {"csv": CsvExporter, "jsonl": JsonLinesExporter, "xlsx": XlsxExporter}
+
+
+def detect_export_format(file_path: str) -> str:
+    """
+    Определяет формат выгрузки по расширению файла.
+
+    :param file_path: Путь к файлу.
+    :return: Формат: csv, jsonl или xlsx.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unsupported export format: {file_path}")
+    return EXPORT_EXTENSIONS[extension]
+
+
+def open_exporter(file_path: str, fmt: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> Exporter:
+    """
+    Создает потоковую выгрузку в файл.
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат (по умолчанию определяется по расширению).
+    :param chunk_size: Количество строк в одной пачке записи.
+    :return: Объект выгрузки.
+    """
+    fmt = fmt or detect_export_format(file_path)
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return EXPORTERS[fmt](file_path, chunk_size)
+
+
+def export(transactions: Iterable[Dict[str, Any]], file_path: str, fmt: Optional[str] = None,
+           chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Записывает операции в файл CSV, JSON Lines или XLSX, не собирая всю выгрузку в памяти.
+
+    :param transactions: Итерируемый объект с транзакциями (список или генератор).
+    :param file_path: Путь к файлу.
+    :param fmt: Формат (по умолчанию определяется по расширению).
+    :param chunk_size: Количество строк в одной пачке записи.
+    :return: Количество записанных операций.
+    """
+    with open_exporter(file_path, fmt, chunk_size) as exporter:
+        exporter.write_many(transactions)
+    return exporter.rows
@@ -1,12 +1,40 @@
+import csv
+import json
 import os
+from array import array
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
 
-import requests
-from dotenv import load_dotenv
+from src.amounts import MINOR_UNITS, get_amount_minor, get_currency_code, to_decimal
+from src.loaders import sniff_delimiter
+from src.logger_config import setup_logger
 
-load_dotenv()
+# Создание и получение именованного логгера
+external_api_logger = setup_logger(__name__)
 
-API_KEY = os.getenv('EXCHANGE_RATES_API_KEY')
 BASE_URL = "https://api.apilayer.com/exchangerates_data/convert"
+# Настройки из окружения (и файла .env): API_KEY — ключ API курсов,
+# RATES_FILE — локальная таблица исторических курсов (CSV или JSON), используется вместо API, если задана
+SETTINGS = {"API_KEY": "EXCHANGE_RATES_API_KEY", "RATES_FILE": "EXCHANGE_RATES_FILE"}
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """
+    Загружает переменные из файла .env один раз — при первом обращении к настройкам,
+    а не при импорте модуля, чтобы запуски без пересчета курсов не импортировали python-dotenv.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def get_setting(name: str) -> Optional[str]:
+    """Возвращает настройку API_KEY или RATES_FILE из окружения (с учетом файла .env)."""
+    load_env()
+    return os.getenv(SETTINGS[name])
 
 
 def convert_currency(amount, currency):
@@ -23,9 +51,12 @@ def convert_currency(amount, currency):
     }
 
     headers = {
-        "apikey": API_KEY
+        "apikey": get_setting('API_KEY')
     }
 
+    # requests импортируется только при обращении к API: его импорт занимает больше, чем запуск остальной программы
+    import requests
+
     response = requests.get(BASE_URL, headers=headers, params=params)
     data = response.json()
 
@@ -35,11 +66,192 @@ def convert_currency(amount, currency):
         raise ValueError("Error in converting currency")
 
 
-def get_transaction_amount_in_rub(transaction):
+@lru_cache(maxsize=None)
+def get_exchange_rate(currency: str) -> float:
+    """
+    Возвращает курс валюты к рублю. Результат кэшируется на время работы процесса,
+    поэтому при пакетной обработке каждый курс запрашивается у API не более одного раза.
+    """
+    return float(convert_currency(1, currency))
+
+
+def get_transaction_amount_in_rub(transaction: Dict[str, Any], rates: Optional["RateTable"] = None,
+                                  online_fallback: bool = True) -> Optional[float]:
     """
     Возвращает сумму транзакции в рублях.
+    Для нормализованных записей сумма берется в минимальных единицах (get_amount_minor); если суммы нет
+    или она некорректна, возвращается None.
+    Если задана таблица курсов (rates или EXCHANGE_RATES_FILE), сумма пересчитывается по курсу на дату
+    операции; без курса в таблице и при online_fallback=False возвращается None.
+    """
+    if 'operationAmount' in transaction:
+        amount_minor = get_amount_minor(transaction)
+        if amount_minor is None:
+            return None
+        amount = float(to_decimal(amount_minor))
+        currency = get_currency_code(transaction) or 'RUB'
+        if currency.upper() != 'RUB' and (rates is not None or get_setting('RATES_FILE')):
+            rate = get_rate_on_date(currency, transaction.get('date'), rates, online_fallback)
+            return amount * rate if rate is not None else None
+    else:
+        amount = transaction.get('amount', 0)
+        currency = transaction.get('currency', 'RUB')
+
+    return float(convert_currency(amount, currency))
+
+
+def _day(value: Any) -> Optional[int]:
+    """Возвращает порядковый номер дня для даты операции ('2019-08-26T10:50:58.294041', '...Z') или None."""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class RateTable:
     """
-    amount = transaction.get('amount', 0)
-    currency = transaction.get('currency', 'RUB')
+    Таблица исторических курсов валют к рублю: для каждой валюты отсортированные массивы дней и курсов.
+    Курс на дату операции — последний известный курс на эту дату или раньше (поиск делением пополам).
+    """
+
+    def __init__(self) -> None:
+        self._days: Dict[str, array] = {}
+        self._rates: Dict[str, array] = {}
 
-    return convert_currency(amount, currency)
+    def __len__(self) -> int:
+        return sum(len(days) for days in self._days.values())
+
+    @property
+    def currencies(self) -> List[str]:
+        """Валюты, для которых есть курсы."""
+        return sorted(self._days)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "RateTable":
+        """
+        Строит таблицу из записей {date, currency, rate}; строки с некорректными значениями пропускаются.
+
+        :param rows: Записи курсов в любом порядке.
+        :return: Таблица курсов.
+        """
+        points: Dict[str, Dict[int, float]] = {}
+        skipped = 0
+        for row in rows:
+            day = _day(row.get("date"))
+            currency = str(row.get("currency") or "").strip().upper()
+            try:
+                rate = float(row.get("rate"))  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                rate = 0.0
+            if day is None or not currency or rate <= 0:
+                skipped += 1
+                continue
+            points.setdefault(currency, {})[day] = rate
+        if skipped:
+            external_api_logger.warning(f"Skipped {skipped} invalid rate rows")
+        table = cls()
+        for currency, by_day in points.items():
+            days = sorted(by_day)
+            table._days[currency] = array("l", days)
+            table._rates[currency] = array("d", (by_day[day] for day in days))
+        return table
+
+    @classmethod
+    def load(cls, file_path: str) -> "RateTable":
+        """
+        Загружает таблицу курсов из файла.
+
+        CSV: колонки date, currency, rate (разделитель ',' или ';').
+        JSON: список записей {"date", "currency", "rate"} или словарь {"USD": {"2023-01-31": 90.5, ...}}.
+
+        :param file_path: Путь к CSV- или JSON-файлу.
+        :return: Таблица курсов.
+        """
+        if file_path.lower().endswith(".json"):
+            with open(file_path, encoding="utf-8") as file:
+                data = json.load(file)
+            if isinstance(data, dict):
+                rows: Iterable[Dict[str, Any]] = [
+                    {"date": day, "currency": currency, "rate": rate}
+                    for currency, by_day in data.items() for day, rate in by_day.items()
+                ]
+            else:
+                rows = data
+            table = cls.from_rows(rows)
+        else:
+            with open(file_path, encoding="utf-8", newline="") as file:
+                delimiter = sniff_delimiter(file.readline())
+                file.seek(0)
+                table = cls.from_rows(csv.DictReader(file, delimiter=delimiter))
+        external_api_logger.info(f"Loaded {len(table)} rates for {len(table.currencies)} currencies from {file_path}")
+        return table
+
+    def rate(self, currency: str, day: Any) -> Optional[float]:
+        """
+        Возвращает курс валюты к рублю на дату.
+
+        :param currency: Код валюты.
+        :param day: Дата операции (строка ISO 8601) или порядковый номер дня.
+        :return: Курс или None, если курса на эту дату или раньше нет.
+        """
+        currency = currency.upper()
+        if currency == "RUB":
+            return 1.0
+        days = self._days.get(currency)
+        ordinal = day if isinstance(day, int) else _day(day)
+        if days is None or ordinal is None:
+            return None
+        position = bisect_right(days, ordinal)
+        return self._rates[currency][position - 1] if position else None
+
+    def convert_many(self, transactions: Iterable[Dict[str, Any]]) -> List[Optional[float]]:
+        """
+        Пересчитывает суммы операций в рубли по курсу на дату каждой операции без обращения к сети.
+
+        :param transactions: Нормализованные транзакции.
+        :return: Суммы в рублях (None — нет суммы или курса на дату операции).
+        """
+        days_cache: Dict[Any, Optional[int]] = {}
+        result: List[Optional[float]] = []
+        for transaction in transactions:
+            amount_minor = get_amount_minor(transaction)
+            if amount_minor is None:
+                result.append(None)
+                continue
+            transaction_date = transaction.get("date")
+            if transaction_date not in days_cache:
+                days_cache[transaction_date] = _day(transaction_date)
+            rate = self.rate(get_currency_code(transaction) or "RUB", days_cache[transaction_date])
+            result.append(amount_minor * rate / MINOR_UNITS if rate is not None else None)
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_rate_table(file_path: Optional[str] = None) -> Optional[RateTable]:
+    """
+    Возвращает таблицу курсов из файла (по умолчанию из EXCHANGE_RATES_FILE); файл читается один раз.
+
+    :param file_path: Путь к файлу курсов.
+    :return: Таблица курсов или None, если файл не задан.
+    """
+    file_path = file_path or get_setting("RATES_FILE")
+    return RateTable.load(file_path) if file_path else None
+
+
+def get_rate_on_date(currency: str, transaction_date: Any, rates: Optional[RateTable] = None,
+                     online_fallback: bool = True) -> Optional[float]:
+    """
+    Возвращает курс валюты к рублю на дату операции: из локальной таблицы, а если курса в ней нет —
+    текущий курс из API (только при online_fallback).
+
+    :param currency: Код валюты.
+    :param transaction_date: Дата операции.
+    :param rates: Таблица курсов (по умолчанию get_rate_table()).
+    :param online_fallback: Разрешить запрос к API.
+    :return: Курс или None.
+    """
+    rates = rates if rates is not None else get_rate_table()
+    rate = rates.rate(currency, transaction_date) if rates is not None else None
+    if rate is None and online_fallback:
+        rate = get_exchange_rate(currency.upper())
+    return rate
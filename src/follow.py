@@ -0,0 +1,148 @@
+import csv
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.loaders import normalize_record, sniff_delimiter
+from src.logger_config import setup_logger
+
+# Создание и получение именованного логгера
+follow_logger = setup_logger(__name__)
+
+
+class FollowState:
+    """Позиция чтения растущего CSV-файла: смещение после последней полной строки и хеш заголовка."""
+
+    def __init__(self, offset: int = 0, header_hash: str = "") -> None:
+        self.offset = offset
+        self.header_hash = header_hash
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает состояние в виде словаря для сохранения в JSON."""
+        return {"offset": self.offset, "header_hash": self.header_hash}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FollowState":
+        """Восстанавливает состояние из словаря."""
+        return cls(int(data.get("offset", 0)), str(data.get("header_hash", "")))
+
+
+def read_appended(file_path: str, state: Optional[FollowState] = None) -> Tuple[List[Dict[str, Any]], FollowState]:
+    """
+    Читает строки, дописанные в CSV-файл после предыдущего чтения.
+
+    Если заголовок изменился или файл стал короче сохраненного смещения (файл заменен или обрезан),
+    файл читается с начала. Незавершенная последняя строка (без перевода строки) остается на следующий раз.
+
+    :param file_path: Путь к CSV-файлу.
+    :param state: Состояние после предыдущего чтения (None — читать с начала).
+    :return: Кортеж (новые нормализованные транзакции, новое состояние).
+    """
+    with open(file_path, "rb") as file:
+        header_bytes = file.readline()
+        if not header_bytes.endswith(b"\n"):
+            # Заголовок еще не записан полностью
+            return [], state or FollowState()
+        header_hash = hashlib.sha256(header_bytes).hexdigest()
+        size = os.fstat(file.fileno()).st_size
+        body_start = len(header_bytes)
+
+        offset = body_start
+        if state is not None and state.header_hash == header_hash and body_start <= state.offset <= size:
+            offset = state.offset
+        elif state is not None and state.offset:
+            follow_logger.warning(f"File was replaced or truncated, reading from the start: {file_path}")
+
+        header_line = header_bytes.decode("utf-8-sig").rstrip("\r\n")
+        delimiter = sniff_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter))
+        file.seek(offset)
+        end = offset
+
+        def complete_lines() -> Iterator[str]:
+            # Строки делятся только по b"\n" (splitlines разбивал бы и по \r, \x1c, \u2028 внутри значений),
+            # файл читается буферами, а не целиком
+            nonlocal end
+            if end >= size:
+                return
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                end += len(line)
+                yield line.decode("utf-8")
+                if end >= size:
+                    break
+
+        transactions = []
+        for row in csv.reader(complete_lines(), delimiter=delimiter):
+            record = normalize_record(dict(zip(header, row)))
+            if record is not None:
+                transactions.append(record)
+    new_state = FollowState(end, header_hash)
+    if end == offset:
+        return [], new_state
+    follow_logger.info(f"Read {len(transactions)} new rows from {file_path} (offset {new_state.offset})")
+    return transactions, new_state
+
+
+def load_states(state_file: str) -> Dict[str, FollowState]:
+    """
+    Загружает сохраненные позиции чтения файлов.
+
+    :param state_file: Путь к JSON-файлу состояния.
+    :return: Словарь {абсолютный путь файла: состояние}; пустой, если файла состояния нет или он поврежден.
+    """
+    if not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, encoding="utf-8") as file:
+            data = json.load(file)
+        return {path: FollowState.from_dict(state) for path, state in data.items()}
+    except (OSError, ValueError, AttributeError) as e:
+        follow_logger.error(f"Error reading state file {state_file}: {e}")
+        return {}
+
+
+def save_states(state_file: str, states: Dict[str, FollowState]) -> None:
+    """
+    Сохраняет позиции чтения файлов (запись через временный файл, чтобы не повредить состояние при сбое).
+
+    :param state_file: Путь к JSON-файлу состояния.
+    :param states: Словарь {абсолютный путь файла: состояние}.
+    """
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump({path: state.to_dict() for path, state in states.items()}, file, indent=2)
+    os.replace(temp_file, state_file)
+
+
+def follow(file_path: str, callback: Callable[[List[Dict[str, Any]]], None], state_file: Optional[str] = None,
+           interval: float = 1.0, max_polls: Optional[int] = None) -> FollowState:
+    """
+    Периодически проверяет файл и передает в callback только дописанные строки.
+    Обработка (фильтры, поиск, Aggregator.update) выполняется по мере поступления данных.
+
+    :param file_path: Путь к CSV-файлу.
+    :param callback: Функция, получающая список новых транзакций.
+    :param state_file: JSON-файл для сохранения позиции между запусками.
+    :param interval: Пауза между проверками в секундах.
+    :param max_polls: Количество проверок (None — бесконечно).
+    :return: Состояние после последней проверки.
+    """
+    key = os.path.abspath(file_path)
+    states = load_states(state_file) if state_file else {}
+    state = states.get(key)
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        if polls:
+            time.sleep(interval)
+        polls += 1
+        transactions, state = read_appended(file_path, state)
+        if transactions:
+            callback(transactions)
+        if state_file:
+            states[key] = state
+            save_states(state_file, states)
+    return state or FollowState()
@@ -0,0 +1,305 @@
+import base64
+import codecs
+import csv
+import json
+import mmap
+import os
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.loaders import detect_format, normalize_record, sniff_delimiter
+from src.logger_config import setup_logger
+
+# Создание и получение именованного логгера
+index_logger = setup_logger(__name__)
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx.json"
+INDEXED_FORMATS = ("json", "csv")
+# Размер части JSON-файла, читаемой за один раз при построении индекса
+READ_CHUNK_SIZE = 1 << 20
+
+
+def _pack(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _unpack(typecode: str, data: str) -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+class TransactionIndex:
+    """
+    Индекс файла выгрузки: байтовое смещение и длина каждой записи, а также номера записей
+    для каждого статуса и каждой валюты. Хранится рядом с исходным файлом (<файл>.idx.json).
+    """
+
+    def __init__(self, file_path: str, fmt: str, header: Optional[List[str]] = None, delimiter: str = ",") -> None:
+        self.file_path = file_path
+        self.fmt = fmt
+        self.header = header or []
+        self.delimiter = delimiter
+        self.starts = array("Q")
+        self.lengths = array("I")
+        self.by_state: Dict[str, array] = {}
+        self.by_currency: Dict[str, array] = {}
+        self.source_size = 0
+        self.source_mtime_ns = 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, length: int, state: Any, currency: Any) -> None:
+        """Добавляет запись в индекс."""
+        row = len(self.starts)
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.by_state.setdefault(str(state or "").upper(), array("I")).append(row)
+        self.by_currency.setdefault(str(currency or "").upper(), array("I")).append(row)
+
+    def rows(self, state: Optional[str] = None, currency: Optional[str] = None) -> List[int]:
+        """
+        Возвращает номера записей с заданным статусом и валютой (без учета регистра).
+
+        :param state: Статус операции.
+        :param currency: Код валюты.
+        :return: Отсортированный список номеров записей.
+        """
+        selected: Optional[set] = None
+        for values, key in ((self.by_state, state), (self.by_currency, currency)):
+            if key is None:
+                continue
+            matched = set(values.get(key.upper(), ()))
+            selected = matched if selected is None else selected & matched
+        if selected is None:
+            return list(range(len(self)))
+        return sorted(selected)
+
+    def is_fresh(self) -> bool:
+        """Проверяет, что исходный файл не менялся после построения индекса."""
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает индекс в виде словаря для сохранения в JSON."""
+        return {
+            "version": INDEX_VERSION,
+            "format": self.fmt,
+            "header": self.header,
+            "delimiter": self.delimiter,
+            "source_size": self.source_size,
+            "source_mtime_ns": self.source_mtime_ns,
+            "starts": _pack(self.starts),
+            "lengths": _pack(self.lengths),
+            "state": {key: _pack(rows) for key, rows in self.by_state.items()},
+            "currency": {key: _pack(rows) for key, rows in self.by_currency.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, file_path: str, data: Dict[str, Any]) -> "TransactionIndex":
+        """Восстанавливает индекс из словаря."""
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("Unsupported index version")
+        index = cls(file_path, data["format"], data["header"], data["delimiter"])
+        index.source_size = data["source_size"]
+        index.source_mtime_ns = data["source_mtime_ns"]
+        index.starts = _unpack("Q", data["starts"])
+        index.lengths = _unpack("I", data["lengths"])
+        index.by_state = {key: _unpack("I", rows) for key, rows in data["state"].items()}
+        index.by_currency = {key: _unpack("I", rows) for key, rows in data["currency"].items()}
+        return index
+
+
+def index_path(file_path: str) -> str:
+    """Возвращает путь к файлу индекса для исходного файла."""
+    return file_path + INDEX_SUFFIX
+
+
+def _iter_csv_rows(file_path: str) -> Iterator[Tuple[int, int, bytes]]:
+    with open(file_path, "rb") as file:
+        offset = 0
+        for line in file:
+            yield offset, len(line), line
+            offset += len(line)
+
+
+def _build_csv_index(file_path: str) -> TransactionIndex:
+    rows = _iter_csv_rows(file_path)
+    header_line = next(rows, (0, 0, b""))[2].decode("utf-8-sig").rstrip("\r\n")
+    delimiter = sniff_delimiter(header_line)
+    header = next(csv.reader([header_line], delimiter=delimiter), [])
+    index = TransactionIndex(file_path, "csv", header, delimiter)
+    state_column = header.index("state") if "state" in header else None
+    currency_column = header.index("currency_code") if "currency_code" in header else None
+    for start, length, line in rows:
+        text = line.decode("utf-8").rstrip("\r\n")
+        if not text.strip(delimiter + " "):
+            continue
+        row = next(csv.reader([text], delimiter=delimiter))
+        state = row[state_column] if state_column is not None and state_column < len(row) else None
+        currency = row[currency_column] if currency_column is not None and currency_column < len(row) else None
+        index.add(start, length, state, currency)
+    return index
+
+
+def _build_json_index(file_path: str) -> TransactionIndex:
+    # Файл читается в двоичном режиме частями по READ_CHUNK_SIZE байт: в текстовом режиме \r\n заменяется на \n
+    # и смещения перестают совпадать. В памяти держится только еще не разобранный хвост прочитанного текста.
+    index = TransactionIndex(file_path, "json")
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    text = ""
+    position = 0
+    byte_position = 0
+    eof = False
+    with open(file_path, "rb") as file:
+
+        def read_more() -> None:
+            nonlocal text, position, eof
+            data = file.read(READ_CHUNK_SIZE)
+            eof = not data
+            text = text[position:] + utf8.decode(data, final=eof)
+            position = 0
+
+        # Пропускаем все до начала массива
+        while "[" not in text[position:] and not eof:
+            byte_position += len(text[position:].encode("utf-8"))
+            position = len(text)
+            read_more()
+        if "[" not in text[position:]:
+            return index
+        next_position = text.index("[", position) + 1
+        byte_position += len(text[position:next_position].encode("utf-8"))
+        position = next_position
+        while True:
+            # Пропускаем пробелы и запятые между объектами массива
+            next_position = position
+            while next_position < len(text) and text[next_position] in " \t\r\n,":
+                next_position += 1
+            byte_position += next_position - position
+            position = next_position
+            if position >= len(text):
+                if eof:
+                    break
+                read_more()
+                continue
+            if text[position] == "]":
+                break
+            try:
+                record, end = decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                # Запись не закончилась в прочитанной части — дочитываем файл (в конце файла ошибка настоящая)
+                if eof:
+                    raise
+                read_more()
+                continue
+            if end == len(text) and not eof:
+                # Значение может продолжаться в следующей части файла
+                read_more()
+                continue
+            length = len(text[position:end].encode("utf-8"))
+            if isinstance(record, dict) and record:
+                currency = ((record.get("operationAmount") or {}).get("currency") or {}).get("code")
+                index.add(byte_position, length, record.get("state"), currency)
+            byte_position += length
+            position = end
+    return index
+
+
+def build_index(file_path: str, save: bool = True) -> TransactionIndex:
+    """
+    Строит индекс файла за один полный проход и сохраняет его рядом с файлом.
+
+    :param file_path: Путь к JSON- или CSV-файлу.
+    :param save: Сохранить индекс в <файл>.idx.json.
+    :return: Индекс.
+    """
+    fmt = detect_format(file_path)
+    if fmt not in INDEXED_FORMATS:
+        raise ValueError(f"Index is not supported for format: {fmt}")
+    stat = os.stat(file_path)
+    index = _build_csv_index(file_path) if fmt == "csv" else _build_json_index(file_path)
+    index.source_size = stat.st_size
+    index.source_mtime_ns = stat.st_mtime_ns
+    if save:
+        try:
+            with open(index_path(file_path), "w", encoding="utf-8") as file:
+                json.dump(index.to_dict(), file)
+        except OSError as e:
+            # Например, папка только для чтения: индекс используется без сохранения
+            index_logger.warning(f"Error saving index {index_path(file_path)}: {e}")
+        else:
+            index_logger.info(f"Index built for {file_path}: {len(index)} rows")
+    return index
+
+
+def get_index(file_path: str, build: bool = True) -> Optional[TransactionIndex]:
+    """
+    Возвращает актуальный индекс файла: загружает сохраненный или строит новый, если файл изменился.
+
+    :param file_path: Путь к исходному файлу.
+    :param build: Построить индекс, если его нет или он устарел.
+    :return: Индекс или None.
+    """
+    path = index_path(file_path)
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as file:
+                index = TransactionIndex.from_dict(file_path, json.load(file))
+            if index.is_fresh():
+                return index
+            index_logger.info(f"Index is outdated: {path}")
+        except (OSError, ValueError, KeyError) as e:
+            index_logger.warning(f"Error reading index {path}: {e}")
+    return build_index(file_path) if build else None
+
+
+def read_rows(index: TransactionIndex, rows: List[int]) -> List[Dict[str, Any]]:
+    """
+    Читает из исходного файла только указанные записи (файл отображается в память, записи берутся по смещениям).
+
+    :param index: Индекс файла.
+    :param rows: Номера записей в порядке возрастания.
+    :return: Нормализованные транзакции.
+    """
+    if not rows:
+        return []
+    transactions = []
+    starts, lengths = index.starts, index.lengths
+    with open(index.file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for row in rows:
+            start = starts[row]
+            data = mm[start:start + lengths[row]].decode("utf-8")
+            if index.fmt == "csv":
+                data = data.rstrip("\r\n")
+                if '"' in data:
+                    values = next(csv.reader([data], delimiter=index.delimiter), [])
+                else:
+                    values = data.split(index.delimiter)
+                record = normalize_record(dict(zip(index.header, values)))
+            else:
+                record = normalize_record(json.loads(data))
+            if record is not None:
+                transactions.append(record)
+    return transactions
+
+
+def load_indexed(file_path: str, state: Optional[str] = None, currency: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Загружает только операции с заданным статусом и валютой, используя индекс файла.
+    При первом запросе индекс строится и сохраняется, последующие запросы читают лишь нужные записи.
+
+    :param file_path: Путь к JSON- или CSV-файлу.
+    :param state: Статус операции (EXECUTED, CANCELED, PENDING).
+    :param currency: Код валюты.
+    :return: Нормализованные транзакции в порядке следования в файле.
+    """
+    index = get_index(file_path, build=False)
+    if index is None:
+        index = build_index(file_path)
+    return read_rows(index, index.rows(state, currency))
@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional
+
+# Максимальное число различных значений, при котором колонка считается низкокардинальной
+DEFAULT_CARDINALITY_THRESHOLD = 1024
+
+# Поля нормализованной записи, значения которых кодируются словарем
+ENCODED_FIELDS = ("state", "description")
+ENCODED_CURRENCY_FIELDS = ("name", "code")
+
+
+class StringPool:
+    """
+    Словарь значений одной колонки: одинаковые строки заменяются одним объектом, каждому значению
+    присваивается небольшой целочисленный код. Если различных значений становится больше порога,
+    колонка считается высококардинальной и новые значения больше не добавляются.
+    """
+
+    __slots__ = ("max_cardinality", "codes", "values", "overflowed")
+
+    def __init__(self, max_cardinality: int = DEFAULT_CARDINALITY_THRESHOLD) -> None:
+        self.max_cardinality = max_cardinality
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+        self.overflowed = False
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: Any) -> Any:
+        """
+        Возвращает канонический объект для значения.
+
+        :param value: Значение колонки.
+        :return: Уже сохраненная в словаре строка или само значение.
+        """
+        if type(value) is not str:
+            # Числа, словари и списки не кодируются (словари и списки к тому же нехешируемы)
+            return value
+        code = self.codes.get(value)
+        if code is not None:
+            return self.values[code]
+        if self.overflowed:
+            return value
+        if len(self.values) >= self.max_cardinality:
+            self.overflowed = True
+            return value
+        self.codes[value] = len(self.values)
+        self.values.append(value)
+        return value
+
+
+class EqualsIgnoreCase(Dict[Any, bool]):
+    """
+    Проверка равенства значений колонки строке без учета регистра с запоминанием результата
+    для каждого различного значения: для закодированных загрузчиком колонок lower() вызывается один раз
+    на значение, а повторные проверки — поиск в словаре, где одинаковые объекты сравниваются по идентичности.
+    Запоминается не больше max_cardinality значений. Значения, не являющиеся строками (None, числа,
+    словари и списки), строке не равны.
+    """
+
+    def __init__(self, target: str, max_cardinality: int = DEFAULT_CARDINALITY_THRESHOLD) -> None:
+        super().__init__()
+        self.target = target.lower()
+        self.max_cardinality = max_cardinality
+
+    def __missing__(self, value: Any) -> bool:
+        result = type(value) is str and value.lower() == self.target
+        if len(self) < self.max_cardinality:
+            self[value] = result
+        return result
+
+    def __call__(self, value: Any) -> bool:
+        """Проверяет одно значение; для значений, не являющихся строками, возвращает False."""
+        if type(value) is not str:
+            return False
+        return bool(self[value])
+
+    def mask(self, values: List[Any]) -> List[bool]:
+        """
+        Проверяет колонку значений: для хешируемых значений — поиском в словаре без вызова метода на строку.
+
+        :param values: Значения колонки.
+        :return: Список признаков равенства в порядке значений.
+        """
+        try:
+            return list(map(self.__getitem__, values))
+        except TypeError:
+            # В колонке есть нехешируемое значение (список, словарь): такие значения проверяются по одному
+            return list(map(self, values))
+
+
+class RecordEncoder:
+    """Набор словарей для повторяющихся полей нормализованных записей одного файла."""
+
+    def __init__(self, max_cardinality: int = DEFAULT_CARDINALITY_THRESHOLD) -> None:
+        self.pools = {field: StringPool(max_cardinality) for field in ENCODED_FIELDS}
+        self.currency_pools = {field: StringPool(max_cardinality) for field in ENCODED_CURRENCY_FIELDS}
+
+    def encode(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Заменяет строки статуса, описания и валюты каноническими объектами (запись изменяется на месте).
+
+        :param record: Нормализованная транзакция.
+        :return: Та же запись.
+        """
+        for field, pool in self.pools.items():
+            value = record.get(field)
+            if value is not None:
+                record[field] = pool.intern(value)
+        currency = (record.get("operationAmount") or {}).get("currency")
+        if isinstance(currency, dict):
+            for field, pool in self.currency_pools.items():
+                value = currency.get(field)
+                if value is not None:
+                    currency[field] = pool.intern(value)
+        return record
+
+    def cardinality(self) -> Dict[str, Optional[int]]:
+        """Количество различных значений по полям (None — порог превышен)."""
+        pools = {**self.pools, **{f"currency_{field}": pool for field, pool in self.currency_pools.items()}}
+        return {field: None if pool.overflowed else len(pool) for field, pool in pools.items()}
@@ -0,0 +1,420 @@
+import bz2
+import csv
+import gzip
+import importlib.util
+import json
+import lzma
+import math
+import os
+import sys
+import time
+import zipfile
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+
+from src.interning import DEFAULT_CARDINALITY_THRESHOLD, RecordEncoder
+from src.logger_config import setup_logger
+from src.records import Transaction
+
+# Создание и получение именованного логгера
+loaders_logger = setup_logger(__name__)
+
+NOT_SPECIFIED = "Не указана"
+
+# Исключения, которые означают, что файл не удалось прочитать как выгрузку транзакций
+# (поврежденный gzip — OSError, обрезанный архив — EOFError)
+LOAD_ERRORS = (OSError, ValueError, csv.Error, zipfile.BadZipFile, EOFError, lzma.LZMAError)
+
+EXTENSIONS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".xlsx": "xlsx"}
+
+# Сжатые выгрузки (operations.json.gz, transactions.csv.xz) распознаются по сигнатуре в начале файла
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "xz", b"BZh": "bz2"}
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".xz": "xz", ".bz2": "bz2"}
+_OPENERS: Dict[str, Callable[..., IO[Any]]] = {"gzip": gzip.open, "xz": lzma.open, "bz2": bz2.open}
+
+Loader = Callable[[str], Iterator[Dict[str, Any]]]
+
+
+class LoaderEngine:
+    """Зарегистрированный способ чтения файлов одного формата."""
+
+    def __init__(self, fmt: str, name: str, func: Loader, priority: int, requires: Optional[str]) -> None:
+        self.fmt = fmt
+        self.name = name
+        self.func = func
+        self.priority = priority
+        self.requires = requires
+
+    def is_available(self) -> bool:
+        """Проверяет, что библиотека, необходимая движку, установлена."""
+        return self.requires is None or importlib.util.find_spec(self.requires) is not None
+
+
+_registry: Dict[str, Dict[str, LoaderEngine]] = {}
+
+# Порог кардинальности для словарного кодирования статуса, описания и валюты (0 — кодирование выключено)
+_intern_threshold = DEFAULT_CARDINALITY_THRESHOLD
+
+
+def register_loader(fmt: str, name: str, priority: int = 100, requires: Optional[str] = None) -> Callable:
+    """
+    Декоратор для регистрации движка чтения файлов заданного формата.
+
+    :param fmt: Формат файла (json, csv, xlsx).
+    :param name: Имя движка.
+    :param priority: Приоритет движка: при автоматическом выборе используется доступный движок с меньшим значением.
+    :param requires: Имя модуля, без которого движок недоступен.
+    :return: Декоратор, возвращающий функцию без изменений.
+    """
+
+    def decorator(func: Loader) -> Loader:
+        _registry.setdefault(fmt, {})[name] = LoaderEngine(fmt, name, func, priority, requires)
+        return func
+
+    return decorator
+
+
+def available_engines(fmt: str) -> List[str]:
+    """
+    Возвращает имена доступных движков для формата в порядке приоритета.
+
+    :param fmt: Формат файла.
+    :return: Список имен движков.
+    """
+    engines = [engine for engine in _registry.get(fmt, {}).values() if engine.is_available()]
+    return [engine.name for engine in sorted(engines, key=lambda engine: engine.priority)]
+
+
+def set_engine_order(fmt: str, names: List[str]) -> None:
+    """
+    Задает порядок выбора движков для формата (например, по результатам benchmark_engines).
+
+    :param fmt: Формат файла.
+    :param names: Имена движков от самого предпочтительного к наименее предпочтительному.
+    """
+    for priority, name in enumerate(names):
+        _registry[fmt][name].priority = priority
+
+
+def set_intern_threshold(threshold: int) -> None:
+    """
+    Задает порог кардинальности для словарного кодирования повторяющихся полей при загрузке.
+    Пока различных значений в поле файла не больше порога, одинаковые строки заменяются одним объектом.
+
+    :param threshold: Максимальное число различных значений поля (0 — не кодировать).
+    """
+    global _intern_threshold
+    _intern_threshold = threshold
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Определяет сжатие файла по сигнатуре (magic bytes), а не по расширению.
+
+    :param file_path: Путь к файлу.
+    :return: 'gzip', 'xz', 'bz2' или None для несжатого файла.
+    """
+    with open(file_path, "rb") as file:
+        head = file.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def source_extension(file_path: str) -> str:
+    """
+    Возвращает расширение формата без расширения сжатия: 'operations.json.gz' -> '.json'.
+
+    :param file_path: Путь к файлу.
+    :return: Расширение в нижнем регистре.
+    """
+    root, extension = os.path.splitext(file_path.lower())
+    if extension in COMPRESSION_EXTENSIONS:
+        extension = os.path.splitext(root)[1]
+    return extension
+
+
+def open_input(file_path: str, encoding: str = "utf-8", newline: Optional[str] = None) -> IO[str]:
+    """
+    Открывает выгрузку как текст; сжатый файл распаковывается потоком по мере чтения,
+    без промежуточного распакованного файла и без чтения архива в память целиком.
+
+    :param file_path: Путь к файлу.
+    :param encoding: Кодировка текста.
+    :param newline: Режим перевода строк (как у open; для csv — '').
+    :return: Текстовый файловый объект.
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "r", encoding=encoding, newline=newline)
+    return _OPENERS[compression](file_path, "rt", encoding=encoding, newline=newline)
+
+
+def detect_format(file_path: str) -> str:
+    """
+    Определяет формат файла по расширению, а если оно неизвестно — по содержимому
+    (у сжатых файлов — по распакованному началу).
+
+    :param file_path: Путь к файлу.
+    :return: Формат файла: json, jsonl, csv или xlsx.
+    """
+    extension = source_extension(file_path)
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+
+    compression = detect_compression(file_path)
+    opener = _OPENERS[compression] if compression else open
+    with opener(file_path, "rb") as file:
+        head = file.read(4096)
+    if head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    first = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+    if first == b"[":
+        return "json"
+    if first == b"{":
+        # JSON-выгрузка банка — список, отдельный объект в начале файла означает JSON Lines
+        return "jsonl"
+    return "csv"
+
+
+def sniff_delimiter(header_line: str) -> str:
+    """
+    Определяет разделитель CSV по строке заголовка: выгрузки банка используют ';', сторонние файлы — ','.
+
+    :param header_line: Первая строка CSV-файла.
+    :return: Символ-разделитель.
+    """
+    return max((";", ",", "\t"), key=header_line.count) if header_line.strip() else ","
+
+
+def normalize_id(value: Any) -> Any:
+    """Приводит идентификатор операции к int, если это возможно."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return value
+
+
+def normalize_amount(value: Any) -> Any:
+    """Приводит сумму к строке, как в JSON-выгрузке: XLSX отдает числа, CSV и JSON — строки."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def normalize_record(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Приводит запись к единому виду JSON-выгрузки: сумма и валюта вложены в operationAmount.
+    Сумма не разбирается и в запись не добавляется: копейки считает amounts.get_amount_minor
+    (у компактных записей records.Transaction — один раз при создании).
+
+    :param row: Запись из любого источника (вложенная или плоская).
+    :return: Нормализованная запись или None, если запись пустая.
+    """
+    row = {key: value for key, value in row.items() if key is not None and value is not None and value != ""}
+    if not row:
+        return None
+    if "id" in row:
+        row["id"] = normalize_id(row["id"])
+    if "operationAmount" not in row:
+        row["operationAmount"] = {
+            "amount": normalize_amount(row.pop("amount", NOT_SPECIFIED)),
+            "currency": {
+                "name": row.pop("currency_name", NOT_SPECIFIED),
+                "code": row.pop("currency_code", NOT_SPECIFIED),
+            },
+        }
+    return row
+
+
+def _normalized(rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    encoder = RecordEncoder(_intern_threshold) if _intern_threshold > 0 else None
+    for row in rows:
+        record = normalize_record(row)
+        if record is not None:
+            yield encoder.encode(record) if encoder is not None else record
+
+
+def _drop_nan(rows: List[Dict[Any, Any]]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        yield {key: value for key, value in row.items() if not (isinstance(value, float) and math.isnan(value))}
+
+
+@register_loader("json", "stdlib", priority=0)
+def _load_json_stdlib(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open_input(file_path) as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise ValueError(f"Invalid data format in file: {file_path}")
+    return _normalized(row for row in data if isinstance(row, dict))
+
+
+def _json_lines(file: Any, file_path: str) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError(f"Invalid data format in file: {file_path}, line {number}")
+        yield row
+
+
+@register_loader("jsonl", "stdlib", priority=0)
+def _load_jsonl_stdlib(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open_input(file_path, encoding="utf-8-sig") as file:
+        yield from _normalized(_json_lines(file, file_path))
+
+
+@register_loader("csv", "stdlib", priority=0)
+def _load_csv_stdlib(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open_input(file_path, newline="") as file:
+        delimiter = sniff_delimiter(file.readline())
+        # У сжатого файла seek(0) перезапускает распаковку, прочитано к этому моменту только начало файла
+        file.seek(0)
+        yield from _normalized(csv.DictReader(file, delimiter=delimiter))
+
+
+@register_loader("csv", "pandas", priority=10, requires="pandas")
+def _load_csv_pandas(file_path: str) -> Iterator[Dict[str, Any]]:
+    import pandas as pd  # type: ignore[import-untyped]
+
+    with open_input(file_path) as file:
+        delimiter = sniff_delimiter(file.readline())
+        file.seek(0)
+        df = pd.read_csv(file, sep=delimiter, dtype=str, keep_default_na=False)
+    return _normalized(_drop_nan(df.to_dict(orient="records")))
+
+
+@register_loader("xlsx", "openpyxl", priority=0, requires="openpyxl")
+def _load_xlsx_openpyxl(file_path: str) -> Iterator[Dict[str, Any]]:
+    import openpyxl  # type: ignore[import-untyped]
+    from openpyxl.utils.exceptions import InvalidFileException  # type: ignore[import-untyped]
+
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except InvalidFileException as e:
+        raise ValueError(str(e)) from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = next(rows, None) or ()
+        yield from _normalized(dict(zip(headers, row)) for row in rows)
+    finally:
+        workbook.close()
+
+
+@register_loader("xlsx", "pandas", priority=10, requires="pandas")
+def _load_xlsx_pandas(file_path: str) -> Iterator[Dict[str, Any]]:
+    import pandas as pd
+
+    df = pd.read_excel(file_path)
+    return _normalized(_drop_nan(df.to_dict(orient="records")))
+
+
+def _get_engine(fmt: str, engine: Optional[str] = None) -> LoaderEngine:
+    engines = _registry.get(fmt)
+    if not engines:
+        raise ValueError(f"Unsupported file format: {fmt}")
+    if engine is not None:
+        if engine not in engines or not engines[engine].is_available():
+            raise ValueError(f"Loader engine is not available: {fmt}/{engine}")
+        return engines[engine]
+    names = available_engines(fmt)
+    if not names:
+        raise ValueError(f"No loader engine available for format: {fmt}")
+    return engines[names[0]]
+
+
+def preload_engine(fmt: str, engine: Optional[str] = None) -> str:
+    """
+    Импортирует библиотеку движка заранее, чтобы время и память импорта не попадали в замеры загрузки.
+
+    :param fmt: Формат файла.
+    :param engine: Имя движка (по умолчанию самый быстрый из доступных).
+    :return: Имя движка.
+    """
+    loader = _get_engine(fmt, engine)
+    if loader.requires is not None:
+        importlib.import_module(loader.requires)
+    return loader.name
+
+
+def iter_transactions(file_path: str, fmt: Optional[str] = None, engine: Optional[str] = None,
+                      compact: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Читает файл с транзакциями любого поддерживаемого формата и возвращает итератор нормализованных записей.
+    Ошибки чтения не перехватываются (см. LOAD_ERRORS).
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат файла (по умолчанию определяется автоматически).
+    :param engine: Имя движка (по умолчанию самый быстрый из доступных).
+    :param compact: Возвращать компактные записи records.Transaction вместо словарей.
+    :return: Итератор транзакций.
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt == "xlsx" and detect_compression(file_path):
+        # XLSX — уже zip-архив, openpyxl и pandas читают его только с произвольным доступом
+        raise ValueError(f"Compressed XLSX files are not supported: {file_path}")
+    loader = _get_engine(fmt, engine)
+    if compact:
+        return map(Transaction.from_record, loader.func(file_path))
+    return iter(loader.func(file_path))
+
+
+def load_transactions(file_path: str, fmt: Optional[str] = None, engine: Optional[str] = None,
+                      compact: bool = False) -> List[Dict[str, Any]]:
+    """
+    Загружает транзакции из файла любого поддерживаемого формата.
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат файла (по умолчанию определяется автоматически).
+    :param engine: Имя движка (по умолчанию самый быстрый из доступных).
+    :param compact: Возвращать компактные записи records.Transaction вместо словарей.
+    :return: Список нормализованных транзакций или пустой список при ошибке.
+    """
+    if not os.path.isfile(file_path):
+        loaders_logger.warning(f"File does not exist: {file_path}")
+        print(f"Ошибка: {file_path} не является файлом.")
+        return []
+    try:
+        transactions = list(iter_transactions(file_path, fmt, engine, compact))
+    except LOAD_ERRORS as e:
+        loaders_logger.error(f"Error reading file {file_path}: {e}")
+        print(f"Ошибка при загрузке файла: {e}")
+        return []
+    loaders_logger.info(f"Successfully read file: {file_path}")
+    return transactions
+
+
+def benchmark_engines(file_path: str, fmt: Optional[str] = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    Замеряет время чтения файла каждым доступным движком его формата.
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат файла (по умолчанию определяется автоматически).
+    :param repeat: Количество повторов, в результат попадает лучшее время.
+    :return: Словарь {имя движка: время в секундах}, отсортированный по возрастанию времени.
+    """
+    fmt = fmt or detect_format(file_path)
+    timings = {}
+    for name in available_engines(fmt):
+        best = math.inf
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in iter_transactions(file_path, fmt, name):
+                pass
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+    return dict(sorted(timings.items(), key=lambda item: item[1]))
+
+
+if __name__ == "__main__":
+    # python -m src.loaders FILE... — сравнение движков для каждого файла
+    for path in sys.argv[1:]:
+        results = benchmark_engines(path)
+        print(f"{path} ({detect_format(path)}):")
+        for engine_name, seconds in results.items():
+            print(f"  {engine_name:<10} {seconds * 1000:9.2f} ms")
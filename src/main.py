@@ -1,86 +1,433 @@
+import argparse
 import csv
 import json
 import os
-from datetime import datetime
+import sys
+import time
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import compress
+from typing import IO, Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-import openpyxl
+from src import external_api, utils
+from src.aggregations import GROUP_KEYS, Aggregator
+from src.amounts import get_amount_minor, get_currency_code, to_decimal
+from src.dedup import Deduplicator
+from src.exporters import open_exporter
+from src.follow import FollowState, load_states, read_appended, save_states
+from src.index import INDEXED_FORMATS, load_indexed
+from src.interning import EqualsIgnoreCase
+from src.loaders import LOAD_ERRORS, detect_compression, detect_format, set_intern_threshold
+from src.memprofile import profile
+from src.pipeline import expand_inputs
+from src.preview import format_preview, preview_file
+from src.processing import filter_rub
+from src.records import as_export_dict, date_sort_key
+from src.scan import scan_csv
+from src.utils import (load_transactions_from_csv, load_transactions_from_json, load_transactions_from_jsonl,
+                       load_transactions_from_xlsx)
 
-import utils
+EXIT_OK = 0
+EXIT_LOAD_ERROR = 1
 
 
-def load_transactions_from_json(file_path='data/operations.json'):
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
+def filter_transactions_by_status(transactions, status):
+    states = [transaction.get('state') for transaction in transactions]
+    return list(compress(transactions, EqualsIgnoreCase(status).mask(states)))
+
+
+def format_transaction(transaction: Dict[str, Any], amount_in_rub: Optional[float] = None) -> str:
+    """Возвращает текстовое представление операции в формате вывода программы."""
+    date = transaction.get('date', 'Не указана')
+    description = transaction.get('description', 'Не указано')
+    from_account = transaction.get('from', 'Не указано')
+    to_account = transaction.get('to', 'Не указано')
+    amount = transaction.get('operationAmount', {}).get('amount', 'Не указана')
+    currency = str(transaction.get('operationAmount', {}).get('currency', {}).get('code', 'Не указана')).upper()
+    text = (f"{date} {description}\n"
+            f"Счет: {from_account} -> {to_account}\n"
+            f"Сумма: {amount} {currency}\n")
+    if amount_in_rub is not None:
+        text += f"Сумма в рублях: {amount_in_rub:.2f} RUB\n"
+    return text
+
+
+LOADERS_BY_SOURCE = {
+    'json': load_transactions_from_json,
+    'jsonl': load_transactions_from_jsonl,
+    'csv': load_transactions_from_csv,
+    'xlsx': load_transactions_from_xlsx,
+}
+
+CSV_OUTPUT_FIELDS = ['id', 'state', 'date', 'amount', 'currency_name', 'currency_code', 'from', 'to', 'description']
+
+# Кэш загруженных файлов: ключ (абсолютный путь, источник, mtime, размер)
+_loaded_files_cache: Dict[Tuple[str, str, int, int, bool], List[Dict[str, Any]]] = {}
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Создает парсер аргументов командной строки для пакетного режима."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.main',
+        description='Пакетная обработка банковских транзакций без интерактивного меню.',
+    )
+    parser.add_argument('inputs', nargs='+', help='Пути к файлам или glob-шаблоны (например, "exports/*.csv").')
+    parser.add_argument('--source', choices=['auto', 'json', 'jsonl', 'csv', 'xlsx'], default='auto',
+                        help='Тип исходных файлов (по умолчанию определяется по расширению).')
+    parser.add_argument('--status', type=str.lower, choices=['executed', 'canceled', 'pending'],
+                        help='Статус операций для фильтрации.')
+    parser.add_argument('--sort', choices=['asc', 'desc'], help='Сортировка операций по дате.')
+    parser.add_argument('--rub-only', action='store_true', help='Выводить только рублевые транзакции.')
+    parser.add_argument('--search', action='append',
+                        help='Строка для поиска в описании операции (можно указать несколько раз).')
+    parser.add_argument('--search-any', action='store_true',
+                        help='Для нескольких --search: искать операции хотя бы с одной строкой '
+                             '(по умолчанию — со всеми).')
+    parser.add_argument('--format', choices=['text', 'json', 'csv'], dest='output_format',
+                        help='Формат вывода результата в stdout (по умолчанию text).')
+    parser.add_argument('--output', metavar='FILE',
+                        help='Записать операции в файл вместо stdout: CSV, JSON Lines (.jsonl) или XLSX '
+                             '(формат — по расширению, --format и --in-rub не применяются). '
+                             'Без --sort строки записываются по мере обработки файлов.')
+    parser.add_argument('--in-rub', action='store_true',
+                        help='Добавить сумму в рублях (курсы запрашиваются один раз на валюту).')
+    parser.add_argument('--rates', metavar='FILE',
+                        help='Таблица исторических курсов (CSV/JSON: date, currency, rate) для --in-rub: '
+                             'суммы пересчитываются по курсу на дату операции (по умолчанию EXCHANGE_RATES_FILE).')
+    parser.add_argument('--offline', action='store_true',
+                        help='Не обращаться к API курсов: операции без курса в таблице выводятся без суммы в рублях.')
+    parser.add_argument('--state-file', metavar='FILE',
+                        help='Файл с позициями чтения: CSV-файлы читаются только с места, где остановился '
+                             'предыдущий запуск (остальные форматы читаются целиком).')
+    parser.add_argument('--use-index', action='store_true',
+                        help='Использовать индекс статусов и валют (<файл>.idx.json, строится при первом запуске), '
+                             'чтобы читать из JSON/CSV-файлов только подходящие строки.')
+    parser.add_argument('--engine', choices=['load', 'scan'], default='load',
+                        help='Способ чтения CSV-файлов: load — полная загрузка (по умолчанию), '
+                             'scan — просмотр через mmap, в словари разбираются только строки, подходящие '
+                             'под --status, --rub-only и единственный --search.')
+    parser.add_argument('--group-by', type=parse_group_keys, metavar='KEYS',
+                        help='Вывести итоги по группам вместо операций, например: month,currency '
+                             '(доступны state, currency, month, category; currency добавляется всегда).')
+    parser.add_argument('--compact', action='store_true',
+                        help='Хранить загруженные операции в компактных записях Transaction '
+                             '(меньше памяти на строку).')
+    parser.add_argument('--intern-threshold', type=int, metavar='N',
+                        help='Порог кардинальности для словарного кодирования статуса, описания и валюты при загрузке '
+                             '(по умолчанию 1024, 0 — не кодировать).')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Удалить повторяющиеся операции из всех файлов (по id, без id — по содержимому).')
+    parser.add_argument('--dedup-error-rate', type=float, metavar='RATE',
+                        help='Проверять ключи фильтром Блума с заданной долей ошибок (например, 0.001) '
+                             'перед точным множеством: новые операции отсеиваются без поиска в таблице, '
+                             'результат остается точным.')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='Вывести в stderr пиковую память, байт на строку и основные места выделения памяти '
+                             'при загрузке каждого файла.')
+    return parser
+
+
+def parse_group_keys(value: str) -> List[str]:
+    """Разбирает список полей группировки из аргумента командной строки."""
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in GROUP_KEYS]
+    if not keys or unknown:
+        raise argparse.ArgumentTypeError(f"Недопустимые поля группировки: {value}")
+    return keys
+
+
+def detect_source(file_path: str, source: str = 'auto') -> Optional[str]:
+    """Определяет тип файла по расширению или содержимому, если он не задан явно."""
+    if source != 'auto':
+        return source
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            transactions = json.load(f)
-            if not isinstance(transactions, list):
-                return []
-            return transactions
-    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
-
-
-def load_transactions_from_csv(file_path='data/transactions.csv'):
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
+        return detect_format(file_path)
+    except OSError:
+        return None
+
+
+def is_compressed(file_path: str) -> bool:
+    """Проверяет, сжат ли файл (gzip, xz, bz2); недоступный файл считается несжатым."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter=';')
-            transactions = []
-            for row in reader:
-                row['operationAmount'] = {
-                    'amount': row.pop('amount', 'Не указана'),
-                    'currency': {
-                        'name': row.pop('currency_name', 'Не указана'),
-                        'code': row.pop('currency_code', 'Не указана')
-                    }
-                }
-                transactions.append(row)
-            return transactions
-    except (FileNotFoundError, csv.Error, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
-
-
-def load_transactions_from_xlsx(file_path='data/transactions_excel.xlsx'):
-    """Загрузка транзакций из XLSX-файла"""
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
+        return detect_compression(file_path) is not None
+    except OSError:
+        return False
+
+
+def load_transactions_cached(file_path: str, source: str, compact: bool = False) -> List[Dict[str, Any]]:
+    """
+    Загружает транзакции, повторно используя результат для уже прочитанного неизмененного файла.
+    """
     try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook.active
-        transactions = []
-        headers = [cell.value for cell in sheet[1]]
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            transaction = {headers[i]: row[i] for i in range(len(headers))}
-            # Ensure amount and currency_code are inside a nested dictionary like JSON
-            transaction['operationAmount'] = {
-                'amount': transaction.pop('amount', 'Не указана'),
-                'currency': {
-                    'name': transaction.pop('currency_name', 'Не указана'),
-                    'code': transaction.pop('currency_code', 'Не указана')
-                }
-            }
-            transactions.append(transaction)
+        stat = os.stat(file_path)
+    except OSError:
+        return LOADERS_BY_SOURCE[source](file_path, compact=compact)
+    key = (os.path.abspath(file_path), source, stat.st_mtime_ns, stat.st_size, compact)
+    if key not in _loaded_files_cache:
+        _loaded_files_cache[key] = LOADERS_BY_SOURCE[source](file_path, compact=compact)
+    return _loaded_files_cache[key]
+
+
+def apply_filters(transactions: List[Dict[str, Any]], status: Optional[str] = None, rub_only: bool = False,
+                  search: Optional[List[str]] = None, search_mode: str = 'all') -> List[Dict[str, Any]]:
+    """
+    Применяет фильтры пакетного режима в том же порядке, что и интерактивное меню.
+    Поиск выполняется по колонке описаний, приведенных casefold(): каждое различное описание
+    приводится один раз, а строки ищутся обычной проверкой in.
+    """
+    if status:
+        transactions = filter_transactions_by_status(transactions, status)
+    if rub_only:
+        transactions = filter_rub(transactions)
+    if search:
+        transactions = utils.search_transactions(transactions, search, search_mode,
+                                                 folded=utils.casefold_descriptions(transactions))
+    return transactions
+
+
+def amount_in_rub(transaction: Dict[str, Any]) -> Optional[float]:
+    """Возвращает сумму операции в рублях, используя кэшированный курс валюты."""
+    amount_minor = get_amount_minor(transaction)
+    if amount_minor is None:
+        return None
+    amount = float(to_decimal(amount_minor))
+    currency = (get_currency_code(transaction) or 'RUB').upper()
+    if currency == 'RUB':
+        return amount
+    return amount * external_api.get_exchange_rate(currency)
+
+
+def amounts_in_rub(transactions: Sequence[Dict[str, Any]], rates: Optional[external_api.RateTable] = None,
+                   online_fallback: bool = True) -> List[Optional[float]]:
+    """
+    Возвращает суммы операций в рублях одним проходом.
+
+    С таблицей курсов (external_api.RateTable) суммы пересчитываются по курсу на дату операции без сети;
+    операции, для которых курса в таблице нет, пересчитываются по текущему курсу API (если разрешено).
+    """
+    if rates is None:
+        if online_fallback:
+            return [amount_in_rub(transaction) for transaction in transactions]
+        # Без таблицы и без сети в рублях можно показать только рублевые операции
+        rates = external_api.RateTable()
+    amounts = rates.convert_many(transactions)
+    if online_fallback:
+        for position, transaction in enumerate(transactions):
+            if amounts[position] is None and get_amount_minor(transaction) is not None:
+                amounts[position] = amount_in_rub(transaction)
+    return amounts
+
+
+def write_output(transactions: Sequence[Dict[str, Any]], output_format: str, with_rub: bool = False,
+                 stream: Optional[IO[str]] = None, rates: Optional[external_api.RateTable] = None,
+                 online_fallback: bool = True) -> None:
+    """Выводит итоговый список транзакций в выбранном формате."""
+    stream = stream or sys.stdout
+    rub = amounts_in_rub(transactions, rates, online_fallback) if with_rub else [None] * len(transactions)
+    if output_format == 'json':
+        records = []
+        for transaction, amount_rub in zip(transactions, rub):
+            record = as_export_dict(transaction)
+            if with_rub:
+                record['amount_rub'] = amount_rub
+            records.append(record)
+        json.dump(records, stream, ensure_ascii=False, indent=2, default=str)
+        stream.write('\n')
+    elif output_format == 'csv':
+        fields = CSV_OUTPUT_FIELDS + (['amount_rub'] if with_rub else [])
+        writer = csv.DictWriter(stream, fieldnames=fields, delimiter=';', extrasaction='ignore')
+        writer.writeheader()
+        for transaction, amount_rub in zip(transactions, rub):
+            operation_amount = transaction.get('operationAmount', {})
+            row = dict(transaction)
+            row['amount'] = operation_amount.get('amount')
+            row['currency_name'] = operation_amount.get('currency', {}).get('name')
+            row['currency_code'] = operation_amount.get('currency', {}).get('code')
+            if with_rub:
+                row['amount_rub'] = amount_rub
+            writer.writerow(row)
+    else:
+        for transaction, amount_rub in zip(transactions, rub):
+            stream.write(format_transaction(transaction, amount_rub) + '\n')
+
+
+def load_for_batch(file_path: str, source: str, args: argparse.Namespace,
+                   states: Optional[Dict[str, FollowState]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Загружает операции файла для пакетного режима.
+
+    - с --state-file CSV-файлы читаются только с места, где остановился предыдущий запуск;
+    - с --use-index JSON/CSV-файлы читаются через индекс, только строки с нужным статусом и валютой;
+    - с --engine scan CSV-файлы просматриваются через mmap, разбираются только строки, подходящие под фильтры;
+    - иначе файл загружается целиком (с кэшем по mtime).
+
+    :return: Список операций (в инкрементальном и индексном режимах может быть пустым)
+        или None, если файл загрузить не удалось.
+    """
+    # Смещения в байтах (дочитывание и индекс) имеют смысл только для несжатых файлов
+    compressed = is_compressed(file_path)
+    if states is not None and source == 'csv' and not compressed:
+        key = os.path.abspath(file_path)
+        transactions, states[key] = read_appended(file_path, states.get(key))
         return transactions
-    except (FileNotFoundError, openpyxl.utils.exceptions.InvalidFileException, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
+    if args.use_index and source in INDEXED_FORMATS and not compressed:
+        return load_indexed(file_path, args.status, 'RUB' if args.rub_only else None)
+    if args.engine == 'scan' and source == 'csv' and not compressed:
+        # Поиск по нескольким строкам остается за apply_filters, в просмотр передается только единственная строка
+        contains = args.search[0] if args.search and len(args.search) == 1 else None
+        return scan_csv(file_path, args.status, 'RUB' if args.rub_only else None, contains, ignore_case=True)
+    # Загрузчики сообщают об ошибках через print, в пакетном режиме они уходят в stderr
+    with redirect_stdout(sys.stderr):
+        transactions = load_transactions_cached(file_path, source, args.compact)
+    return transactions or None
 
 
-def filter_transactions_by_status(transactions, status):
-    status = status.lower()
-    filtered = []
-    for transaction in transactions:
-        state = transaction.get('state')
-        if state and state.lower() == status:
-            filtered.append(transaction)
-    return filtered
+def write_aggregates(aggregator: Aggregator, output_format: str, stream: Optional[IO[str]] = None) -> None:
+    """Выводит итоги группировки в выбранном формате."""
+    stream = stream or sys.stdout
+    rows = aggregator.rows_as_dicts()
+    if output_format == 'json':
+        json.dump(rows, stream, ensure_ascii=False, indent=2, default=str)
+        stream.write('\n')
+    elif output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=list(aggregator.keys) + ['count', 'sum', 'min', 'max', 'mean'],
+                                delimiter=';')
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            group = ' / '.join(str(row[key]) for key in aggregator.keys)
+            stream.write(f"{group}: операций {row['count']}, сумма {row['sum']}, "
+                         f"мин. {row['min']}, макс. {row['max']}, средняя {row['mean']}\n")
+
+
+def run_batch(argv: Optional[List[str]] = None) -> int:
+    """
+    Пакетный режим: обрабатывает несколько файлов за один запуск без вопросов пользователю.
+    Результат выводится в stdout, статистика и ошибки — в stderr.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:]).
+    :return: Код завершения: 0 — успешно, 1 — часть файлов не удалось загрузить.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.output and args.group_by:
+        parser.error('--output нельзя использовать вместе с --group-by')
+    if args.output and args.output_format:
+        parser.error('--output нельзя использовать вместе с --format: формат файла определяется по расширению')
+    if args.output and args.in_rub:
+        parser.error('--output нельзя использовать вместе с --in-rub')
+    if args.engine == 'scan' and args.use_index:
+        parser.error('--engine scan нельзя использовать вместе с --use-index')
+    output_format = args.output_format or 'text'
+    if args.intern_threshold is not None:
+        set_intern_threshold(args.intern_threshold)
+    started = time.perf_counter()
+    paths, unmatched = expand_inputs(args.inputs)
+    failed = list(unmatched)
+    for pattern in unmatched:
+        print(f"Ошибка: по шаблону {pattern} не найдено ни одного файла.", file=sys.stderr)
+
+    files_loaded = 0
+    rows_loaded = 0
+    rows_output = 0
+    results = []
+    aggregator = Aggregator(args.group_by) if args.group_by else None
+    states = load_states(args.state_file) if args.state_file else None
+    deduplicator = Deduplicator(bloom_error_rate=args.dedup_error_rate) \
+        if args.dedup or args.dedup_error_rate else None
+    rates = None
+    if args.in_rub and (args.rates or external_api.get_setting('RATES_FILE')):
+        try:
+            rates = external_api.get_rate_table(args.rates)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при загрузке таблицы курсов: {e}", file=sys.stderr)
+            return EXIT_LOAD_ERROR
+    exporter = None
+    if args.output:
+        try:
+            exporter = open_exporter(args.output)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при создании файла {args.output}: {e}", file=sys.stderr)
+            return EXIT_LOAD_ERROR
+    # Без сортировки операции записываются в файл сразу после обработки каждого входного файла
+    stream_output = exporter is not None and not args.sort
+    try:
+        for path in paths:
+            source = detect_source(path, args.source)
+            if source is None:
+                print(f"Ошибка: не удалось определить тип файла {path}.", file=sys.stderr)
+                failed.append(path)
+                continue
+            try:
+                if args.memprofile:
+                    transactions, report = profile(lambda: load_for_batch(path, source, args, states), f'load {path}')
+                    print(report.format(), file=sys.stderr)
+                else:
+                    transactions = load_for_batch(path, source, args, states)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"Ошибка при загрузке файла {path}: {e}", file=sys.stderr)
+                failed.append(path)
+                continue
+            if transactions is None:
+                print(f"Ошибка: не удалось загрузить транзакции из {path}.", file=sys.stderr)
+                failed.append(path)
+                continue
+            files_loaded += 1
+            rows_loaded += len(transactions)
+            if deduplicator is not None:
+                transactions = list(deduplicator.filter(transactions))
+            filtered = apply_filters(transactions, args.status, args.rub_only, args.search,
+                                     'any' if args.search_any else 'all')
+            if aggregator is not None:
+                aggregator.update(filtered)
+                rows_output += len(filtered)
+            elif stream_output and exporter is not None:
+                rows_output += exporter.write_many(filtered)
+            else:
+                results.extend(filtered)
+    except BaseException:
+        # Прерванная выгрузка не должна оставлять неполный файл
+        if exporter is not None:
+            exporter.discard()
+        raise
+
+    if states is not None:
+        save_states(args.state_file, states)
+
+    if aggregator is not None:
+        write_aggregates(aggregator, output_format)
+    elif exporter is not None:
+        with exporter:
+            if not stream_output:
+                results.sort(key=partial(date_sort_key, descending=args.sort == 'desc'))
+                rows_output = exporter.write_many(results)
+    else:
+        if args.sort:
+            results.sort(key=partial(date_sort_key, descending=args.sort == 'desc'))
+        write_output(results, output_format, with_rub=args.in_rub, rates=rates,
+                     online_fallback=not args.offline)
+        rows_output = len(results)
+
+    elapsed = time.perf_counter() - started
+    throughput = rows_loaded / elapsed if elapsed > 0 else 0.0
+    print(f"Файлов обработано: {files_loaded} из {len(paths)}, ошибок: {len(failed)}. "
+          f"Загружено строк: {rows_loaded}, выведено: {rows_output}"
+          f"{f', дубликатов: {deduplicator.duplicates}' if deduplicator is not None else ''}. "
+          f"Время: {elapsed:.3f} с ({throughput:.0f} строк/с).", file=sys.stderr)
+    return EXIT_LOAD_ERROR if failed else EXIT_OK
+
+
+def show_preview() -> None:
+    file_path = input("Введите путь к файлу выгрузки: ").strip()
+    try:
+        preview = preview_file(file_path)
+    except LOAD_ERRORS as e:
+        print(f"Не удалось прочитать файл: {e}")
+        return
+    status = input("Оценить операции с определенным статусом? Введите статус или оставьте пустым: ").strip()
+    currency = input("Оценить операции в определенной валюте? Введите код валюты или оставьте пустым: ").strip()
+    print(format_preview(preview, status or None, currency or None))
 
 
 def main():
@@ -89,6 +436,7 @@ def main():
     print("1. Получить информацию о транзакциях из JSON-файла")
     print("2. Получить информацию о транзакциях из CSV-файла")
     print("3. Получить информацию о транзакциях из XLSX-файла")
+    print("4. Быстрый приблизительный обзор файла")
 
     user_input = input("Пользователь: ").strip()
 
@@ -101,6 +449,9 @@ def main():
     elif user_input == '3':
         print("Для обработки выбран XLSX-файл.")
         transactions = load_transactions_from_xlsx()
+    elif user_input == '4':
+        show_preview()
+        return
     else:
         print("Данный тип файлов пока не поддерживается.")
         return
@@ -132,14 +483,11 @@ def main():
     if sort_by_date == 'да':
         order = input("Отсортировать по возрастанию или по убыванию? (по возрастанию/по убыванию): ").strip().lower()
         reverse_order = order == 'по убыванию'
-        filtered_transactions.sort(key=lambda x: datetime.fromisoformat(x['date'].replace('Z', '+00:00')),
-                                   reverse=reverse_order)
+        filtered_transactions.sort(key=partial(date_sort_key, descending=reverse_order))
 
     only_rub = input("Выводить только рублевые транзакции? (Да/Нет): ").strip().lower() == 'да'
     if only_rub:
-        filtered_transactions = [t for t in filtered_transactions if t.get('operationAmount',
-                                                                           {}).get('currency',
-                                                                                   {}).get('code', '').lower() == 'rub']
+        filtered_transactions = filter_rub(filtered_transactions)
 
     filter_description = input("Отфильтровать список транзакций по определенному слову в описании? "
                                "(Да/Нет): ").strip().lower()
@@ -153,16 +501,25 @@ def main():
         print("Распечатываю итоговый список транзакций...")
         print(f"Всего банковских операций в выборке: {len(filtered_transactions)}\n")
         for transaction in filtered_transactions:
-            date = transaction.get('date', 'Не указана')
-            description = transaction.get('description', 'Не указано')
-            from_account = transaction.get('from', 'Не указано')
-            to_account = transaction.get('to', 'Не указано')
-            amount = transaction.get('operationAmount', {}).get('amount', 'Не указана')
-            currency = transaction.get('operationAmount', {}).get('currency', {}).get('code', 'Не указана').upper()
-            print(f"{date} {description}\n"
-                  f"Счет: {from_account} -> {to_account}\n"
-                  f"Сумма: {amount} {currency}\n")
+            print(format_transaction(transaction))
+        export_to_file(filtered_transactions)
+
+
+def export_to_file(transactions: Iterable[Dict[str, Any]]) -> None:
+    """Предлагает сохранить итоговый список транзакций в файл CSV, JSON Lines или XLSX."""
+    if input("Сохранить итоговый список в файл? (Да/Нет): ").strip().lower() != 'да':
+        return
+    file_path = input("Введите путь к файлу (.csv, .jsonl или .xlsx): ").strip()
+    try:
+        with open_exporter(file_path) as exporter:
+            exporter.write_many(transactions)
+    except (OSError, ValueError) as e:
+        print(f"Не удалось сохранить файл: {e}")
+        return
+    print(f"Сохранено {exporter.rows} транзакций в файл {file_path}.")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch())
     main()
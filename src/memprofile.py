@@ -0,0 +1,239 @@
+import argparse
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import loaders, processing, utils
+from src.logger_config import setup_logger
+
+# Создание и получение именованного логгера
+memprofile_logger = setup_logger(__name__)
+
+DEFAULT_TOP = 10
+RSS_SAMPLE_INTERVAL = 0.01
+
+# Старые функции чтения из utils, которые замеряются вместе с движками загрузки
+UTILS_READERS = {
+    "json": utils.read_transactions_json,
+    "csv": utils.read_transactions_csv,
+    "xlsx": utils.read_transactions_excel,
+}
+
+
+def current_rss() -> Optional[int]:
+    """
+    Возвращает текущий размер резидентной памяти процесса в байтах (Linux, /proc/self/statm).
+
+    :return: RSS в байтах или None, если платформа не поддерживается.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Фоновый поток, который опрашивает RSS процесса и запоминает максимум."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        if self.start_rss is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._sample()
+
+    @property
+    def peak_delta(self) -> Optional[int]:
+        """Прирост RSS на пике относительно начала замера."""
+        if self.start_rss is None or self.peak_rss is None:
+            return None
+        return self.peak_rss - self.start_rss
+
+
+class MemoryReport:
+    """Результат замера памяти одного шага: пик tracemalloc, пик RSS, байт на строку и основные места выделения."""
+
+    def __init__(self, label: str, rows: Optional[int], peak_bytes: int, retained_bytes: int,
+                 rss_peak_bytes: Optional[int], top: List[Tuple[str, int]]) -> None:
+        self.label = label
+        self.rows = rows
+        self.peak_bytes = peak_bytes
+        self.retained_bytes = retained_bytes
+        self.rss_peak_bytes = rss_peak_bytes
+        self.top = top
+
+    @property
+    def bytes_per_row(self) -> Optional[float]:
+        """Пиковая память в пересчете на одну строку результата."""
+        return self.peak_bytes / self.rows if self.rows else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает отчет в виде словаря (для JSON и базовой линии замеров)."""
+        return {
+            "label": self.label,
+            "rows": self.rows,
+            "peak_bytes": self.peak_bytes,
+            "retained_bytes": self.retained_bytes,
+            "rss_peak_bytes": self.rss_peak_bytes,
+            "bytes_per_row": self.bytes_per_row,
+            "top": [{"site": site, "bytes": size} for site, size in self.top],
+        }
+
+    def format(self) -> str:
+        """Возвращает отчет в текстовом виде."""
+        per_row = f"{self.bytes_per_row:.0f}" if self.bytes_per_row is not None else "-"
+        rss = f"{self.rss_peak_bytes / 2 ** 20:.1f} MiB" if self.rss_peak_bytes is not None else "-"
+        lines = [
+            f"{self.label}: строк {self.rows if self.rows is not None else '-'}, "
+            f"пик {self.peak_bytes / 2 ** 20:.1f} MiB, удержано {self.retained_bytes / 2 ** 20:.1f} MiB, "
+            f"прирост RSS {rss}, байт на строку {per_row}"
+        ]
+        for site, size in self.top:
+            lines.append(f"    {size / 2 ** 10:>10.1f} KiB  {site}")
+        return "\n".join(lines)
+
+
+def _top_sites(snapshot: tracemalloc.Snapshot, limit: int) -> List[Tuple[str, int]]:
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, threading.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    sites = []
+    for statistic in snapshot.statistics("lineno")[:limit]:
+        frame = statistic.traceback[0]
+        sites.append((f"{frame.filename}:{frame.lineno}", statistic.size))
+    return sites
+
+
+def profile(func: Callable[[], Any], label: str = "", top: int = DEFAULT_TOP,
+            sample_rss: bool = True) -> Tuple[Any, MemoryReport]:
+    """
+    Выполняет функцию под tracemalloc (и с опросом RSS) и возвращает ее результат вместе с отчетом о памяти.
+    Места выделения считаются по памяти, которую удерживает результат после возврата из функции.
+
+    :param func: Функция без аргументов.
+    :param label: Название шага в отчете.
+    :param top: Количество мест выделения памяти в отчете.
+    :param sample_rss: Опрашивать RSS процесса в фоновом потоке.
+    :return: Кортеж (результат функции, отчет).
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sampler = RssSampler() if sample_rss else None
+    try:
+        if sampler is not None:
+            with sampler:
+                result = func()
+        else:
+            result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        sites = _top_sites(tracemalloc.take_snapshot(), top) if top else []
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    rows = len(result) if hasattr(result, "__len__") else None
+    report = MemoryReport(label or getattr(func, "__name__", ""), rows, max(peak - baseline, 0),
+                          max(current - baseline, 0), sampler.peak_delta if sampler else None, sites)
+    memprofile_logger.info(f"{report.label}: peak {report.peak_bytes} bytes, rows {rows}")
+    return result, report
+
+
+def profile_file(file_path: str, fmt: Optional[str] = None, engines: Optional[List[str]] = None,
+                 top: int = DEFAULT_TOP) -> List[MemoryReport]:
+    """
+    Замеряет память каждого движка загрузки для файла и шагов обработки загруженных операций.
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат файла (по умолчанию определяется автоматически).
+    :param engines: Движки загрузки (по умолчанию все доступные для формата).
+    :param top: Количество мест выделения памяти в каждом отчете.
+    :return: Список отчетов.
+    """
+    fmt = fmt or loaders.detect_format(file_path)
+    reports = []
+    transactions: List[Dict[str, Any]] = []
+    for engine in engines or loaders.available_engines(fmt):
+        loaders.preload_engine(fmt, engine)
+        transactions, report = profile(lambda: list(loaders.iter_transactions(file_path, fmt, engine)),
+                                       f"load[{fmt}/{engine}]", top)
+        reports.append(report)
+    if fmt in UTILS_READERS:
+        reader = UTILS_READERS[fmt]
+        reports.append(profile(lambda: reader(file_path), f"utils.{reader.__name__}", top)[1])
+    steps: List[Tuple[str, Callable[[], Any]]] = [
+        ("processing.filter_by_state", lambda: processing.filter_by_state(transactions)),
+        ("processing.sort_by_date", lambda: processing.sort_by_date(transactions)),
+    ]
+    for label, step in steps:
+        try:
+            reports.append(profile(step, label, top)[1])
+        except (KeyError, ValueError, TypeError) as e:
+            memprofile_logger.warning(f"{label} failed: {e}")
+    return reports
+
+
+def check_budget(report: MemoryReport, max_bytes_per_row: float) -> bool:
+    """
+    Проверяет, что пиковая память на строку не превышает бюджет.
+
+    :param report: Отчет о памяти.
+    :param max_bytes_per_row: Допустимое количество байт на строку.
+    :return: True, если бюджет соблюден (или строк нет).
+    """
+    return report.bytes_per_row is None or report.bytes_per_row <= max_bytes_per_row
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа: python -m src.memprofile data/transactions_excel.xlsx --budget 4000
+
+    :return: Код завершения: 0 — бюджеты соблюдены, 1 — превышены.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.memprofile", description="Замеры памяти загрузчиков.")
+    parser.add_argument("files", nargs="+", help="Файлы для замера.")
+    parser.add_argument("--engine", action="append", dest="engines", help="Движок загрузки (можно несколько раз).")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Количество мест выделения памяти.")
+    parser.add_argument("--budget", type=float, help="Допустимая пиковая память загрузки, байт на строку.")
+    args = parser.parse_args(argv)
+
+    exceeded = False
+    for file_path in args.files:
+        for report in profile_file(file_path, engines=args.engines, top=args.top):
+            print(report.format())
+            if args.budget is not None and report.label.startswith("load") and not check_budget(report, args.budget):
+                print(f"BUDGET EXCEEDED {report.label}: {report.bytes_per_row:.0f} > {args.budget:.0f} bytes/row",
+                      file=sys.stderr)
+                exceeded = True
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,330 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.loaders import EXTENSIONS, detect_format, iter_transactions, source_extension
+from src.logger_config import setup_logger
+
+# Создание и получение именованного логгера
+pipeline_logger = setup_logger(__name__)
+
+# Форматы, разбор которых нагружает процессор: читаются в отдельных процессах
+PROCESS_FORMATS = ("xlsx",)
+
+DEFAULT_THREADS = 4
+DEFAULT_PROCESSES = 2
+DEFAULT_QUEUE_SIZE = 16
+BATCH_SIZE = 1000
+
+
+class FileReport:
+    """Итог загрузки одного файла: формат, количество строк, время и ошибка (если была)."""
+
+    def __init__(self, path: str, fmt: Optional[str] = None) -> None:
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Файл загружен без ошибок."""
+        return self.error is None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает отчет в виде словаря."""
+        return {"path": self.path, "format": self.fmt, "rows": self.rows, "seconds": self.seconds,
+                "error": self.error}
+
+    def format(self) -> str:
+        """Возвращает отчет в текстовом виде."""
+        status = "OK" if self.ok else f"ошибка: {self.error}"
+        return f"{self.path} [{self.fmt or '-'}]: строк {self.rows}, {self.seconds:.3f} с, {status}"
+
+
+def read_manifest(manifest_path: str) -> List[str]:
+    """
+    Читает манифест: по одному пути на строку, пустые строки и строки с # пропускаются.
+    Относительные пути считаются от каталога манифеста.
+
+    :param manifest_path: Путь к файлу манифеста.
+    :return: Список путей.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    paths = []
+    with open(manifest_path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def expand_inputs(patterns: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Раскрывает glob-шаблоны в список путей без повторов.
+
+    :param patterns: Пути к файлам или glob-шаблоны.
+    :return: Кортеж (список найденных путей, список шаблонов без совпадений).
+    """
+    paths = []
+    seen = set()
+    unmatched = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            unmatched.append(pattern)
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths, unmatched
+
+
+def collect_sources(sources: Iterable[str], manifest: Optional[str] = None) -> List[str]:
+    """
+    Собирает список файлов: каталоги обходятся рекурсивно (берутся файлы с расширениями json, csv, xlsx),
+    пути к файлам и пути из манифеста используются как есть.
+
+    :param sources: Каталоги и файлы.
+    :param manifest: Файл манифеста.
+    :return: Список путей без повторов в порядке обнаружения.
+    """
+    candidates: List[str] = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                candidates.extend(os.path.join(root, name) for name in sorted(files)
+                                  if source_extension(name) in EXTENSIONS)
+        else:
+            candidates.append(source)
+    if manifest:
+        candidates.extend(read_manifest(manifest))
+    paths = []
+    seen = set()
+    for path in candidates:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            paths.append(path)
+    return paths
+
+
+def _load_in_process(file_path: str, fmt: str, compact: bool) -> List[Dict[str, Any]]:
+    """Загружает файл целиком в дочернем процессе (результат передается в основной процесс через pickle)."""
+    return list(iter_transactions(file_path, fmt, compact=compact))
+
+
+class _FileDone:
+    """Маркер конца файла в очереди."""
+
+    def __init__(self, report: FileReport) -> None:
+        self.report = report
+
+
+class IngestionPipeline:
+    """
+    Параллельная загрузка множества файлов в общий поток нормализованных записей.
+    JSON и CSV читаются в пуле потоков, XLSX — в пуле процессов. Записи передаются потребителю пачками
+    через ограниченную очередь: если потребитель не успевает, загрузчики ждут (обратное давление).
+    """
+
+    def __init__(self, paths: List[str], threads: int = DEFAULT_THREADS, processes: int = DEFAULT_PROCESSES,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = BATCH_SIZE, compact: bool = False) -> None:
+        self.paths = list(paths)
+        self.threads = max(threads, 1)
+        self.processes = max(processes, 0)
+        self.batch_size = batch_size
+        self.compact = compact
+        self.reports: Dict[str, FileReport] = {path: FileReport(path) for path in self.paths}
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(queue_size, 1))
+        self._cancelled = threading.Event()
+
+    def _put(self, item: Any) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _put_batches(self, path: str, records: Iterable[Dict[str, Any]], report: FileReport) -> None:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                if not self._put((path, batch)):
+                    return
+                report.rows += len(batch)
+                batch = []
+        if batch and self._put((path, batch)):
+            report.rows += len(batch)
+
+    def _finish(self, report: FileReport, started: float, error: Optional[BaseException] = None) -> None:
+        report.seconds = time.perf_counter() - started
+        if error is not None:
+            report.error = str(error) or type(error).__name__
+            pipeline_logger.error(f"Error loading {report.path}: {report.error}")
+        else:
+            pipeline_logger.info(f"Loaded {report.path}: {report.rows} rows in {report.seconds:.3f} s")
+        self._put(_FileDone(report))
+
+    def _load_in_thread(self, path: str) -> None:
+        report = self.reports[path]
+        started = time.perf_counter()
+        try:
+            self._put_batches(path, iter_transactions(path, report.fmt, compact=self.compact), report)
+        except Exception as e:
+            # Любая ошибка попадает в отчет файла, иначе потребитель ждал бы маркер конца файла вечно
+            self._finish(report, started, e)
+        else:
+            self._finish(report, started)
+
+    def _on_process_done(self, thread_pool: ThreadPoolExecutor, path: str, started: float,
+                         future: "Future[List[Dict[str, Any]]]") -> None:
+        # Колбэк вызывается в служебном потоке пула процессов: разбор результата передается пулу потоков
+        thread_pool.submit(self._collect_process_result, path, future, started)
+
+    def _collect_process_result(self, path: str, future: "Future[List[Dict[str, Any]]]", started: float) -> None:
+        report = self.reports[path]
+        try:
+            records = future.result()
+        except BrokenProcessPool as e:
+            # Дочерний процесс не запустился (например, интерпретатор читает программу из stdin): читаем в потоке
+            pipeline_logger.warning(f"Process pool is unavailable ({e}), loading {path} in a thread")
+            self._load_in_thread(path)
+            return
+        except Exception as e:
+            self._finish(report, started, e)
+            return
+        self._put_batches(path, records, report)
+        self._finish(report, started)
+
+    def _schedule(self, thread_pool: ThreadPoolExecutor, process_pool: Optional[ProcessPoolExecutor]) -> None:
+        for path in self.paths:
+            report = self.reports[path]
+            started = time.perf_counter()
+            try:
+                report.fmt = detect_format(path)
+            except OSError as e:
+                # Маркер конца файла отправляется из пула: очередь может быть заполнена, а потребитель еще не запущен
+                thread_pool.submit(self._finish, report, started, e)
+                continue
+            if process_pool is not None and report.fmt in PROCESS_FORMATS:
+                future = process_pool.submit(_load_in_process, path, report.fmt, self.compact)
+                future.add_done_callback(partial(self._on_process_done, thread_pool, path, started))
+            else:
+                thread_pool.submit(self._load_in_thread, path)
+
+    def iter_batches(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Запускает загрузку и возвращает пачки записей по мере готовности.
+
+        :return: Итератор кортежей (путь к файлу, список записей).
+        """
+        if not self.paths:
+            return
+        needs_processes = self.processes > 0 and any(
+            source_extension(path) == ".xlsx" for path in self.paths)
+        thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="ingest")
+        # spawn: дочерние процессы не наследуют блокировки потоков-загрузчиков, запущенных в этом процессе
+        process_pool = None
+        if needs_processes:
+            process_pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        pending = len(self.paths)
+        try:
+            self._schedule(thread_pool, process_pool)
+            while pending:
+                item = self._queue.get()
+                if isinstance(item, _FileDone):
+                    pending -= 1
+                else:
+                    yield item
+        finally:
+            self._cancelled.set()
+            if process_pool is not None:
+                process_pool.shutdown(wait=True, cancel_futures=True)
+            thread_pool.shutdown(wait=True, cancel_futures=True)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for _, batch in self.iter_batches():
+            yield from batch
+
+    def run(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Загружает все файлы и возвращает записи, сгруппированные по файлам (в порядке путей).
+
+        :return: Словарь {путь к файлу: список записей}.
+        """
+        table: Dict[str, List[Dict[str, Any]]] = {path: [] for path in self.paths}
+        for path, batch in self.iter_batches():
+            table[path].extend(batch)
+        return table
+
+
+def ingest(sources: Iterable[str], manifest: Optional[str] = None, threads: int = DEFAULT_THREADS,
+           processes: int = DEFAULT_PROCESSES, queue_size: int = DEFAULT_QUEUE_SIZE,
+           compact: bool = False) -> Tuple[List[Dict[str, Any]], List[FileReport]]:
+    """
+    Загружает все файлы из каталогов, списка путей и манифеста параллельно.
+
+    :param sources: Каталоги и файлы.
+    :param manifest: Файл манифеста.
+    :param threads: Количество потоков для JSON и CSV.
+    :param processes: Количество процессов для XLSX (0 — читать XLSX в потоках).
+    :param queue_size: Максимальное количество пачек записей в очереди.
+    :param compact: Возвращать компактные записи records.Transaction.
+    :return: Кортеж (записи всех файлов в порядке путей, отчеты по файлам).
+    """
+    pipeline = IngestionPipeline(collect_sources(sources, manifest), threads, processes, queue_size,
+                                 compact=compact)
+    table = pipeline.run()
+    transactions = [record for records in table.values() for record in records]
+    return transactions, list(pipeline.reports.values())
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа: python -m src.pipeline exports/ --manifest nightly.txt --format json > all.json
+
+    :return: Код завершения: 0 — все файлы загружены, 1 — были ошибки.
+    """
+    from src.main import write_output
+
+    parser = argparse.ArgumentParser(prog="python -m src.pipeline",
+                                     description="Параллельная загрузка выгрузок из каталогов и манифеста.")
+    parser.add_argument("sources", nargs="*", help="Каталоги и файлы.")
+    parser.add_argument("--manifest", help="Файл со списком путей (по одному на строку).")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Потоки для JSON и CSV.")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES, help="Процессы для XLSX.")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Размер очереди пачек.")
+    parser.add_argument("--format", choices=["text", "json", "csv"], default="json", dest="output_format",
+                        help="Формат вывода записей.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    transactions, reports = ingest(args.sources, args.manifest, args.threads, args.processes, args.queue_size)
+    write_output(transactions, args.output_format)
+    for report in reports:
+        print(report.format(), file=sys.stderr)
+    failed = [report for report in reports if not report.ok]
+    print(f"Файлов: {len(reports)}, ошибок: {len(failed)}, строк: {len(transactions)}, "
+          f"время: {time.perf_counter() - started:.3f} с", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,526 @@
+import argparse
+import csv
+import json
+import math
+import mmap
+import os
+import random
+import sys
+import time
+from array import array
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.accounts import parse_account
+from src.amounts import MINOR_UNITS, get_amount_minor, get_currency_code
+from src.loaders import (LOAD_ERRORS, detect_compression, detect_format, iter_transactions, normalize_record,
+                         open_input, sniff_delimiter)
+from src.logger_config import setup_logger
+
+# Создание и получение именованного логгера
+preview_logger = setup_logger(__name__)
+
+# Квантиль нормального распределения для границ погрешности с доверием 95%
+Z_95 = 1.96
+DEFAULT_SAMPLE_SIZE = 2000
+# Файлы CSV и JSON Lines больше этого размера (в байтах) по умолчанию читаются случайными переходами
+SEEK_THRESHOLD = 4 * 2 ** 20
+METHODS = ("auto", "stream", "seek")
+# Сколько различных значений накапливается перед записью в скетчи (ограничивает память буферов)
+BUFFER_SIZE = 4096
+_MASK64 = 2 ** 64 - 1
+
+
+class Estimate:
+    """Приблизительное значение и граница погрешности (доверие 95%); error == 0 — значение точное."""
+
+    __slots__ = ("value", "error")
+
+    def __init__(self, value: float, error: float = 0.0) -> None:
+        self.value = value
+        self.error = max(error, 0.0)
+
+    @property
+    def low(self) -> float:
+        """Нижняя граница (не меньше нуля)."""
+        return max(self.value - self.error, 0.0)
+
+    @property
+    def high(self) -> float:
+        """Верхняя граница."""
+        return self.value + self.error
+
+    def format(self, digits: int = 0) -> str:
+        """Строка вида '≈ 1234 ± 56' (для точного значения — просто число)."""
+        if not self.error:
+            return f"{self.value:.{digits}f}"
+        return f"≈ {self.value:.{digits}f} ± {self.error:.{digits}f}"
+
+    def __repr__(self) -> str:
+        return f"Estimate({self.value!r}, {self.error!r})"
+
+
+class HyperLogLog:
+    """
+    Оценка количества различных значений в потоке: 2 ** precision однобайтовых регистров
+    (4 КиБ при precision=12) и относительная погрешность около 1.04 / sqrt(2 ** precision) (1,6%).
+    Значения хешируются встроенным hash(), поэтому оценка воспроизводима только в пределах процесса.
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        """Стандартная относительная погрешность оценки."""
+        return 1.04 / math.sqrt(len(self._registers))
+
+    def add(self, value: Any) -> None:
+        """Добавляет значение (строку) в поток."""
+        hashed = hash(value) & _MASK64
+        rest_bits = 64 - self.precision
+        register = hashed >> rest_bits
+        rank = rest_bits - (hashed & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self._registers[register]:
+            self._registers[register] = rank
+
+    def count(self) -> float:
+        """Оценка количества различных значений."""
+        size = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -rank for rank in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Для малых количеств точнее линейный подсчет по пустым регистрам
+            estimate = size * math.log(size / zeros)
+        return estimate
+
+    def estimate(self) -> Estimate:
+        """Оценка количества различных значений с границей погрешности."""
+        count = self.count()
+        return Estimate(count, Z_95 * self.relative_error * count)
+
+
+class CountMinSketch:
+    """
+    Частоты значений потока в таблице depth x width счетчиков: оценка никогда не меньше истинной частоты
+    и с вероятностью 1 - delta превышает ее не больше чем на epsilon * (всего значений).
+    Для списка самых частых значений хранится не больше candidates кандидатов.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, candidates: int = 64) -> None:
+        self.epsilon = epsilon
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self._tables = [array("q", [0]) * self.width for _ in range(self.depth)]
+        self.total = 0
+        self._capacity = candidates
+        self._candidates: Dict[Any, int] = {}
+
+    def _columns(self, value: Any) -> Iterator[int]:
+        # Двойное хеширование: depth независимых позиций из одного 64-битного хеша
+        hashed = hash(value) & _MASK64
+        first, second = hashed & 0xFFFFFFFF, (hashed >> 32) | 1
+        for row in range(self.depth):
+            yield (first + row * second) % self.width
+
+    def add(self, value: Any, count: int = 1) -> int:
+        """
+        Добавляет значение в поток.
+
+        :param value: Значение (строка).
+        :param count: Сколько раз значение встретилось.
+        :return: Оценка частоты значения после добавления.
+        """
+        estimate = None
+        for table, column in zip(self._tables, self._columns(value)):
+            table[column] += count
+            estimate = table[column] if estimate is None else min(estimate, table[column])
+        self.total += count
+        estimate = estimate or 0
+        candidates = self._candidates
+        if value in candidates or len(candidates) < self._capacity:
+            candidates[value] = estimate
+        else:
+            weakest = min(candidates, key=candidates.__getitem__)
+            if estimate > candidates[weakest]:
+                del candidates[weakest]
+                candidates[value] = estimate
+        return estimate
+
+    def count(self, value: Any) -> int:
+        """Оценка частоты значения (сверху)."""
+        return min(table[column] for table, column in zip(self._tables, self._columns(value)))
+
+    def top(self, k: int = 5) -> List[Tuple[Any, Estimate]]:
+        """
+        Возвращает самые частые значения.
+
+        :param k: Количество значений.
+        :return: Список (значение, оценка частоты с границей погрешности epsilon * total).
+        """
+        ranked = sorted(self._candidates, key=lambda value: (-self.count(value), str(value)))[:k]
+        return [(value, Estimate(self.count(value), self.epsilon * self.total)) for value in ranked]
+
+
+class Reservoir:
+    """Равномерная выборка фиксированного размера из потока неизвестной длины (алгоритм L)."""
+
+    def __init__(self, size: int, seed: Optional[int] = None) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.items: List[Any] = []
+        self.seen = 0
+        self._random = random.Random(seed)
+        self._weight = 1.0
+        self._next = 0
+
+    def _skip(self) -> None:
+        # 1 - random() лежит в (0, 1], логарифм определен
+        self._weight *= math.exp(math.log(1.0 - self._random.random()) / self.size)
+        self._next += int(math.log(1.0 - self._random.random()) / math.log1p(-self._weight)) + 1
+
+    def add(self, item: Any) -> None:
+        """Предлагает элемент потока; большинство элементов пропускается без вызова генератора случайных чисел."""
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            if len(self.items) == self.size:
+                self._next = self.seen
+                self._skip()
+        elif self.seen == self._next:
+            self.items[self._random.randrange(self.size)] = item
+            self._skip()
+
+
+class Preview:
+    """
+    Приблизительный обзор набора данных: взвешенная выборка нормализованных операций, количество строк
+    и (при потоковом чтении) скетчи по всем строкам — HyperLogLog счетов и карт и Count-Min описаний.
+    Количества и суммы по фильтрам оцениваются по выборке с границами погрешности (доверие 95%).
+    """
+
+    def __init__(self, file_path: str, method: str, rows: Estimate, sample: List[Dict[str, Any]],
+                 weights: Optional[List[float]] = None, accounts: Optional[HyperLogLog] = None,
+                 descriptions: Optional[CountMinSketch] = None, elapsed: float = 0.0) -> None:
+        self.file_path = file_path
+        self.method = method
+        self.rows = rows
+        self.sample = sample
+        self.weights = weights if weights is not None else [1.0] * len(sample)
+        self.accounts = accounts
+        self.descriptions = descriptions
+        self.elapsed = elapsed
+
+    def _correction(self) -> float:
+        # Поправка на конечную совокупность: выборка без возвращения из точно известного числа строк
+        rows, size = self.rows.value, len(self.sample)
+        if self.rows.error or rows <= 1:
+            return 1.0
+        return math.sqrt(max(rows - size, 0) / (rows - 1))
+
+    def _estimate_total(self, values: List[float]) -> Estimate:
+        weight_sum = sum(self.weights)
+        if not weight_sum:
+            return Estimate(0.0, self.rows.error)
+        mean = sum(weight * value for weight, value in zip(self.weights, values)) / weight_sum
+        variance = sum((weight * (value - mean)) ** 2 for weight, value in zip(self.weights, values))
+        error = Z_95 * self.rows.value * math.sqrt(variance) / weight_sum * self._correction()
+        return Estimate(self.rows.value * mean, error + abs(mean) * self.rows.error)
+
+    def _matcher(self, state: Optional[str], currency: Optional[str],
+                 description: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+        state = state.lower() if state else None
+        currency = currency.upper() if currency else None
+
+        def matches(transaction: Dict[str, Any]) -> bool:
+            return (state is None or str(transaction.get("state") or "").lower() == state) \
+                and (currency is None or get_currency_code(transaction).upper() == currency) \
+                and (description is None or transaction.get("description") == description)
+        return matches
+
+    def count(self, state: Optional[str] = None, currency: Optional[str] = None,
+              description: Optional[str] = None) -> Estimate:
+        """
+        Оценивает количество операций с заданным статусом, валютой и описанием.
+
+        :param state: Статус (без учета регистра), None — любой.
+        :param currency: Код валюты, None — любая.
+        :param description: Описание (точное совпадение), None — любое.
+        :return: Оценка количества.
+        """
+        matches = self._matcher(state, currency, description)
+        return self._estimate_total([1.0 if matches(transaction) else 0.0 for transaction in self.sample])
+
+    def total(self, currency: str, state: Optional[str] = None) -> Estimate:
+        """
+        Оценивает сумму операций в валюте.
+
+        :param currency: Код валюты.
+        :param state: Статус (без учета регистра), None — любой.
+        :return: Оценка суммы в единицах валюты.
+        """
+        matches = self._matcher(state, currency, None)
+        values = []
+        for transaction in self.sample:
+            amount_minor = get_amount_minor(transaction) if matches(transaction) else None
+            values.append(amount_minor / MINOR_UNITS if amount_minor is not None else 0.0)
+        return self._estimate_total(values)
+
+    def distinct_accounts(self) -> Optional[Estimate]:
+        """Оценка количества различных счетов и карт (None — файл не читался целиком)."""
+        return self.accounts.estimate() if self.accounts is not None else None
+
+    def top_descriptions(self, k: int = 5) -> List[Tuple[str, Estimate]]:
+        """
+        Возвращает самые частые описания операций.
+
+        :param k: Количество описаний.
+        :return: Список (описание, оценка количества).
+        """
+        if self.descriptions is not None:
+            return self.descriptions.top(k)
+        shares: Dict[str, float] = {}
+        for transaction, weight in zip(self.sample, self.weights):
+            description = transaction.get("description")
+            if description:
+                shares[description] = shares.get(description, 0.0) + weight
+        ranked = sorted(shares, key=lambda value: (-shares[value], value))[:k]
+        return [(description, self.count(description=description)) for description in ranked]
+
+
+def _flush(sketch: CountMinSketch, pending: Dict[Any, int]) -> None:
+    for value, count in pending.items():
+        sketch.add(value, count)
+    pending.clear()
+
+
+def _dict_fields(row: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    return row.get("from"), row.get("to"), row.get("description")
+
+
+def _scan_rows(rows: Iterable[Any], fields: Callable[[Any], Tuple[Any, Any, Any]],
+               to_record: Callable[[Any], Optional[Dict[str, Any]]], file_path: str, sample_size: int,
+               seed: Optional[int]) -> Preview:
+    started = time.perf_counter()
+    reservoir = Reservoir(sample_size, seed)
+    accounts = HyperLogLog()
+    descriptions = CountMinSketch()
+    # Значения полей повторяются: номер счета выделяется и добавляется в HyperLogLog один раз на значение,
+    # а частоты описаний сначала суммируются в буфере; оба буфера ограничены BUFFER_SIZE значениями
+    added_accounts: Dict[Any, None] = {}
+    pending: Dict[Any, int] = {}
+    for row in rows:
+        reservoir.add(row)
+        from_account, to_account, description = fields(row)
+        for value in (from_account, to_account):
+            if value and value not in added_accounts:
+                if len(added_accounts) >= BUFFER_SIZE:
+                    added_accounts.clear()
+                added_accounts[value] = None
+                parsed = parse_account(value)
+                if parsed is not None:
+                    accounts.add(parsed[1])
+        if description:
+            if description in pending:
+                pending[description] += 1
+            else:
+                if len(pending) >= BUFFER_SIZE:
+                    _flush(descriptions, pending)
+                pending[description] = 1
+    _flush(descriptions, pending)
+    # Нормализуются только строки выборки; доля пустых строк (без операции) уточняет количество операций
+    sample = [record for record in map(to_record, reservoir.items) if record is not None]
+    seen, size = reservoir.seen, len(reservoir.items)
+    share = len(sample) / size if size else 0.0
+    error = 0.0
+    if size < seen:
+        correction = (seen - size) / (seen - 1)
+        if 0 < share < 1:
+            error = Z_95 * seen * math.sqrt(share * (1 - share) / size * correction)
+        else:
+            # Если пустых строк в выборке нет (или все пустые), граница оценивается по правилу трех: 3 / size
+            error = 3 * seen / size * correction
+    return Preview(file_path, "stream", Estimate(seen * share, error), sample, None, accounts, descriptions,
+                   time.perf_counter() - started)
+
+
+def preview_stream(rows: Iterable[Dict[str, Any]], file_path: str = "", sample_size: int = DEFAULT_SAMPLE_SIZE,
+                   seed: Optional[int] = 0) -> Preview:
+    """
+    Один проход по записям: выборка-резервуар, HyperLogLog счетов и карт из полей from/to
+    и Count-Min описаний по всем записям.
+
+    :param rows: Записи (нормализованные или строки выгрузки).
+    :param file_path: Имя источника для отчета.
+    :param sample_size: Размер выборки.
+    :param seed: Начальное значение генератора случайных чисел (None — случайное).
+    :return: Обзор.
+    """
+    return _scan_rows(rows, _dict_fields, normalize_record, file_path, sample_size, seed)
+
+
+def _stream_file(file_path: str, fmt: str, sample_size: int, seed: Optional[int]) -> Preview:
+    if fmt == "xlsx":
+        return preview_stream(iter_transactions(file_path, fmt), file_path, sample_size, seed)
+    with open_input(file_path, encoding="utf-8-sig", newline="" if fmt == "csv" else None) as file:
+        if fmt == "jsonl":
+            records = (row for row in map(json.loads, filter(str.strip, file)) if isinstance(row, dict))
+            return preview_stream(records, file_path, sample_size, seed)
+        if fmt == "json":
+            data = json.load(file)
+            if not isinstance(data, list):
+                raise ValueError(f"Invalid data format in file: {file_path}")
+            return preview_stream((row for row in data if isinstance(row, dict)), file_path, sample_size, seed)
+        # Строки CSV остаются списками, в словари превращаются только строки выборки
+        header_line = file.readline()
+        delimiter = sniff_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter), [])
+        positions = [header.index(name) if name in header else len(header) for name in ("from", "to", "description")]
+        last = max(positions)
+        padding = [""] * (last + 1)
+        rows = (row if len(row) > last else row + padding for row in csv.reader(file, delimiter=delimiter) if row)
+        return _scan_rows(rows, itemgetter(*positions), lambda row: normalize_record(dict(zip(header, row))),
+                          file_path, sample_size, seed)
+
+
+def preview_seek(file_path: str, fmt: str, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 seed: Optional[int] = 0) -> Preview:
+    """
+    Оценивает набор данных по строкам, выбранным случайными переходами по файлу CSV или JSON Lines:
+    читается около sample_size строк независимо от размера файла.
+
+    Строка выбирается с вероятностью, пропорциональной ее длине в байтах, поэтому каждой строке
+    назначается вес 1 / длина, а количество строк оценивается как размер файла * средний вес.
+    Поля с переводом строки внутри кавычек не поддерживаются (как в scan.py).
+
+    :param file_path: Путь к несжатому файлу.
+    :param fmt: 'csv' или 'jsonl'.
+    :param sample_size: Количество случайных переходов.
+    :param seed: Начальное значение генератора случайных чисел (None — случайное).
+    :return: Обзор.
+    """
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Random seeks are supported only for CSV and JSON Lines: {fmt}")
+    started = time.perf_counter()
+    generator = random.Random(seed)
+    sample: List[Dict[str, Any]] = []
+    weights: List[float] = []
+    record_weights: List[float] = []
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header: List[str] = []
+        delimiter = ","
+        body_start = 0
+        if fmt == "csv":
+            header_end = mm.find(b"\n")
+            body_start = len(mm) if header_end == -1 else header_end + 1
+            header_line = mm[:body_start].decode("utf-8-sig").rstrip("\r\n")
+            delimiter = sniff_delimiter(header_line)
+            header = next(csv.reader([header_line], delimiter=delimiter), [])
+        body_size = len(mm) - body_start
+        draws = sample_size if body_size > 0 else 0
+        for _ in range(draws):
+            position = body_start + generator.randrange(body_size)
+            start = mm.rfind(b"\n", body_start, position) + 1 or body_start
+            end = mm.find(b"\n", position)
+            end = len(mm) if end == -1 else end
+            weight = 1.0 / (end - start + 1)
+            line = mm[start:end].decode("utf-8-sig").strip()
+            record = None
+            if line:
+                if fmt == "csv":
+                    record = normalize_record(dict(zip(header, next(csv.reader([line], delimiter=delimiter)))))
+                else:
+                    row = json.loads(line)
+                    record = normalize_record(row) if isinstance(row, dict) else None
+            record_weights.append(weight if record is not None else 0.0)
+            if record is not None:
+                sample.append(record)
+                weights.append(weight)
+    if draws:
+        mean = sum(record_weights) / draws
+        deviation = math.sqrt(sum((weight - mean) ** 2 for weight in record_weights) / draws)
+        rows = Estimate(body_size * mean, Z_95 * body_size * deviation / math.sqrt(draws))
+    else:
+        rows = Estimate(0.0)
+    return Preview(file_path, "seek", rows, sample, weights, elapsed=time.perf_counter() - started)
+
+
+def preview_file(file_path: str, sample_size: int = DEFAULT_SAMPLE_SIZE, method: str = "auto",
+                 fmt: Optional[str] = None, seed: Optional[int] = 0) -> Preview:
+    """
+    Строит приблизительный обзор файла выгрузки за долю времени полной загрузки.
+
+    :param file_path: Путь к файлу.
+    :param sample_size: Размер выборки.
+    :param method: 'stream' — один проход без нормализации со скетчами по всем строкам,
+        'seek' — случайные переходы по несжатому CSV или JSON Lines (время не зависит от размера файла),
+        'auto' — 'seek' для таких файлов больше SEEK_THRESHOLD байт, иначе 'stream'.
+    :param fmt: Формат файла (по умолчанию определяется автоматически).
+    :param seed: Начальное значение генератора случайных чисел (None — случайное).
+    :return: Обзор.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Invalid method: {method}")
+    fmt = fmt or detect_format(file_path)
+    if method == "auto":
+        seekable = fmt in ("csv", "jsonl") and detect_compression(file_path) is None
+        method = "seek" if seekable and os.path.getsize(file_path) >= SEEK_THRESHOLD else "stream"
+    if method == "seek":
+        preview = preview_seek(file_path, fmt, sample_size, seed)
+    else:
+        preview = _stream_file(file_path, fmt, sample_size, seed)
+    preview_logger.info(f"Preview of {file_path} ({preview.method}): {len(preview.sample)} sampled rows "
+                        f"in {preview.elapsed:.3f} s")
+    return preview
+
+
+def format_preview(preview: Preview, state: Optional[str] = None, currency: Optional[str] = None,
+                   top: int = 5) -> str:
+    """Возвращает обзор в виде текста для консоли."""
+    lines = [f"Приблизительный обзор {preview.file_path} ({preview.method}, выборка {len(preview.sample)} строк, "
+             f"{preview.elapsed:.3f} с); погрешность указана для доверия 95%.",
+             f"Операций: {preview.rows.format()}"]
+    accounts = preview.distinct_accounts()
+    if accounts is not None:
+        lines.append(f"Различных счетов и карт: {accounts.format()}")
+    lines.append("Частые описания:")
+    lines.extend(f"  {description}: {estimate.format()}" for description, estimate in preview.top_descriptions(top))
+    if state or currency:
+        label = " ".join(value.upper() for value in (state, currency) if value)
+        lines.append(f"Операций {label}: {preview.count(state, currency).format()}")
+        if currency:
+            lines.append(f"Сумма {label}: {preview.total(currency, state).format(2)} {currency.upper()}")
+    return "\n".join(lines)
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа: python -m src.preview data/transactions.csv --status executed --currency USD
+
+    :return: Код завершения: 0 — обзор построен, 1 — файл не удалось прочитать.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.preview", description="Приблизительный обзор выгрузки.")
+    parser.add_argument("file", help="Файл выгрузки (JSON, JSON Lines, CSV, XLSX, в том числе сжатый).")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_SIZE, help="Размер выборки.")
+    parser.add_argument("--method", choices=METHODS, default="auto", help="Способ чтения (по умолчанию auto).")
+    parser.add_argument("--status", help="Оценить количество операций с этим статусом.")
+    parser.add_argument("--currency", help="Оценить количество и сумму операций в этой валюте.")
+    parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора случайных чисел.")
+    args = parser.parse_args(argv)
+    try:
+        preview = preview_file(args.file, args.sample, args.method, seed=args.seed)
+    except LOAD_ERRORS as e:
+        preview_logger.error(f"Error reading file {args.file}: {e}")
+        print(f"Ошибка при чтении файла: {e}", file=sys.stderr)
+        return 1
+    print(format_preview(preview, args.status, args.currency))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -1,27 +1,61 @@
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import compress
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+from src.date_index import DateBound, DateIndex
+from src.interning import EqualsIgnoreCase
+from src.storage import TransactionStore
 
-def filter_by_state(transactions: List[Dict[str, Any]],
+
+def is_rub_transaction(transaction: Dict[str, Any]) -> bool:
+    """Проверяет, что операция совершена в рублях."""
+    currency = transaction.get("operationAmount", {}).get("currency", {}).get("code") or ""
+    return str(currency).lower() == "rub"
+
+
+def rub_mask(transactions: Sequence[Dict[str, Any]]) -> List[bool]:
+    """
+    Признаки рублевых операций (как is_rub_transaction): код валюты приводится к нижнему регистру
+    один раз на различное значение (interning.EqualsIgnoreCase).
+
+    :param transactions: Список транзакций.
+    :return: Список признаков в порядке транзакций.
+    """
+    codes = [transaction.get("operationAmount", {}).get("currency", {}).get("code") for transaction in transactions]
+    return EqualsIgnoreCase("rub").mask(codes)
+
+
+def filter_rub(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Отбирает рублевые операции с сохранением порядка."""
+    return list(compress(transactions, rub_mask(transactions)))
+
+
+def filter_by_state(transactions: Union[List[Dict[str, Any]], TransactionStore],
                     state: str = 'EXECUTED') -> List[Dict[str, Any]]:
     """
     Фильтрует список транзакций по заданному состоянию.
 
-    :param transactions: Список словарей с данными о транзакциях.
+    :param transactions: Список словарей с данными о транзакциях или хранилище storage.TransactionStore
+        (тогда фильтр выполняется запросом по индексу).
     :param state: Состояние, по которому нужно фильтровать (по умолчанию 'EXECUTED').
     :return: Отфильтрованный список транзакций.
     """
+    if isinstance(transactions, TransactionStore):
+        return transactions.filter_by_state(state)
     return [transaction for transaction in transactions if state == transaction.get("state")]
 
 
-def sort_by_date(records: list, is_ascending: bool = True) -> list:
+def sort_by_date(records: Union[List[Dict[str, Any]], TransactionStore],
+                 is_ascending: bool = True) -> List[Dict[str, Any]]:
     """
     Сортирует операции по возрастанию (по умолчанию).
 
-    :param records: Список операций.
+    :param records: Список операций или хранилище storage.TransactionStore (сортировка по индексу дат).
     :param is_ascending: Параметр для сортировки по дате (по умолчанию True - сортировка по возростанию).
     :return: Отсортированный список операций.
     """
+    if isinstance(records, TransactionStore):
+        return records.sort_by_date(is_ascending)
 
     def sort_key(record: dict) -> datetime:
         """
@@ -33,3 +67,22 @@ def sort_by_date(records: list, is_ascending: bool = True) -> list:
         return datetime.strptime(record["date"], "%Y-%m-%dT%H:%M:%S.%f")
 
     return sorted(records, key=sort_key, reverse=not is_ascending)
+
+
+def filter_by_date_range(records: Any, start: DateBound = None, end: DateBound = None, state: Optional[str] = None,
+                         currency: Optional[str] = None) -> Sequence[Dict[str, Any]]:
+    """
+    Отбирает операции с датой в полуинтервале [start, end) в порядке по дате.
+
+    Для повторных запросов по одному набору данных передавайте date_index.DateIndex: массив дат строится
+    один раз, а каждый запрос — два деления пополам и участок строк без копирования.
+
+    :param records: Список операций или date_index.DateIndex.
+    :param start: Начало диапазона (включительно), например '2019-08-01'; None — без ограничения.
+    :param end: Конец диапазона (не включительно); None — без ограничения.
+    :param state: Статус операций (без учета регистра).
+    :param currency: Код валюты (без учета регистра).
+    :return: Операции диапазона, упорядоченные по дате.
+    """
+    index = records if isinstance(records, DateIndex) else DateIndex(records)
+    return index.filter_by_date_range(start, end, state, currency)
@@ -0,0 +1,240 @@
+import math
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.amounts import parse_amount_minor
+
+# Ключи записи в том же порядке, что и в JSON-выгрузке
+TRANSACTION_KEYS = ("id", "state", "date", "operationAmount", "description", "from", "to")
+_SLOT_BY_KEY = {
+    "id": "id", "state": "state", "date": "date", "description": "description", "from": "from_", "to": "to",
+}
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Переводит дату операции в UNIX-время: даты без часового пояса (JSON) считаются UTC, суффикс Z (CSV/XLSX)
+    понимается как UTC.
+
+    :param value: Дата в формате ISO 8601.
+    :return: UNIX-время или None, если дата не задана или некорректна.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def date_sort_key(transaction: Dict[str, Any], descending: bool = False) -> Tuple[bool, float]:
+    """
+    Ключ сортировки операций по дате для sort() без reverse: операции из JSON, CSV и XLSX сравниваются в UTC,
+    операции без даты идут первыми при сортировке по возрастанию (последними — по убыванию),
+    а операции с некорректной датой — после всех остальных при любом направлении.
+
+    :param transaction: Нормализованная транзакция.
+    :param descending: Сортировка от новых операций к старым.
+    :return: Кортеж (дата некорректна, время).
+    """
+    date = transaction.get("date")
+    timestamp = parse_timestamp(date)
+    if timestamp is None:
+        if date:
+            return True, 0.0
+        timestamp = -math.inf
+    return False, -timestamp if descending else timestamp
+
+
+class CurrencyView(Mapping):
+    """Представление operationAmount.currency поверх полей Transaction (словарь не создается)."""
+
+    __slots__ = ("_transaction",)
+
+    def __init__(self, transaction: "Transaction") -> None:
+        self._transaction = transaction
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "name":
+            return self._transaction.currency_name
+        if key == "code":
+            return self._transaction.currency_code
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("name", "code"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class OperationAmountView(Mapping):
+    """Представление operationAmount поверх полей Transaction (словарь не создается)."""
+
+    __slots__ = ("_transaction",)
+
+    def __init__(self, transaction: "Transaction") -> None:
+        self._transaction = transaction
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "amount":
+            return self._transaction.amount
+        if key == "currency":
+            return CurrencyView(self._transaction)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("amount", "currency"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class Transaction(Mapping):
+    """
+    Компактная запись об операции: поля хранятся в __slots__, повторяющиеся строки (статус, валюта, описание)
+    интернируются. Для чтения запись ведет себя как нормализованный словарь JSON-выгрузки:
+    transaction["operationAmount"]["currency"]["code"], transaction.get("from") и т.д.
+    Отсутствующие в исходной записи поля хранятся как None и не видны через интерфейс словаря.
+    Сумма в минимальных единицах (amount_minor) разбирается один раз при создании записи и доступна только
+    как атрибут (amounts.get_amount_minor), в словарном представлении ее нет.
+    """
+
+    __slots__ = ("id", "state", "date", "amount", "amount_minor", "currency_name", "currency_code",
+                 "description", "from_", "to", "extra")
+
+    def __init__(self, id: Any = None, state: Optional[str] = None, date: Optional[str] = None,
+                 amount: Any = None, amount_minor: Optional[int] = None, currency_name: Optional[str] = None,
+                 currency_code: Optional[str] = None, description: Optional[str] = None,
+                 from_: Optional[str] = None, to: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None) -> None:
+        self.id = id
+        self.state = _intern(state)
+        self.date = date
+        self.amount = amount
+        self.amount_minor = amount_minor
+        self.currency_name = _intern(currency_name)
+        self.currency_code = _intern(currency_code)
+        self.description = _intern(description)
+        self.from_ = from_
+        self.to = to
+        self.extra = extra or None
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> Any:
+        """
+        Создает компактную запись из нормализованного словаря (см. loaders.normalize_record).
+
+        :param record: Нормализованная транзакция.
+        :return: Transaction или исходный словарь, если operationAmount имеет нестандартную структуру.
+        """
+        operation_amount = record.get("operationAmount")
+        if not isinstance(operation_amount, dict) or set(operation_amount) - {"amount", "currency"}:
+            return record
+        currency = operation_amount.get("currency")
+        if not isinstance(currency, dict) or set(currency) - {"name", "code"}:
+            return record
+        extra = {key: value for key, value in record.items() if key not in TRANSACTION_KEYS}
+        return cls(record.get("id"), record.get("state"), record.get("date"), operation_amount.get("amount"),
+                   parse_amount_minor(operation_amount.get("amount")), currency.get("name"), currency.get("code"),
+                   record.get("description"), record.get("from"), record.get("to"), extra)
+
+    @property
+    def date_ts(self) -> Optional[float]:
+        """Дата операции в виде UNIX-времени (даты без часового пояса считаются UTC)."""
+        return parse_timestamp(self.date)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "operationAmount":
+            return OperationAmountView(self)
+        slot = _SLOT_BY_KEY.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Как dict.get, но без перехвата исключения на каждом обращении."""
+        if key == "operationAmount":
+            return OperationAmountView(self)
+        slot = _SLOT_BY_KEY.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            return default if value is None else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None if isinstance(key, str) else False
+
+    def __iter__(self) -> Iterator[str]:
+        for key in TRANSACTION_KEYS:
+            if key == "operationAmount" or getattr(self, _SLOT_BY_KEY[key]) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает обычный словарь в формате нормализованной JSON-выгрузки."""
+        record: Dict[str, Any] = {}
+        for key in self:
+            if key == "operationAmount":
+                record[key] = {
+                    "amount": self.amount,
+                    "currency": {"name": self.currency_name, "code": self.currency_code},
+                }
+            else:
+                record[key] = self[key]
+        return record
+
+
+def as_dict(transaction: Any) -> Dict[str, Any]:
+    """
+    Возвращает транзакцию в виде обычного словаря (для вывода в JSON).
+
+    :param transaction: Словарь или Transaction.
+    :return: Словарь с вложенными словарями operationAmount и currency.
+    """
+    if isinstance(transaction, Transaction):
+        return transaction.to_dict()
+    return dict(transaction)
+
+
+def as_export_dict(transaction: Any) -> Dict[str, Any]:
+    """
+    Возвращает транзакцию в формате JSON-выгрузки банка для вывода пользователю: без поля amount_minor,
+    которое загрузчик вычисляет для расчетов.
+
+    :param transaction: Словарь или Transaction.
+    :return: Словарь с вложенными словарями operationAmount и currency.
+    """
+    record = as_dict(transaction)
+    operation_amount = record.get("operationAmount")
+    if isinstance(operation_amount, Mapping) and "amount_minor" in operation_amount:
+        record["operationAmount"] = {key: value for key, value in operation_amount.items() if key != "amount_minor"}
+    return record
@@ -0,0 +1,172 @@
+import csv
+import mmap
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.loaders import normalize_record, sniff_delimiter
+
+
+class CsvScanner:
+    """
+    Просмотр CSV-выгрузки через mmap без построения словарей для каждой строки.
+
+    Фильтры по статусу, коду валюты и подстроке в описании проверяются на байтах исходного файла:
+    подстрока описания (с учетом регистра) ищется по всему файлу (mmap.find), затем у найденной строки
+    проверяются нужные поля; без нее проверяется каждая строка. В словари декодируются только подошедшие строки.
+    Поля с переводом строки внутри кавычек не поддерживаются (в выгрузках банка их нет).
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            self._mm: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память
+            self._mm = None
+        self.header: List[str] = []
+        self._body_start = 0
+        if self._mm is not None:
+            header_end = self._line_end(0)
+            header_line = self._mm[:header_end].decode("utf-8-sig").rstrip("\r")
+            self.delimiter = sniff_delimiter(header_line)
+            self.header = next(csv.reader([header_line], delimiter=self.delimiter), [])
+            self._body_start = header_end + 1
+        else:
+            self.delimiter = ","
+        self._delimiter_bytes = self.delimiter.encode()
+
+    def close(self) -> None:
+        """Закрывает отображение и файл."""
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "CsvScanner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _line_end(self, position: int) -> int:
+        assert self._mm is not None
+        end = self._mm.find(b"\n", position)
+        return len(self._mm) if end == -1 else end
+
+    def _column(self, name: str) -> int:
+        if name not in self.header:
+            raise ValueError(f"Column {name} is missing in file: {self.file_path}")
+        return self.header.index(name)
+
+    def _split(self, line: bytes) -> List[bytes]:
+        line = line.rstrip(b"\r")
+        if b'"' not in line:
+            return line.split(self._delimiter_bytes)
+        row = next(csv.reader([line.decode("utf-8")], delimiter=self.delimiter), [])
+        return [value.encode("utf-8") for value in row]
+
+    def _candidate_lines(self, anchor: Optional[bytes]) -> Iterator[bytes]:
+        """Возвращает строки файла, содержащие anchor (или все строки, если anchor не задан)."""
+        mm = self._mm
+        if mm is None:
+            return
+        size = len(mm)
+        position = self._body_start
+        while position < size:
+            if anchor is None:
+                line_start = position
+            else:
+                found = mm.find(anchor, position)
+                if found == -1:
+                    return
+                line_start = mm.rfind(b"\n", position - 1, found) + 1
+            line_end = self._line_end(line_start)
+            if line_end > line_start:
+                yield mm[line_start:line_end]
+            position = line_end + 1
+
+    def _matching_fields(self, status: Optional[str], currency: Optional[str], contains: Optional[str],
+                         ignore_case: bool) -> Iterator[List[bytes]]:
+        checks: List[Tuple[int, bytes]] = []
+        if status:
+            checks.append((self._column("state"), status.upper().encode("utf-8")))
+        if currency:
+            checks.append((self._column("currency_code"), currency.upper().encode("utf-8")))
+        description_column = self._column("description") if contains else -1
+        needle = contains.encode("utf-8") if contains else b""
+        folded_needle = contains.casefold() if contains else ""
+
+        # По файлу ищется только подстрока описания с учетом регистра: статус и валюта в файле могут быть
+        # записаны в любом регистре, поэтому точный поиск их байтов пропускал бы строки
+        anchor = needle if contains and not ignore_case else None
+
+        for line in self._candidate_lines(anchor):
+            fields = self._split(line)
+            if any(column >= len(fields) or fields[column].upper() != value for column, value in checks):
+                continue
+            if contains:
+                if description_column >= len(fields):
+                    continue
+                description = fields[description_column]
+                if ignore_case:
+                    if folded_needle not in description.decode("utf-8").casefold():
+                        continue
+                elif needle not in description:
+                    continue
+            yield fields
+
+    def scan(self, status: Optional[str] = None, currency: Optional[str] = None, contains: Optional[str] = None,
+             ignore_case: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Возвращает подходящие под фильтры операции в нормализованном виде (как loaders.load_transactions).
+
+        :param status: Статус операции (без учета регистра).
+        :param currency: Код валюты (без учета регистра).
+        :param contains: Подстрока, которую должно содержать описание.
+        :param ignore_case: Искать подстроку без учета регистра (описание декодируется у строк-кандидатов).
+        :return: Итератор транзакций.
+        """
+        for fields in self._matching_fields(status, currency, contains, ignore_case):
+            record = normalize_record(dict(zip(self.header, (value.decode("utf-8") for value in fields))))
+            if record is not None:
+                yield record
+
+    def count(self, status: Optional[str] = None, currency: Optional[str] = None, contains: Optional[str] = None,
+              ignore_case: bool = False) -> int:
+        """
+        Считает подходящие под фильтры операции, не декодируя строки в словари.
+
+        :return: Количество операций.
+        """
+        return sum(1 for _ in self._matching_fields(status, currency, contains, ignore_case))
+
+
+def scan_csv(file_path: str, status: Optional[str] = None, currency: Optional[str] = None,
+             contains: Optional[str] = None, ignore_case: bool = False) -> List[Dict[str, Any]]:
+    """
+    Возвращает операции из CSV-файла, подходящие под фильтры, без полной загрузки файла.
+
+    :param file_path: Путь к CSV-файлу.
+    :param status: Статус операции (EXECUTED, CANCELED, PENDING).
+    :param currency: Код валюты (например, RUB).
+    :param contains: Подстрока в описании операции.
+    :param ignore_case: Искать подстроку без учета регистра.
+    :return: Список транзакций.
+    """
+    with CsvScanner(file_path) as scanner:
+        return list(scanner.scan(status, currency, contains, ignore_case))
+
+
+def count_csv(file_path: str, status: Optional[str] = None, currency: Optional[str] = None,
+              contains: Optional[str] = None, ignore_case: bool = False) -> int:
+    """
+    Считает операции в CSV-файле, подходящие под фильтры, не создавая словарей.
+
+    :param file_path: Путь к CSV-файлу.
+    :param status: Статус операции (EXECUTED, CANCELED, PENDING).
+    :param currency: Код валюты (например, RUB).
+    :param contains: Подстрока в описании операции.
+    :param ignore_case: Искать подстроку без учета регистра.
+    :return: Количество операций.
+    """
+    with CsvScanner(file_path) as scanner:
+        return scanner.count(status, currency, contains, ignore_case)
@@ -0,0 +1,426 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import compress
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.accounts import AccountIndex
+from src.aggregations import Aggregator
+from src.date_index import DEFAULT_PAGE_SIZE, DateIndex, paginate
+from src.follow import FollowState, read_appended
+from src.loaders import LOAD_ERRORS, detect_compression, detect_format, iter_transactions
+from src.logger_config import setup_logger
+from src.pipeline import collect_sources, expand_inputs
+from src.processing import rub_mask
+from src.records import Transaction, as_export_dict, date_sort_key
+from src.utils import casefold_descriptions, search_transactions
+
+# Создание и получение именованного логгера
+service_logger = setup_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Как часто (в секундах) запросы проверяют mtime файлов
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_LIMIT = 100
+
+
+class _FileEntry:
+    """Загруженный файл: mtime и размер на момент чтения, операции и позиция чтения (для CSV)."""
+
+    def __init__(self, mtime_ns: int, size: int, transactions: List[Dict[str, Any]],
+                 follow_state: Optional[FollowState] = None) -> None:
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.transactions = transactions
+        self.follow_state = follow_state
+
+
+class _Column:
+    """
+    Операции одного среза набора данных (все операции или один статус) и вычисленные заранее колонки:
+    описания в casefold() и признак рублевой операции.
+    """
+
+    def __init__(self, transactions: List[Dict[str, Any]]) -> None:
+        self.transactions = transactions
+        self.folded = casefold_descriptions(transactions)
+        self.rub = rub_mask(transactions)
+
+
+class Snapshot:
+    """
+    Неизменяемое состояние набора данных, которое обслуживает запросы: срезы операций (все и по статусам)
+    в порядке файлов и в порядке дат, с заранее вычисленными колонками. Фильтры сохраняют порядок среза,
+    поэтому сортировка по дате в запросе ничего не стоит. При перезагрузке файлов создается новый снимок,
+    а запросы, начатые раньше, дочитывают старый.
+    """
+
+    def __init__(self, transactions: List[Dict[str, Any]], files: int, version: int) -> None:
+        self.files = files
+        self.version = version
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.rows = len(transactions)
+        by_date = sorted(transactions, key=date_sort_key)
+        self._columns = {"file": self._slices(transactions), "date": self._slices(by_date)}
+        self._date_index: Optional[DateIndex] = None
+        self._account_index: Optional[AccountIndex] = None
+
+    @property
+    def date_index(self) -> DateIndex:
+        """Индекс дат для постраничной выдачи по курсору (строится при первом запросе /page)."""
+        if self._date_index is None:
+            self._date_index = DateIndex(self._columns["file"][None].transactions)
+        return self._date_index
+
+    @property
+    def account_index(self) -> AccountIndex:
+        """Индекс счетов и карт для выписок (строится при первом запросе /account)."""
+        if self._account_index is None:
+            self._account_index = AccountIndex(self._columns["file"][None].transactions)
+        return self._account_index
+
+    @staticmethod
+    def _slices(transactions: List[Dict[str, Any]]) -> Dict[Optional[str], _Column]:
+        by_state: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for transaction in transactions:
+            state = transaction.get("state")
+            if state:
+                by_state.setdefault(str(state).lower(), []).append(transaction)
+        by_state[None] = transactions
+        return {state: _Column(rows) for state, rows in by_state.items()}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def select(self, status: Optional[str] = None, rub_only: bool = False, search: Optional[Sequence[str]] = None,
+               search_mode: str = "all", sort: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Отбирает операции теми же фильтрами, что и пакетный режим main.
+
+        :param status: Статус операции (без учета регистра).
+        :param rub_only: Только рублевые операции.
+        :param search: Строки для поиска в описании.
+        :param search_mode: 'all' — должны встречаться все строки, 'any' — хотя бы одна.
+        :param sort: 'asc' или 'desc' — сортировка по дате, None — порядок файлов.
+        :return: Список операций.
+        """
+        column = self._columns["date" if sort else "file"].get(status.lower() if status else None, _EMPTY)
+        transactions, folded = column.transactions, column.folded
+        if rub_only:
+            transactions = list(compress(transactions, column.rub))
+            folded = list(compress(folded, column.rub))
+        if search:
+            transactions = search_transactions(transactions, search, search_mode, folded=folded)
+        elif transactions is column.transactions:
+            transactions = list(transactions)
+        if sort == "desc":
+            transactions.reverse()
+        return transactions
+
+
+_EMPTY = _Column([])
+
+
+class DatasetStore:
+    """
+    Набор файлов, загруженный один раз и общий для всех клиентов службы.
+
+    Файлы перечитываются, только если изменились их mtime или размер: в CSV-файлы, которые только дописываются,
+    читаются лишь новые строки (follow.read_appended), остальные файлы загружаются заново. Проверка выполняется
+    не чаще check_interval и не блокирует запросы: пока один поток перезагружает файлы, остальные отвечают
+    по предыдущему снимку.
+    """
+
+    def __init__(self, sources: Sequence[str], check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 compact: bool = False) -> None:
+        self.sources = list(sources)
+        self.check_interval = check_interval
+        self.compact = compact
+        self._files: Dict[str, _FileEntry] = {}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._snapshot = Snapshot([], 0, 0)
+        self.refresh()
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """Текущий снимок набора данных."""
+        return self._snapshot
+
+    def paths(self) -> List[str]:
+        """Раскрывает glob-шаблоны и каталоги источников в список файлов (новые файлы подхватываются)."""
+        paths, _ = expand_inputs(self.sources)
+        return collect_sources(paths)
+
+    def _load(self, path: str, stat: os.stat_result, entry: Optional[_FileEntry]) -> _FileEntry:
+        fmt = detect_format(path)
+        if fmt == "csv" and detect_compression(path) is None:
+            if entry is not None and entry.follow_state is not None and stat.st_size >= entry.size:
+                rows, follow_state = read_appended(path, entry.follow_state)
+                if follow_state.header_hash == entry.follow_state.header_hash \
+                        and follow_state.offset >= entry.follow_state.offset:
+                    appended = [Transaction.from_record(row) for row in rows] if self.compact else rows
+                    # Новый список: старый снимок продолжает читать прежний
+                    return _FileEntry(stat.st_mtime_ns, stat.st_size, entry.transactions + appended, follow_state)
+            rows, follow_state = read_appended(path)
+            if follow_state.offset == stat.st_size:
+                transactions = [Transaction.from_record(row) for row in rows] if self.compact else rows
+                return _FileEntry(stat.st_mtime_ns, stat.st_size, transactions, follow_state)
+        # Последняя строка CSV без перевода строки, сжатый файл или другой формат: файл читается загрузчиком целиком
+        transactions = list(iter_transactions(path, fmt, compact=self.compact))
+        return _FileEntry(stat.st_mtime_ns, stat.st_size, transactions)
+
+    def refresh(self) -> bool:
+        """
+        Перечитывает изменившиеся файлы и, если что-то изменилось, публикует новый снимок.
+
+        :return: True, если снимок обновлен.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        self._checked_at = time.monotonic()
+        files: Dict[str, _FileEntry] = {}
+        changed = False
+        for path in self.paths():
+            key = os.path.abspath(path)
+            entry = self._files.get(key)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                service_logger.warning(f"File is missing: {path}")
+                continue
+            try:
+                if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                    entry = self._load(path, stat, entry)
+                    changed = True
+                    service_logger.info(f"Loaded {path}: {len(entry.transactions)} rows")
+            except LOAD_ERRORS as e:
+                # Файл, который не удалось прочитать, остается в прежнем виде до следующего изменения
+                service_logger.error(f"Error loading {path}: {e}")
+            if entry is not None:
+                files[key] = entry
+        changed = changed or files.keys() != self._files.keys()
+        if changed:
+            transactions = [row for entry in files.values() for row in entry.transactions]
+            try:
+                snapshot = Snapshot(transactions, len(files), self._snapshot.version + 1)
+            except Exception as e:
+                # Запросы продолжают обслуживаться по предыдущему снимку, файлы перечитываются при следующей проверке
+                service_logger.error(f"Error building snapshot, keeping version {self._snapshot.version}: {e!r}")
+                return False
+            self._snapshot = snapshot
+            service_logger.info(f"Snapshot {snapshot.version}: {len(files)} files, {len(transactions)} rows")
+        self._files = files
+        return changed
+
+    def current(self) -> Snapshot:
+        """
+        Возвращает снимок, предварительно проверив файлы, если с прошлой проверки прошло check_interval.
+        Если файлы уже проверяет другой поток, сразу возвращается текущий снимок.
+
+        :return: Снимок набора данных.
+        """
+        if time.monotonic() - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+        return self._snapshot
+
+
+def _flag(params: Dict[str, List[str]], name: str) -> bool:
+    return params.get(name, [""])[-1].lower() in ("1", "true", "yes", "да")
+
+
+def _int(params: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+    value = params.get(name, [""])[-1]
+    if not value:
+        return default
+    number = int(value)
+    if number < 0:
+        raise ValueError(f"{name} must not be negative")
+    return number
+
+
+def _select(snapshot: Snapshot, params: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    sort = params.get("sort", [""])[-1] or None
+    if sort not in (None, "asc", "desc"):
+        raise ValueError(f"Invalid sort: {sort}")
+    search_mode = params.get("search_mode", ["all"])[-1]
+    if search_mode not in ("all", "any"):
+        raise ValueError(f"Invalid search_mode: {search_mode}")
+    return snapshot.select(params.get("status", [""])[-1] or None, _flag(params, "rub_only"),
+                           params.get("search"), search_mode, sort)
+
+
+def handle_query(store: DatasetStore, path: str, query: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    Выполняет запрос к набору данных.
+
+    - /health — количество файлов и операций, версия снимка;
+    - /transactions?status=&rub_only=1&search=&search_mode=any&sort=desc&limit=&offset= — операции;
+    - /page?status=&rub_only=1&search=&date_from=&date_to=&sort=desc&page_size=50&cursor= — страница операций
+      и курсор следующей;
+    - /account?number=&direction=in|out|both&status=&limit=&offset= — выписка и оборот счета или карты;
+    - /aggregate?group_by=month,currency&<фильтры> — итоги по группам.
+
+    :param store: Набор данных.
+    :param path: Путь запроса.
+    :param query: Строка параметров запроса.
+    :return: Кортеж (HTTP-статус, тело ответа).
+    """
+    params = parse_qs(query)
+    try:
+        snapshot = store.current()
+        if path == "/health":
+            return 200, {"files": snapshot.files, "rows": len(snapshot), "version": snapshot.version,
+                         "loaded_at": snapshot.loaded_at}
+        if path == "/transactions":
+            transactions = _select(snapshot, params)
+            offset = _int(params, "offset", 0) or 0
+            limit = _int(params, "limit", DEFAULT_LIMIT)
+            selected = transactions[offset:None if limit is None else offset + limit]
+            return 200, {"total": len(transactions), "offset": offset, "version": snapshot.version,
+                         "transactions": [as_export_dict(transaction) for transaction in selected]}
+        if path == "/page":
+            sort = params.get("sort", ["asc"])[-1]
+            if sort not in ("asc", "desc"):
+                raise ValueError(f"Invalid sort: {sort}")
+            page = paginate(snapshot.date_index, _int(params, "page_size", DEFAULT_PAGE_SIZE) or DEFAULT_PAGE_SIZE,
+                            params.get("cursor", [""])[-1] or None, sort == "desc",
+                            params.get("status", [""])[-1] or None, _flag(params, "rub_only"), params.get("search"),
+                            params.get("search_mode", ["all"])[-1], params.get("date_from", [""])[-1] or None,
+                            params.get("date_to", [""])[-1] or None)
+            return 200, {"version": snapshot.version, "next_cursor": page.next_cursor,
+                         "transactions": [as_export_dict(transaction) for transaction in page.items]}
+        if path == "/account":
+            accounts = snapshot.account_index
+            number = params.get("number", [""])[-1]
+            if number not in accounts:
+                return 404, {"error": f"Unknown account: {number}"}
+            transactions = accounts.statement(number, params.get("direction", ["both"])[-1],
+                                              params.get("status", [""])[-1] or None)
+            offset = _int(params, "offset", 0) or 0
+            limit = _int(params, "limit", DEFAULT_LIMIT)
+            selected = transactions[offset:None if limit is None else offset + limit]
+            balance = {code: str(amount) for code, amount in accounts.balance(number).items()}
+            return 200, {"account": accounts.masked(number), "total": len(transactions), "offset": offset,
+                         "version": snapshot.version, "balance": balance,
+                         "transactions": [as_export_dict(transaction) for transaction in selected]}
+        if path == "/aggregate":
+            keys = [key.strip() for key in params.get("group_by", ["currency"])[-1].split(",") if key.strip()]
+            aggregator = Aggregator(keys).update(_select(snapshot, params))
+            return 200, {"rows": aggregator.rows, "version": snapshot.version, "groups": aggregator.rows_as_dicts()}
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    except Exception as e:
+        # Непредвиденная ошибка не обрывает соединение: клиент получает ответ 500
+        service_logger.error(f"Error handling {path}?{query}: {e!r}")
+        return 500, {"error": "Internal error"}
+    return 404, {"error": f"Unknown path: {path}"}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP-запросов службы: отвечает JSON по снимку набора данных сервера."""
+
+    server_version = "SkyProQuery/1.0"
+
+    def do_GET(self) -> None:
+        """Отвечает на GET-запрос."""
+        url = urlsplit(self.path)
+        started = time.perf_counter()
+        status, body = handle_query(self.server.store, url.path, url.query)  # type: ignore[attr-defined]
+        payload = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-Query-Time-Ms", f"{(time.perf_counter() - started) * 1000:.2f}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Пишет журнал запросов в логгер службы вместо stderr."""
+        service_logger.info(format % args)
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    """HTTP-сервер службы на localhost: каждый клиент обслуживается в отдельном потоке."""
+
+    store: DatasetStore
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP-сервер на Unix-сокете: каждый клиент обслуживается в отдельном потоке."""
+
+    daemon_threads = True
+    store: DatasetStore
+
+
+def make_server(store: DatasetStore, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Создает сервер запросов к набору данных (HTTP на localhost или на Unix-сокете).
+
+    :param store: Набор данных.
+    :param host: Адрес для HTTP.
+    :param port: Порт для HTTP (0 — любой свободный).
+    :param socket_path: Путь к Unix-сокету (если задан, используется вместо HTTP-порта).
+    :return: Сервер, готовый к serve_forever().
+    """
+    server: socketserver.BaseServer
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, QueryHandler)
+    else:
+        server = QueryHTTPServer((host, port), QueryHandler)
+    server.store = store
+    return server
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа: python -m src.service exports/ data/operations.json --port 8765
+
+    :return: Код завершения.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.service",
+                                     description="Локальная служба запросов к загруженным выгрузкам.")
+    parser.add_argument("sources", nargs="+", help="Файлы, каталоги или glob-шаблоны.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Адрес HTTP-сервера.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт HTTP-сервера.")
+    parser.add_argument("--socket", dest="socket_path", help="Слушать Unix-сокет вместо HTTP-порта.")
+    parser.add_argument("--check-interval", type=float, default=DEFAULT_CHECK_INTERVAL,
+                        help="Как часто проверять изменения файлов, секунд.")
+    parser.add_argument("--compact", action="store_true", help="Хранить операции в компактных записях Transaction.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    store = DatasetStore(args.sources, args.check_interval, args.compact)
+    server = make_server(store, args.host, args.port, args.socket_path)
+    address = f"http://{args.host}:{server.server_port}" if isinstance(server, QueryHTTPServer) else args.socket_path
+    print(f"Загружено файлов: {store.snapshot.files}, операций: {len(store.snapshot)} "
+          f"за {time.perf_counter() - started:.3f} с. Служба доступна: {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket_path and os.path.exists(args.socket_path):
+            os.unlink(args.socket_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
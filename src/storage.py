@@ -0,0 +1,330 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.amounts import get_amount_minor
+from src.loaders import iter_transactions
+from src.logger_config import setup_logger
+from src.records import parse_timestamp
+
+# Создание и получение именованного логгера
+storage_logger = setup_logger(__name__)
+
+# Количество строк в одном вызове executemany
+IMPORT_BATCH_SIZE = 10000
+# Минимальная длина строки поиска для полнотекстового индекса trigram
+FTS_MIN_TERM_LENGTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    rowid INTEGER PRIMARY KEY,
+    id INTEGER,
+    state TEXT,
+    date TEXT,
+    ts REAL,
+    amount TEXT,
+    amount_minor INTEGER,
+    currency_name TEXT,
+    currency_code TEXT,
+    description TEXT,
+    from_account TEXT,
+    to_account TEXT,
+    extra TEXT
+);
+"""
+
+# Индексы по статусу, валюте, дате и счетам: {имя: определение}
+INDEXES = {
+    "transactions_state": "transactions (state COLLATE NOCASE)",
+    "transactions_currency": "transactions (currency_code COLLATE NOCASE)",
+    "transactions_ts": "transactions (ts)",
+    "transactions_from": "transactions (from_account)",
+    "transactions_to": "transactions (to_account)",
+}
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    description, content='transactions', content_rowid='rowid', tokenize='trigram'
+);
+"""
+
+COLUMNS = ("id", "state", "date", "ts", "amount", "amount_minor", "currency_name", "currency_code", "description",
+           "from_account", "to_account", "extra")
+_KNOWN_KEYS = {"id", "state", "date", "operationAmount", "description", "from", "to"}
+_SELECT = "SELECT id, state, date, amount, amount_minor, currency_name, currency_code, description, " \
+          "from_account, to_account, extra FROM transactions"
+
+
+def to_row(transaction: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Переводит нормализованную операцию в строку таблицы transactions (в порядке COLUMNS).
+
+    :param transaction: Словарь или records.Transaction.
+    :return: Кортеж значений колонок.
+    """
+    operation_amount = transaction.get("operationAmount") or {}
+    currency = operation_amount.get("currency") or {}
+    transaction_id = transaction.get("id")
+    extra = {key: value for key, value in transaction.items() if key not in _KNOWN_KEYS}
+    if transaction_id is not None and type(transaction_id) is not int:
+        # Нечисловой идентификатор сохраняется в extra, чтобы вернуть его без изменений
+        extra["id"] = transaction_id
+        transaction_id = None
+    date = transaction.get("date")
+    return (transaction_id, transaction.get("state"), date, parse_timestamp(date), operation_amount.get("amount"),
+            get_amount_minor(transaction), currency.get("name"), currency.get("code"),
+            transaction.get("description"), transaction.get("from"), transaction.get("to"),
+            json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+
+
+def from_row(row: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Восстанавливает нормализованную операцию из строки запроса _SELECT.
+
+    :param row: Значения колонок.
+    :return: Словарь в формате JSON-выгрузки (пустые поля опускаются, как в loaders.normalize_record).
+    """
+    (transaction_id, state, date, amount, _, currency_name, currency_code, description, from_account,
+     to_account, extra) = row
+    record: Dict[str, Any] = {}
+    for key, value in (("id", transaction_id), ("state", state), ("date", date)):
+        if value is not None:
+            record[key] = value
+    record["operationAmount"] = {
+        "amount": amount,
+        "currency": {"name": currency_name, "code": currency_code},
+    }
+    for key, value in (("description", description), ("from", from_account), ("to", to_account)):
+        if value is not None:
+            record[key] = value
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+
+def _casefold(value: Any) -> str:
+    return str(value or "").casefold()
+
+
+class TransactionStore:
+    """
+    Хранилище операций в файле SQLite для наборов данных, которые не помещаются в память.
+
+    Операции импортируются пачками через executemany в одной транзакции; фильтры по статусу и валюте,
+    сортировка по дате и поиск по описанию выполняются запросами по индексам (поиск — по полнотекстовому
+    индексу FTS5 trigram, если он доступен) и возвращают записи потоком.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.create_function("casefold", 1, _casefold, deterministic=True)
+        self.connection.executescript(SCHEMA)
+        self._create_indexes()
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite собран без FTS5 или без токенизатора trigram: поиск выполняется без индекса
+            storage_logger.warning(f"Full-text index is not available: {e}")
+            self.fts = False
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+    def __len__(self) -> int:
+        count: int = self.connection.execute("SELECT count(*) FROM transactions").fetchone()[0]
+        return count
+
+    def _create_indexes(self) -> None:
+        for name, definition in INDEXES.items():
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+    def import_transactions(self, transactions: Iterable[Dict[str, Any]],
+                            batch_size: int = IMPORT_BATCH_SIZE) -> int:
+        """
+        Добавляет операции в хранилище пачками по batch_size строк в одной транзакции.
+        При импорте в пустую таблицу индексы строятся один раз после вставки, а не обновляются на каждой строке.
+
+        :param transactions: Нормализованные транзакции (список или итератор загрузчика).
+        :param batch_size: Количество строк в одном вызове executemany.
+        :return: Количество добавленных операций.
+        """
+        insert = f"INSERT INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        rows = map(to_row, transactions)
+        count = 0
+        started = time.perf_counter()
+        with self.connection:
+            first_rowid = self.connection.execute("SELECT coalesce(max(rowid), 0) + 1 FROM transactions").fetchone()[0]
+            if first_rowid == 1:
+                for name in INDEXES:
+                    self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self.connection.executemany(insert, batch)
+                count += len(batch)
+            if self.fts and count:
+                # Индекс описаний дополняется одним запросом после вставки всех строк
+                self.connection.execute("INSERT INTO transactions_fts (rowid, description) "
+                                        "SELECT rowid, description FROM transactions WHERE rowid >= ?",
+                                        (first_rowid,))
+            self._create_indexes()
+        storage_logger.info(f"Imported {count} rows into {self.path} in {time.perf_counter() - started:.3f} s")
+        return count
+
+    def import_file(self, file_path: str, fmt: Optional[str] = None) -> int:
+        """
+        Импортирует файл любого поддерживаемого формата, не загружая его в память целиком.
+
+        :param file_path: Путь к файлу.
+        :param fmt: Формат файла (по умолчанию определяется автоматически).
+        :return: Количество добавленных операций.
+        """
+        return self.import_transactions(iter_transactions(file_path, fmt))
+
+    def _search_clause(self, terms: Sequence[str], mode: str) -> Tuple[str, List[Any]]:
+        clauses = []
+        params: List[Any] = []
+        fts_terms = [term for term in terms if self.fts and len(term) >= FTS_MIN_TERM_LENGTH]
+        if fts_terms:
+            # Строки поиска передаются фразами в кавычках: специальные символы FTS не интерпретируются
+            query = f" {'AND' if mode == 'all' else 'OR'} ".join(
+                '"' + term.replace('"', '""') + '"' for term in fts_terms)
+            clauses.append("rowid IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)")
+            params.append(query)
+        for term in terms:
+            if term not in fts_terms:
+                clauses.append("instr(casefold(description), ?) > 0")
+                params.append(term.casefold())
+        return "(" + (" AND " if mode == "all" else " OR ").join(clauses) + ")", params
+
+    def build_query(self, state: Optional[str] = None, rub_only: bool = False,
+                    search: Optional[Sequence[str]] = None, search_mode: str = "all", sort: Optional[str] = None,
+                    limit: Optional[int] = None, ignore_case: bool = True) -> Tuple[str, List[Any]]:
+        """
+        Переводит фильтры в SQL-запрос.
+
+        :return: Кортеж (текст запроса, параметры).
+        """
+        where = []
+        params: List[Any] = []
+        if state:
+            where.append("state = ?" + (" COLLATE NOCASE" if ignore_case else ""))
+            params.append(state)
+        if rub_only:
+            where.append("currency_code = 'RUB' COLLATE NOCASE")
+        terms = [term for term in ([search] if isinstance(search, str) else search or []) if term]
+        if terms:
+            clause, search_params = self._search_clause(terms, search_mode)
+            where.append(clause)
+            params.extend(search_params)
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "")
+        if sort:
+            sql += f" ORDER BY ts {'DESC' if sort == 'desc' else 'ASC'}, rowid"
+        else:
+            sql += " ORDER BY rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def query(self, state: Optional[str] = None, rub_only: bool = False, search: Optional[Sequence[str]] = None,
+              search_mode: str = "all", sort: Optional[str] = None, limit: Optional[int] = None,
+              ignore_case: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Возвращает операции, подходящие под фильтры, потоком (строки читаются из базы по мере перебора).
+
+        :param state: Статус операции.
+        :param rub_only: Только рублевые операции.
+        :param search: Строка или список строк для поиска в описании (без учета регистра).
+        :param search_mode: 'all' — должны встречаться все строки, 'any' — хотя бы одна.
+        :param sort: 'asc' или 'desc' — сортировка по дате, None — порядок импорта.
+        :param limit: Максимальное количество операций.
+        :param ignore_case: Сравнивать статус без учета регистра (как main), False — точно (как processing).
+        :return: Итератор нормализованных транзакций.
+        """
+        sql, params = self.build_query(state, rub_only, search, search_mode, sort, limit, ignore_case)
+        for row in self.connection.execute(sql, params):
+            yield from_row(row)
+
+    def explain(self, **filters: Any) -> List[str]:
+        """Возвращает план выполнения запроса с заданными фильтрами (для проверки использования индексов)."""
+        sql, params = self.build_query(**filters)
+        return [row[-1] for row in self.connection.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def filter_by_state(self, state: str = "EXECUTED") -> List[Dict[str, Any]]:
+        """Аналог processing.filter_by_state: операции с точно совпадающим статусом."""
+        return list(self.query(state=state, ignore_case=False))
+
+    def sort_by_date(self, is_ascending: bool = True) -> List[Dict[str, Any]]:
+        """Аналог processing.sort_by_date: все операции, отсортированные по дате."""
+        return list(self.query(sort="asc" if is_ascending else "desc"))
+
+    def rub_transactions(self) -> List[Dict[str, Any]]:
+        """Рублевые операции (аналог фильтра --rub-only)."""
+        return list(self.query(rub_only=True))
+
+    def search_transactions(self, search_string: Any, mode: str = "all") -> List[Dict[str, Any]]:
+        """Аналог utils.search_transactions: поиск по описанию без учета регистра."""
+        return list(self.query(search=search_string, search_mode=mode))
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа:
+    python -m src.storage import transactions.db exports/*.csv
+    python -m src.storage query transactions.db --status executed --search карты --sort desc --limit 20
+
+    :return: Код завершения.
+    """
+    from src.main import write_output
+
+    parser = argparse.ArgumentParser(prog="python -m src.storage", description="Хранилище операций в SQLite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Импортировать файлы в базу.")
+    import_parser.add_argument("database", help="Файл базы SQLite.")
+    import_parser.add_argument("files", nargs="+", help="Файлы выгрузок.")
+    query_parser = commands.add_parser("query", help="Выбрать операции из базы.")
+    query_parser.add_argument("database", help="Файл базы SQLite.")
+    query_parser.add_argument("--status", help="Статус операций.")
+    query_parser.add_argument("--rub-only", action="store_true", help="Только рублевые операции.")
+    query_parser.add_argument("--search", action="append", help="Строка поиска в описании (можно несколько раз).")
+    query_parser.add_argument("--search-any", action="store_true", help="Искать хотя бы одну из строк.")
+    query_parser.add_argument("--sort", choices=["asc", "desc"], help="Сортировка по дате.")
+    query_parser.add_argument("--limit", type=int, help="Максимальное количество операций.")
+    query_parser.add_argument("--format", choices=["text", "json", "csv"], default="text", dest="output_format",
+                              help="Формат вывода.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with TransactionStore(args.database) as store:
+        if args.command == "import":
+            total = 0
+            for file_path in args.files:
+                total += store.import_file(file_path)
+            print(f"Импортировано операций: {total}, всего в базе: {len(store)}. "
+                  f"Время: {time.perf_counter() - started:.3f} с.", file=sys.stderr)
+        else:
+            results = list(store.query(args.status, args.rub_only, args.search,
+                                       "any" if args.search_any else "all", args.sort, args.limit))
+            write_output(results, args.output_format)
+            print(f"Найдено операций: {len(results)}. Время: {time.perf_counter() - started:.3f} с.",
+                  file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
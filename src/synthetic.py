@@ -0,0 +1,151 @@
+import csv
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+
+# Те же поля, что и в выгрузках банка (см. data/transactions.csv)
+CSV_FIELDS = ["id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description"]
+
+STATES = ["EXECUTED", "CANCELED", "PENDING"]
+STATE_WEIGHTS = [70, 15, 15]
+
+CURRENCIES = [("руб.", "RUB"), ("USD", "USD"), ("Euro", "EUR"), ("Yuan Renminbi", "CNY"), ("Sol", "PEN")]
+CURRENCY_WEIGHTS = [55, 25, 10, 6, 4]
+
+CARD_TYPES = ["Maestro", "MasterCard", "Visa Classic", "Visa Platinum", "Visa Gold", "МИР", "Discover"]
+
+# Описание операции -> (откуда, куда): "account", "card" или None
+DESCRIPTIONS = {
+    "Перевод организации": ("card", "account"),
+    "Перевод со счета на счет": ("account", "account"),
+    "Перевод с карты на карту": ("card", "card"),
+    "Перевод с карты на счет": ("card", "account"),
+    "Открытие вклада": (None, "account"),
+}
+DESCRIPTION_WEIGHTS = [35, 25, 20, 10, 10]
+
+START_DATE = datetime(2018, 1, 1)
+PERIOD_SECONDS = 6 * 365 * 24 * 60 * 60
+
+
+def _account_or_card(rng: random.Random, kind: str) -> str:
+    if kind == "account":
+        return f"Счет {rng.randrange(10 ** 19, 10 ** 20)}"
+    return f"{rng.choice(CARD_TYPES)} {rng.randrange(10 ** 15, 10 ** 16)}"
+
+
+def generate_transactions(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Генерирует правдоподобные операции в формате generators.transactions (JSON-выгрузки).
+    Результат полностью определяется seed, поэтому наборы данных воспроизводимы.
+
+    :param count: Количество операций.
+    :param seed: Начальное значение генератора случайных чисел.
+    :return: Итератор транзакций.
+    """
+    rng = random.Random(seed)
+    descriptions = list(DESCRIPTIONS)
+    for _ in range(count):
+        name, code = rng.choices(CURRENCIES, CURRENCY_WEIGHTS)[0]
+        description = rng.choices(descriptions, DESCRIPTION_WEIGHTS)[0]
+        from_kind, to_kind = DESCRIPTIONS[description]
+        date = START_DATE + timedelta(seconds=rng.randrange(PERIOD_SECONDS), microseconds=rng.randrange(10 ** 6))
+        transaction: Dict[str, Any] = {
+            "id": rng.randrange(10 ** 8, 10 ** 9),
+            "state": rng.choices(STATES, STATE_WEIGHTS)[0],
+            "date": date.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            "operationAmount": {
+                "amount": f"{rng.randrange(100, 10 ** 7) / 100:.2f}",
+                "currency": {"name": name, "code": code},
+            },
+            "description": description,
+        }
+        if from_kind:
+            transaction["from"] = _account_or_card(rng, from_kind)
+        transaction["to"] = _account_or_card(rng, to_kind)
+        yield transaction
+
+
+def flatten(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Переводит операцию в плоскую строку CSV/XLSX-выгрузки.
+
+    :param transaction: Транзакция в формате JSON-выгрузки.
+    :return: Словарь с полями CSV_FIELDS.
+    """
+    operation_amount = transaction.get("operationAmount", {})
+    currency = operation_amount.get("currency", {})
+    row = {field: transaction.get(field, "") for field in CSV_FIELDS}
+    row["amount"] = operation_amount.get("amount", "")
+    row["currency_name"] = currency.get("name", "")
+    row["currency_code"] = currency.get("code", "")
+    return row
+
+
+def write_json(file_path: str, count: int, seed: int = 0) -> None:
+    """
+    Записывает синтетический JSON-файл, не держа все операции в памяти.
+
+    :param file_path: Путь к файлу.
+    :param count: Количество операций.
+    :param seed: Начальное значение генератора.
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write("[")
+        for number, transaction in enumerate(generate_transactions(count, seed)):
+            file.write(",\n" if number else "\n")
+            file.write(json.dumps(transaction, ensure_ascii=False))
+        file.write("\n]\n")
+
+
+def write_csv(file_path: str, count: int, seed: int = 0) -> None:
+    """
+    Записывает синтетический CSV-файл в формате выгрузки банка (разделитель ';').
+
+    :param file_path: Путь к файлу.
+    :param count: Количество операций.
+    :param seed: Начальное значение генератора.
+    """
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS, delimiter=";", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(flatten(transaction) for transaction in generate_transactions(count, seed))
+
+
+def write_xlsx(file_path: str, count: int, seed: int = 0) -> None:
+    """
+    Записывает синтетический XLSX-файл в режиме write-only (строки не накапливаются в памяти).
+
+    :param file_path: Путь к файлу.
+    :param count: Количество операций.
+    :param seed: Начальное значение генератора.
+    """
+    import openpyxl  # type: ignore[import-untyped]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(CSV_FIELDS)
+    for transaction in generate_transactions(count, seed):
+        row = flatten(transaction)
+        sheet.append([row[field] if row[field] != "" else None for field in CSV_FIELDS])
+    workbook.save(file_path)
+
+
+WRITERS = {"json": write_json, "csv": write_csv, "xlsx": write_xlsx}
+
+
+def write_dataset(file_path: str, fmt: str, count: int, seed: int = 0) -> str:
+    """
+    Записывает синтетический набор данных в заданном формате.
+
+    :param file_path: Путь к файлу.
+    :param fmt: Формат: json, csv или xlsx.
+    :param count: Количество операций.
+    :param seed: Начальное значение генератора.
+    :return: Путь к файлу.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported dataset format: {fmt}")
+    WRITERS[fmt](file_path, count, seed)
+    return file_path
@@ -2,13 +2,15 @@ import csv
 import json
 import os
 import re
+import sys
 from collections import Counter
-from typing import Any, Dict, Hashable, List
-
-import openpyxl
-import pandas as pd
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union, cast
 
+from src.loaders import load_transactions, sniff_delimiter
 from src.logger_config import setup_logger
+from src.storage import TransactionStore
 
 # Создание и получение именованного логгера
 utils_logger = setup_logger(__name__)
@@ -40,30 +42,94 @@ def read_transactions_json(file_path: str) -> List[Dict[str, Any]]:
         return []
 
 
-def read_transactions_csv(file_path: str) -> List[Dict[Hashable, Any]]:
+def _infer_column_converter(values: List[str]) -> Callable[[str], Any]:
+    """
+    Подбирает тип колонки так же, как это делает pandas: int, если все непустые значения целые,
+    float, если все числовые, иначе строка.
+    """
+    for converter in (int, float):
+        try:
+            for value in values:
+                if value != "":
+                    converter(value)
+        except ValueError:
+            continue
+        return _typed_converter(converter)
+    return _typed_converter(str)
+
+
+def _typed_converter(converter: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Оборачивает конвертер колонки: пустая ячейка становится None, неподходящее значение остается строкой."""
+
+    def convert(value: str) -> Any:
+        if value == "":
+            return None
+        try:
+            return converter(value)
+        except ValueError:
+            return value
+
+    return convert
+
+
+# Конвертеры для известных колонок выгрузки; тип остальных колонок определяется по их значениям.
+# Повторяющиеся значения (статус, валюта, описание) интернируются, чтобы строки не дублировались в памяти.
+CSV_COLUMN_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "id": _typed_converter(int),
+    "amount": _typed_converter(float),
+    "state": _typed_converter(sys.intern),
+    "date": _typed_converter(str),
+    "currency_name": _typed_converter(sys.intern),
+    "currency_code": _typed_converter(sys.intern),
+    "from": _typed_converter(str),
+    "to": _typed_converter(str),
+    "description": _typed_converter(sys.intern),
+}
+
+
+def read_transactions_csv(file_path: str, as_dataframe: bool = False) -> Any:
     """
     Читает CSV-файл и возвращает список словарей с данными о финансовых транзакциях.
+    Используется стандартный модуль csv с типизированными конвертерами колонок; pandas
+    импортируется, только если явно запрошен DataFrame.
 
     :param file_path: Путь к CSV-файлу.
-    :return: Список транзакций.
+    :param as_dataframe: Вернуть pandas.DataFrame вместо списка словарей.
+    :return: Список транзакций (или DataFrame).
     """
     if not os.path.exists(file_path):
         utils_logger.warning(f"File does not exist: {file_path}")
         return []
 
     try:
-        df = pd.read_csv(file_path)
-        if df.empty or not isinstance(df, pd.DataFrame):
-            utils_logger.warning(f"File is empty or not a DataFrame: {file_path}")
+        with open(file_path, encoding="utf-8", newline="") as file:
+            header_line = file.readline()
+            reader = csv.reader(chain([header_line], file), delimiter=sniff_delimiter(header_line))
+            header = next(reader, [])
+            rows: Iterable[List[str]] = (row for row in reader if row)
+            if any(column not in CSV_COLUMN_CONVERTERS for column in header):
+                # Для неизвестных колонок тип определяется по всем значениям, поэтому строки читаются заранее
+                rows = list(rows)
+            converters = [
+                CSV_COLUMN_CONVERTERS.get(column)
+                or _infer_column_converter([row[i] for row in cast(List[List[str]], rows) if i < len(row)])
+                for i, column in enumerate(header)
+            ]
+            transactions = [
+                {column: convert(value) for column, convert, value in zip(header, converters, row)} for row in rows
+            ]
+
+        if not transactions:
+            utils_logger.warning(f"File is empty: {file_path}")
             return []
         utils_logger.info(f"Successfully read CSV file: {file_path}")
-        return df.to_dict(orient="records")
+        if as_dataframe:
+            import pandas as pd  # type: ignore[import-untyped]
 
-    except pd.errors.EmptyDataError:
-        utils_logger.error(f"EmptyDataError: File is empty: {file_path}")
-        return []
+            return pd.DataFrame.from_records(transactions)
+        return transactions
 
-    except pd.errors.ParserError:
+    except csv.Error:
         utils_logger.error(f"ParserError: Failed to parse file: {file_path}")
         return []
 
@@ -83,6 +149,8 @@ def read_transactions_excel(file_path: str) -> List[Dict[Hashable, Any]]:
         utils_logger.warning(f"File does not exist: {file_path}")
         return []
 
+    import pandas as pd
+
     try:
         df = pd.read_excel(file_path)
         if df.empty or not isinstance(df, pd.DataFrame):
@@ -104,9 +172,80 @@ def read_transactions_excel(file_path: str) -> List[Dict[Hashable, Any]]:
         return []
 
 
-def search_transactions(transactions, search_string):
-    pattern = re.compile(re.escape(search_string), re.IGNORECASE)
-    return [transaction for transaction in transactions if pattern.search(transaction.get('description', ''))]
+SEARCH_MODES = ('all', 'any')
+
+
+@lru_cache(maxsize=256)
+def compile_search_pattern(terms: Tuple[str, ...], mode: str = 'all') -> 're.Pattern[str]':
+    """
+    Компилирует поисковый запрос в одно регулярное выражение без учета регистра (результат кэшируется).
+
+    :param terms: Кортеж строк для поиска.
+    :param mode: 'all' — все строки должны встречаться (AND), 'any' — хотя бы одна (OR).
+    :return: Скомпилированное регулярное выражение.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unsupported search mode: {mode}")
+    escaped = [re.escape(term) for term in terms]
+    if mode == 'any' or len(escaped) == 1:
+        return re.compile('|'.join(escaped), re.IGNORECASE)
+    # Проверки вперед для каждой строки: порядок строк в описании не важен; \A привязывает проверку к началу
+    # описания, иначе search повторял бы все проверки с каждой позиции
+    return re.compile('\\A' + ''.join(f'(?=.*?{term})' for term in escaped), re.IGNORECASE | re.DOTALL)
+
+
+def casefold_descriptions(transactions: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    Возвращает колонку описаний, приведенных casefold() (для быстрого поиска без учета регистра).
+    Повторяющиеся описания приводятся один раз.
+
+    :param transactions: Список транзакций.
+    :return: Список строк той же длины, что и transactions.
+    """
+    folded: Dict[Any, str] = {}
+    column: List[str] = []
+    for transaction in transactions:
+        description = transaction.get('description', '')
+        value = folded.get(description)
+        if value is None:
+            value = folded[description] = str(description).casefold()
+        column.append(value)
+    return column
+
+
+def _search_terms(search_string: Union[str, Iterable[str]]) -> Tuple[str, ...]:
+    terms = (search_string,) if isinstance(search_string, str) else tuple(search_string)
+    return tuple(term for term in terms if term)
+
+
+def search_transactions(transactions: Union[List[Dict[str, Any]], TransactionStore],
+                        search_string: Union[str, Iterable[str]], mode: str = 'all',
+                        folded: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Ищет операции по описанию без учета регистра.
+
+    :param transactions: Список транзакций или хранилище storage.TransactionStore (поиск по индексу FTS5).
+    :param search_string: Строка или список строк для поиска.
+    :param mode: Для нескольких строк: 'all' — должны встречаться все, 'any' — хотя бы одна.
+    :param folded: Колонка описаний из casefold_descriptions(transactions): тогда вместо регулярного
+        выражения используются проверки in по заранее приведенным строкам.
+    :return: Список найденных транзакций.
+    """
+    if isinstance(transactions, TransactionStore):
+        return transactions.search_transactions(search_string, mode)
+    terms = _search_terms(search_string)
+    if not terms:
+        return list(transactions)
+    if folded is not None:
+        folded_terms = [term.casefold() for term in terms]
+        match = all if mode == 'all' else any
+        if len(folded_terms) == 1:
+            term = folded_terms[0]
+            return [transaction for transaction, text in zip(transactions, folded) if term in text]
+        return [transaction for transaction, text in zip(transactions, folded)
+                if match(term in text for term in folded_terms)]
+    search = compile_search_pattern(terms, mode).search
+    return [transaction for transaction in transactions if search(transaction.get('description', ''))]
 
 
 def count_transactions_by_category(transactions, categories):
@@ -119,48 +258,24 @@ def count_transactions_by_category(transactions, categories):
     return dict(counter)
 
 
-def load_transactions_from_json(file_path='data/operations.json'):
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            transactions = json.load(f)
-            if not isinstance(transactions, list):
-                return []
-            return transactions
-    except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
+def load_transactions_from_json(file_path: str = 'data/operations.json',
+                                compact: bool = False) -> List[Dict[str, Any]]:
+    """Загружает транзакции из JSON-файла через общий реестр загрузчиков (compact=True — записи Transaction)."""
+    return load_transactions(file_path, "json", compact=compact)
 
 
-def load_transactions_from_csv(file_path='data/transactions.csv'):
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            transactions = list(reader)
-            return transactions
-    except (FileNotFoundError, csv.Error, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
+def load_transactions_from_csv(file_path: str = 'data/transactions.csv',
+                               compact: bool = False) -> List[Dict[str, Any]]:
+    """Загружает транзакции из CSV-файла через общий реестр загрузчиков (compact=True — записи Transaction)."""
+    return load_transactions(file_path, "csv", compact=compact)
 
 
-def load_transactions_from_xlsx(file_path='data/transactions_excel.xlsx'):
-    if not os.path.isfile(file_path):
-        print(f"Ошибка: {file_path} не является файлом.")
-        return []
-    try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook.active
-        transactions = []
-        headers = [cell.value for cell in sheet[1]]
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            transaction = {headers[i]: row[i] for i in range(len(headers))}
-            transactions.append(transaction)
-        return transactions
-    except (FileNotFoundError, openpyxl.utils.exceptions.InvalidFileException, PermissionError) as e:
-        print(f"Ошибка при загрузке файла: {e}")
-        return []
+def load_transactions_from_xlsx(file_path: str = 'data/transactions_excel.xlsx',
+                                compact: bool = False) -> List[Dict[str, Any]]:
+    """Загружает транзакции из XLSX-файла через общий реестр загрузчиков (compact=True — записи Transaction)."""
+    return load_transactions(file_path, "xlsx", compact=compact)
+
+
+def load_transactions_from_jsonl(file_path: str, compact: bool = False) -> List[Dict[str, Any]]:
+    """Загружает транзакции из файла JSON Lines (например, выгрузки exporters) через общий реестр загрузчиков."""
+    return load_transactions(file_path, "jsonl", compact=compact)
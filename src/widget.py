@@ -1,5 +1,18 @@
+from typing import Tuple
+
 from src.masks import get_mask_account, get_mask_card_number
 
+ACCOUNT_TYPES = ("счет", "счёт")
+
+
+def split_account_card(card_or_account_inform: str) -> Tuple[str, str]:
+    """
+    - Принимает на вход строку с информацией — тип карты/счета и номер карты/счета
+    - Возвращает кортеж (тип, номер); ValueError, если номера в строке нет
+    """
+    card_or_account_type, card_or_account_num = card_or_account_inform.rsplit(" ", 1)
+    return card_or_account_type, card_or_account_num
+
 
 def mask_account_card(card_or_account_inform: str) -> str:
     """
@@ -8,9 +21,9 @@ def mask_account_card(card_or_account_inform: str) -> str:
     """
 
     # Получение типа и номера карты/счета
-    card_or_account_type, card_or_account_num = card_or_account_inform.rsplit(" ", 1)
+    card_or_account_type, card_or_account_num = split_account_card(card_or_account_inform)
 
-    if card_or_account_type.lower() in ("счет", "счёт"):
+    if card_or_account_type.lower() in ACCOUNT_TYPES:
         return f"{card_or_account_type} {get_mask_account(card_or_account_num)}"
     else:
         return f"{card_or_account_type} {get_mask_card_number(card_or_account_num)}"
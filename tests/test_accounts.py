@@ -0,0 +1,68 @@
+import copy
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+
+from src.accounts import AccountIndex, account_number, parse_account
+
+
+@pytest.fixture
+def accounts(transactions: List[Dict[str, Any]]) -> AccountIndex:
+    """
+    Фикстура, создающая индекс счетов из тестовых транзакций, обратного перевода и операций без счета.
+
+    :return: Индекс счетов.
+    """
+    rows = copy.deepcopy(transactions)
+    rows.append({"id": 1, "state": "EXECUTED", "operationAmount": {"amount": "250.50", "currency": {"code": "RUB"}},
+                 "from": "Счет 64686473678894779589", "to": "Maestro 1596837868705199"})
+    rows.append({"id": 2, "state": "CANCELED", "operationAmount": {"amount": "10", "currency": {"code": "RUB"}},
+                 "from": "Счет 64686473678894779589", "to": "Счет 64686473678894779589"})
+    rows.append({"id": 3, "state": "EXECUTED", "description": "Открытие вклада", "to": "1234"})
+    return AccountIndex(rows)
+
+
+def test_parse_account() -> None:
+    """
+    Тестирует разбор полей from/to.
+
+    :return: None
+    """
+    assert parse_account(" Visa Classic 6831982476737658") == ("Visa Classic", "6831982476737658")
+    assert parse_account("1234") is None
+    assert parse_account(None) is None
+    assert account_number("Счет 64686473678894779589") == "64686473678894779589"
+    assert account_number("64686473678894779589") == "64686473678894779589"
+
+
+def test_statement(accounts: AccountIndex) -> None:
+    """
+    Тестирует выписку по направлениям и статусу (перевод на тот же счет выдается один раз).
+
+    :return: None
+    """
+    assert len(accounts) == 4
+    assert "Счет 64686473678894779589" in accounts and "1234" not in accounts
+    assert [row["id"] for row in accounts.statement("64686473678894779589")] == [441945886, 1, 2]
+    assert [row["id"] for row in accounts.statement("64686473678894779589", "in")] == [441945886, 2]
+    assert [row["id"] for row in accounts.statement("64686473678894779589", state="executed")] == [441945886, 1]
+    assert accounts.statement("0000") == []
+    with pytest.raises(ValueError):
+        accounts.statement("64686473678894779589", "sideways")
+
+
+def test_balance_and_mask(accounts: AccountIndex) -> None:
+    """
+    Тестирует оборот по счету и маскированные строки для показа.
+
+    :return: None
+    """
+    assert accounts.balance("64686473678894779589") == {"RUB": Decimal("99749.50")}
+    assert accounts.balance("64686473678894779589", state=None) == {"RUB": Decimal("99749.50")}
+    assert accounts.balance("1596837868705199") == {"RUB": Decimal("-99749.50")}
+    assert accounts.masked("64686473678894779589") == "Счет **9589"
+    assert accounts.masked("Maestro 1596837868705199") == "Maestro 1596 83** **** 5199"
+    assert accounts.is_account("64686473678894779589") and not accounts.is_account("1596837868705199")
+    with pytest.raises(KeyError):
+        accounts.masked("0000")
@@ -0,0 +1,122 @@
+import json
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+
+from src.aggregations import Aggregator, group_by
+from src.main import run_batch
+
+
+def _operation(state: str, date: str, amount: str, code: str, description: str) -> Dict[str, Any]:
+    return {
+        "state": state,
+        "date": date,
+        "operationAmount": {"amount": amount, "currency": {"name": code, "code": code}},
+        "description": description,
+    }
+
+
+@pytest.fixture
+def operations() -> List[Dict[str, Any]]:
+    """
+    Фикстура с операциями разных статусов, валют и месяцев.
+
+    :return: Список транзакций.
+    """
+    return [
+        _operation("EXECUTED", "2019-07-03T18:35:29.512364", "100.10", "RUB", "Перевод организации"),
+        _operation("EXECUTED", "2019-07-15T10:00:00.000000", "0.20", "RUB", "Перевод с карты на карту"),
+        _operation("CANCELED", "2019-08-01T11:30:32Z", "50", "USD", "Перевод организации"),
+        _operation("EXECUTED", "2019-08-26T10:50:58.294041", "Не указана", "USD", "Открытие вклада"),
+    ]
+
+
+def test_group_by_month_and_currency(operations: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует группировку по месяцу и валюте с точными суммами.
+
+    :return: None
+    """
+    result = group_by(operations, ["month", "currency"])
+    assert list(result) == [("2019-07", "RUB"), ("2019-08", "USD")]
+    assert result[("2019-07", "RUB")] == {
+        "count": 2,
+        "sum": Decimal("100.30"),
+        "min": Decimal("0.20"),
+        "max": Decimal("100.10"),
+        "mean": Decimal("50.15"),
+    }
+    assert result[("2019-08", "USD")]["count"] == 2
+    assert result[("2019-08", "USD")]["sum"] == Decimal("50.00")
+
+
+def test_group_by_category_list(operations: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует группировку по списку категорий описаний.
+
+    :return: None
+    """
+    result = group_by(operations, ["state", "category"], categories=["организации", "карты"])
+    assert result[("EXECUTED", "организации", "RUB")]["count"] == 1
+    assert result[("EXECUTED", "карты", "RUB")]["count"] == 1
+    assert result[("EXECUTED", None, "USD")]["sum"] == Decimal("0.00")
+
+
+def test_group_by_keeps_currencies_apart(operations: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что без ключа currency суммы разных валют не складываются, а среднее округляется вверх от половины.
+
+    :return: None
+    """
+    operations.append(_operation("CANCELED", "2019-08-02T11:30:32Z", "0.01", "USD", "Перевод организации"))
+    aggregator = Aggregator(["month"])
+    assert aggregator.keys == ("month", "currency")
+    result = aggregator.update(operations).result()
+    assert list(result) == [("2019-07", "RUB"), ("2019-08", "USD")]
+    assert result[("2019-08", "USD")]["sum"] == Decimal("50.01")
+    assert result[("2019-08", "USD")]["mean"] == Decimal("25.01")
+
+
+def test_aggregator_incremental(operations: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что потоковое обновление и объединение дают тот же результат, что и расчет с нуля.
+
+    :return: None
+    """
+    aggregator = Aggregator(["state"])
+    for transaction in operations:
+        aggregator.update([transaction])
+    assert aggregator.rows == 4
+    assert aggregator.result() == group_by(operations, ["state"])
+
+    first, second = Aggregator(["state"]), Aggregator(["state"])
+    first.update(operations[:2])
+    second.update(iter(operations[2:]))
+    assert first.merge(second).result() == aggregator.result()
+
+
+def test_aggregator_unknown_key() -> None:
+    """
+    Тестирует ошибку при неизвестном поле группировки.
+
+    :return: None
+    """
+    with pytest.raises(ValueError):
+        Aggregator(["amount"])
+
+
+def test_run_batch_group_by(tmp_path: Any, operations: List[Dict[str, Any]], capsys: Any) -> None:
+    """
+    Тестирует вывод итогов группировки в пакетном режиме.
+
+    :return: None
+    """
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(operations, ensure_ascii=False), encoding="utf-8")
+    assert run_batch([str(path), "--status", "executed", "--group-by", "currency", "--format", "json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result == [
+        {"currency": "RUB", "count": 2, "sum": "100.30", "min": "0.20", "max": "100.10", "mean": "50.15"},
+        {"currency": "USD", "count": 1, "sum": "0.00", "min": None, "max": None, "mean": None},
+    ]
@@ -0,0 +1,75 @@
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+
+from src.amounts import AmountColumn, format_amount_minor, parse_amount_minor, total_amount, totals_by_currency
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("9824.07", 982407),
+    ("16210", 1621000),
+    (16210, 1621000),
+    (0.1, 10),
+    ("1 000,50", 100050),
+    ("-5.005", None),
+    ("-5.050", -505),
+    ("1e2", 10000),
+    ("1e30", None),
+    (10 ** 17, None),
+    ("92233720368547758.07", 2 ** 63 - 1),
+    ("Не указана", None),
+    ("", None),
+    (None, None),
+    ("nan", None),
+])
+def test_parse_amount_minor(value: Any, expected: Any) -> None:
+    """
+    Тестирует перевод сумм разных форматов в копейки.
+
+    :param value: Исходная сумма.
+    :param expected: Ожидаемая сумма в копейках.
+    :return: None
+    """
+    assert parse_amount_minor(value) == expected
+
+
+def test_format_amount_minor() -> None:
+    """
+    Тестирует обратное преобразование копеек в строку.
+
+    :return: None
+    """
+    assert format_amount_minor(982407) == "9824.07"
+    assert format_amount_minor(-5) == "-0.05"
+
+
+def test_amount_column(transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует агрегаты колонки сумм с маской некорректных значений.
+
+    :param transactions: Список словарей с данными о транзакциях, предоставленный фикстурой.
+    :return: None
+    """
+    broken = {"operationAmount": {"amount": "Не указана", "currency": {"code": "RUB"}}}
+    column = AmountColumn.from_transactions(transactions + [broken])
+    assert len(column) == 3
+    assert column.invalid_count == 1
+    assert list(column.valid_values()) == [10000000, 10000]
+    assert column.total() == Decimal("100100.00")
+    assert column.mean() == Decimal("50050.00")
+    assert column.mean("EUR") is None
+    assert column.total("USD") == Decimal("100.00")
+    assert column.totals_by_currency() == {"RUB": Decimal("100000.00"), "USD": Decimal("100.00")}
+
+
+def test_totals_are_exact() -> None:
+    """
+    Тестирует, что суммирование не накапливает ошибку округления, как float.
+
+    :return: None
+    """
+    records = [{"operationAmount": {"amount": "0.10", "currency": {"code": "RUB"}}}] * 10
+    assert sum(float("0.10") for _ in records) != 1.0
+    assert total_amount(records) == Decimal("1.00")
+    assert totals_by_currency(records) == {"RUB": Decimal("1.00")}
@@ -1,6 +1,10 @@
+import json
+from typing import Any, Dict, List
 from unittest.mock import Mock, patch
 
-from src.external_api import convert_currency, get_transaction_amount_in_rub
+import pytest
+
+from src.external_api import RateTable, convert_currency, get_rate_on_date, get_transaction_amount_in_rub
 
 
 def test_convert_currency():
@@ -51,6 +55,97 @@ def test_get_transaction_amount_in_rub():
         assert result == 100.0
 
 
+@pytest.fixture
+def rates_csv(tmp_path: Any) -> str:
+    """
+    Фикстура, создающая CSV-файл с историческими курсами (строки не отсортированы, одна некорректна).
+
+    :return: Путь к созданному файлу.
+    """
+    path = tmp_path / "rates.csv"
+    path.write_text(
+        "date;currency;rate\n"
+        "2019-07-01;usd;65\n"
+        "2019-01-01;USD;60\n"
+        "2019-08-01;EUR;72.5\n"
+        "not a date;USD;10\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_rate_table_load_csv_and_lookup(rates_csv: str) -> None:
+    """
+    Тестирует загрузку курсов из CSV и выбор последнего курса на дату операции или раньше.
+
+    :return: None
+    """
+    rates = RateTable.load(rates_csv)
+    assert len(rates) == 3
+    assert rates.currencies == ["EUR", "USD"]
+    assert rates.rate("USD", "2018-12-31T23:59:59") is None
+    assert rates.rate("USD", "2019-01-01T00:00:00") == 60.0
+    assert rates.rate("USD", "2019-06-30T10:00:00Z") == 60.0
+    assert rates.rate("usd", "2019-07-03T18:35:29.512364") == 65.0
+    assert rates.rate("GBP", "2019-07-03") is None
+    assert rates.rate("RUB", "2000-01-01") == 1.0
+
+
+def test_rate_table_load_json(tmp_path: Any) -> None:
+    """
+    Тестирует загрузку курсов из JSON в виде словаря по валютам и в виде списка записей.
+
+    :return: None
+    """
+    by_currency = tmp_path / "rates.json"
+    by_currency.write_text(json.dumps({"USD": {"2019-01-01": 60, "2019-07-01": 65}}), encoding="utf-8")
+    records = tmp_path / "records.json"
+    records.write_text(json.dumps([{"date": "2019-01-01", "currency": "EUR", "rate": 70}]), encoding="utf-8")
+    assert RateTable.load(str(by_currency)).rate("USD", "2019-07-02") == 65.0
+    assert RateTable.load(str(records)).rate("EUR", "2019-07-02") == 70.0
+
+
+def test_rate_table_convert_many(rates_csv: str, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует пересчет сумм в рубли по курсу на дату каждой операции без обращения к API.
+
+    :return: None
+    """
+    rates = RateTable.load(rates_csv)
+    early = dict(transactions[1], date="2018-05-01T00:00:00")
+    with patch('requests.get') as mock_get:
+        assert rates.convert_many(transactions + [early]) == [100000.0, 6500.0, None]
+    mock_get.assert_not_called()
+
+
+def test_rate_on_date_online_fallback(rates_csv: str, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует обращение к API, если курса нет в таблице, и отказ от него в режиме без сети.
+
+    :return: None
+    """
+    rates = RateTable.load(rates_csv)
+    with patch('src.external_api.get_exchange_rate', return_value=90.0) as mock_rate:
+        assert get_rate_on_date("USD", "2019-07-03", rates) == 65.0
+        assert get_rate_on_date("USD", "2018-05-01", rates) == 90.0
+        assert get_rate_on_date("USD", "2018-05-01", rates, online_fallback=False) is None
+        assert get_transaction_amount_in_rub(transactions[1], rates, online_fallback=False) == 6500.0
+    mock_rate.assert_called_once_with("USD")
+
+
+def test_transaction_amount_in_rub_without_amount() -> None:
+    """
+    Тестирует, что для операции без корректной суммы возвращается None, а не нулевая сумма.
+
+    :return: None
+    """
+    for amount in (None, "abc"):
+        transaction = {"date": "2019-07-03", "operationAmount": {"amount": amount, "currency": {"code": "USD"}}}
+        with patch('src.external_api.convert_currency') as mock_convert:
+            assert get_transaction_amount_in_rub(transaction) is None
+        mock_convert.assert_not_called()
+
+
 if __name__ == '__main__':
     test_convert_currency()
     test_get_transaction_amount_in_rub()
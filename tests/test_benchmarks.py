@@ -0,0 +1,112 @@
+import json
+from typing import Any
+
+from src.benchmarks import check_startup, compare, measure, measure_startup, parse_importtime, run, run_suite
+
+
+def test_measure_returns_time_and_memory() -> None:
+    """
+    Тестирует замер времени и пиковой памяти.
+
+    :return: None
+    """
+    result = measure(lambda: [0] * 100000, repeat=2)
+    assert result["seconds"] > 0
+    assert result["peak_bytes"] >= 100000 * 8
+
+
+def test_run_suite_small_dataset(tmp_path: Any) -> None:
+    """
+    Тестирует запуск набора замеров на маленьком наборе данных.
+
+    :return: None
+    """
+    results = run_suite(50, formats=("json", "csv"), repeat=1, data_dir=str(tmp_path), memory=False)
+    assert "processing.sort_by_date[50]" in results
+    assert "scan.count_csv[50]" in results
+    assert not any("xlsx" in name or "excel" in name for name in results)
+    assert all(result["rows"] == 50 and result["rows_per_second"] > 0 for result in results.values())
+    assert (tmp_path / "transactions_50_0.json").exists()
+    assert "exporters.export[csv][50]" in results
+    assert not list(tmp_path.glob("export.*"))
+
+
+def test_compare_detects_regressions() -> None:
+    """
+    Тестирует сравнение с базовой линией: регрессией считается ухудшение больше порога.
+
+    :return: None
+    """
+    baseline = {"a[10]": {"seconds": 1.0, "peak_bytes": 1000}, "b[10]": {"seconds": 1.0, "peak_bytes": 0}}
+    results = {
+        "a[10]": {"seconds": 1.2, "peak_bytes": 2000},
+        "b[10]": {"seconds": 1.5, "peak_bytes": 10},
+        "c[10]": {"seconds": 9.0, "peak_bytes": 10},
+    }
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("a[10]: peak_bytes")
+    assert regressions[1].startswith("b[10]: seconds")
+
+
+def test_run_baseline_round_trip(tmp_path: Any, capsys: Any) -> None:
+    """
+    Тестирует сохранение базовой линии и код завершения при регрессии.
+
+    :return: None
+    """
+    baseline = str(tmp_path / "baseline.json")
+    arguments = ["--rows", "20", "--formats", "csv", "--repeat", "1", "--no-memory", "--baseline", baseline]
+    assert run(arguments + ["--save-baseline"]) == 0
+    assert "utils.read_transactions_csv[20]" in capsys.readouterr().out
+
+    with open(baseline, encoding="utf-8") as file:
+        data = json.load(file)
+    for result in data.values():
+        result["seconds"] = 1e-12
+    with open(baseline, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    assert run(arguments) == 1
+    assert "REGRESSION" in capsys.readouterr().err
+
+
+def test_memory_budget_exit_code(capsys: Any) -> None:
+    """
+    Тестирует проверку бюджета памяти загрузки по форматам.
+
+    :return: None
+    """
+    arguments = ["--rows", "20", "--formats", "csv", "--repeat", "1"]
+    assert run(arguments + ["--memory-budget", "csv=1000000"]) == 0
+    assert run(arguments + ["--memory-budget", "csv=1"]) == 1
+    assert "BUDGET EXCEEDED loaders.load_transactions[csv][20]" in capsys.readouterr().err
+
+
+def test_parse_importtime() -> None:
+    """
+    Тестирует разбор вывода python -X importtime.
+
+    :return: None
+    """
+    output = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       100 |        100 |   requests.compat\n"
+              "import time:       300 |      60000 | requests\n"
+              "Некоторый другой вывод\n")
+    assert parse_importtime(output) == [(1, "requests.compat", 0.1), (0, "requests", 60.0)]
+    problems = check_startup({"import_ms": 61.0, "heavy": ["requests"], "slowest": [("requests", 60.0)]}, 50)
+    assert problems == ["startup imports heavy module requests", "startup imports 61.0 ms > 50 ms (requests 60.0 ms)"]
+
+
+def test_json_startup_skips_heavy_imports(tmp_path: Any, transactions: Any) -> None:
+    """
+    Тестирует холодный запуск для JSON-файла: тяжелые библиотеки (requests, dotenv, pandas, openpyxl)
+    не импортируются. Время импортов здесь не проверяется, оно зависит от загрузки машины:
+    бюджет проверяется замером python -m src.benchmarks --startup-budget.
+
+    :return: None
+    """
+    file_path = tmp_path / "operations.json"
+    file_path.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    result = measure_startup(str(file_path), repeat=1)
+    assert result["heavy"] == []
+    assert result["import_ms"] > 0
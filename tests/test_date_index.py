@@ -0,0 +1,141 @@
+import copy
+from datetime import date
+from typing import Any, Dict, List
+
+import pytest
+
+from src.date_index import DateIndex, RowSlice, decode_cursor, paginate
+
+
+@pytest.fixture
+def dataset(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Фикстура, создающая набор из тестовых транзакций, повторяющейся операции и операций в разных валютах.
+
+    :return: Список транзакций.
+    """
+    rows = copy.deepcopy(transactions)
+    for number in range(10):
+        currency = {"name": "руб.", "code": "RUB"} if number % 2 else {"name": "USD", "code": "USD"}
+        rows.append({"id": 1000 + number, "state": "CANCELED" if number % 3 else "EXECUTED",
+                     "date": f"2020-01-{number + 1:02d}T10:00:00Z",
+                     "operationAmount": {"amount": "1", "currency": currency},
+                     "description": "Перевод с карты на карту" if number % 2 else "Открытие вклада"})
+    rows.append(copy.deepcopy(rows[0]))
+    rows.append({"id": 7, "state": "EXECUTED", "description": "Без даты", "operationAmount": {}})
+    return rows
+
+
+def walk(index: DateIndex, page_size: int, **filters: Any) -> List[List[Any]]:
+    """
+    Проходит все страницы запроса.
+
+    :return: Список страниц (списков id операций).
+    """
+    pages = []
+    cursor = None
+    while True:
+        page = paginate(index, page_size, cursor, **filters)
+        pages.append([row["id"] for row in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_index_order(dataset: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует порядок индекса: операции без даты первыми, затем по дате и id.
+
+    :return: None
+    """
+    index = DateIndex(dataset)
+    ids = [row["id"] for row in index.rows]
+    assert ids[0] == 7
+    assert ids[1:4] == [41428829, 441945886, 441945886]
+    assert ids[4:] == list(range(1000, 1010))
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 50])
+def test_pages_cover_all_rows_once(dataset: List[Dict[str, Any]], page_size: int) -> None:
+    """
+    Тестирует, что страницы в обоих направлениях содержат все строки ровно один раз (включая повторы).
+
+    :param page_size: Размер страницы.
+    :return: None
+    """
+    index = DateIndex(dataset)
+    expected = [row["id"] for row in index.rows]
+    ascending = walk(index, page_size)
+    descending = walk(index, page_size, descending=True)
+    assert [row_id for page in ascending for row_id in page] == expected
+    assert [row_id for page in descending for row_id in page] == expected[::-1]
+    assert all(len(page) == page_size for page in ascending[:-1])
+    assert ascending[-1]
+
+
+def test_pages_with_filters(dataset: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует страницы с фильтрами по статусу, валюте и описанию.
+
+    :return: None
+    """
+    index = DateIndex(dataset)
+    pages = walk(index, 2, state="canceled", rub_only=True, search="КАРТЫ", descending=True)
+    assert pages == [[1007, 1005], [1001]]
+    assert walk(index, 5, state="pending") == [[]]
+    assert index.subset("Canceled", "rub") is index.subset("CANCELED", "RUB")
+
+
+def test_cursor_errors(dataset: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует отказ от поврежденного курсора и курсора другого запроса.
+
+    :return: None
+    """
+    index = DateIndex(dataset)
+    cursor = paginate(index, 2, state="executed").next_cursor
+    assert cursor is not None
+    assert decode_cursor(cursor)[0] == (index.subset("executed").timestamps[1], 41428829)
+    with pytest.raises(ValueError):
+        paginate(index, 2, cursor, state="canceled")
+    with pytest.raises(ValueError):
+        paginate(index, 2, "not-a-cursor")
+    with pytest.raises(ValueError):
+        paginate(index, 0)
+
+
+def test_filter_by_date_range(dataset: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует выборку полуинтервала дат: участок строк индекса без копирования и фильтры по статусу и валюте.
+
+    :return: None
+    """
+    index = DateIndex(dataset)
+    rows = index.filter_by_date_range("2020-01-03", date(2020, 1, 6))
+    assert isinstance(rows, RowSlice)
+    assert rows[0] is index.rows[rows.start]
+    assert [row["id"] for row in rows] == [1002, 1003, 1004]
+    assert [row["id"] for row in rows[1:]] == [1003, 1004]
+    assert rows[-1]["id"] == 1004
+    assert [row["id"] for row in index.filter_by_date_range("2019-08-26T00:00:00")] == [441945886, 441945886] + list(
+        range(1000, 1010))
+    assert [row["id"] for row in index.filter_by_date_range(end="2019-07-04")] == [7, 41428829]
+    assert [row["id"] for row in index.filter_by_date_range("2020-01-01", "2020-02-01", "canceled", "rub")] == [
+        1001, 1005, 1007]
+    assert len(index.filter_by_date_range("2021-01-01", "2020-01-01")) == 0
+    with pytest.raises(IndexError):
+        rows[3]
+    with pytest.raises(ValueError):
+        index.filter_by_date_range("not a date")
+
+
+def test_pages_with_date_range(dataset: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует страницы внутри диапазона дат в обоих направлениях.
+
+    :return: None
+    """
+    index = DateIndex(dataset)
+    assert walk(index, 2, date_from="2020-01-02", date_to="2020-01-06") == [[1001, 1002], [1003, 1004]]
+    assert walk(index, 3, date_from="2020-01-02", date_to="2020-01-06", descending=True) == [[1004, 1003, 1002],
+                                                                                             [1001]]
@@ -0,0 +1,118 @@
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from src.dedup import EMPTY, BloomFilter, Deduplicator, IntHashSet, content_hash, dedup_key, deduplicate
+from src.loaders import load_transactions
+from src.main import run_batch
+from src.records import Transaction
+
+
+def test_int_hash_set_matches_set() -> None:
+    """
+    Тестирует множество целых чисел на открытой адресации, включая рост таблицы и отрицательные значения.
+
+    :return: None
+    """
+    rng = random.Random(1)
+    values = [rng.randrange(-(10 ** 12), 10 ** 12) for _ in range(5000)] * 2
+    hash_set = IntHashSet(capacity=8)
+    added = [hash_set.add(value) for value in values]
+    assert sum(added) == len(hash_set) == len(set(values))
+    assert all(value in hash_set for value in values)
+    assert 123 not in hash_set and "123" not in hash_set
+    assert hash_set.nbytes <= 4 * 8 * len(hash_set)
+    with pytest.raises(ValueError):
+        hash_set.add(EMPTY)
+
+
+def test_bloom_filter_false_positive_rate() -> None:
+    """
+    Тестирует отсутствие ложноотрицательных ответов и долю ложноположительных у фильтра Блума.
+
+    :return: None
+    """
+    bloom = BloomFilter(10000, error_rate=0.01)
+    assert sum(bloom.add(value) for value in range(0, 20000, 2)) > 9900
+    assert all(value in bloom for value in range(0, 20000, 2))
+    false_positives = sum(value in bloom for value in range(1, 20000, 2))
+    assert false_positives < 300
+    assert bloom.nbytes < 10000 * 2
+
+
+def test_dedup_key_by_id_and_content(transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует ключ дубликата: id, строковый id и хеш содержимого для операций без id.
+
+    :return: None
+    """
+    assert dedup_key(transactions[0]) == ("id", 441945886)
+    assert dedup_key({"id": "A-1"}) == dedup_key({"id": "A-1"}) != dedup_key({"id": "A-2"})
+    without_id = {key: value for key, value in transactions[0].items() if key != "id"}
+    space, key = dedup_key(without_id)
+    assert space == "content" and key == content_hash(dict(without_id))
+    assert content_hash(Transaction.from_record(without_id)) == key
+
+
+@pytest.mark.parametrize("bloom_error_rate", [None, 0.001])
+def test_deduplicate_across_sources(tmp_path: Any, transactions: List[Dict[str, Any]],
+                                    bloom_error_rate: Any) -> None:
+    """
+    Тестирует удаление дубликатов одной выгрузки в разных форматах и операций без id.
+
+    :return: None
+    """
+    without_id = {key: value for key, value in transactions[1].items() if key != "id"}
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions + [without_id, without_id], ensure_ascii=False), encoding="utf-8")
+    loaded = load_transactions(str(path))
+    unique = deduplicate(loaded + loaded[:2], bloom_error_rate)
+    assert unique == loaded[:3]
+
+
+def test_deduplicator_streaming_counts() -> None:
+    """
+    Тестирует потоковый режим и счетчик дубликатов.
+
+    :return: None
+    """
+    deduplicator = Deduplicator()
+    stream = ({"id": number % 100} for number in range(1000))
+    assert [t["id"] for t in deduplicator.filter(stream)] == list(range(100))
+    assert deduplicator.duplicates == 900
+
+
+def test_deduplicator_bloom_past_capacity() -> None:
+    """
+    Тестирует фильтр Блума емкостью меньше входных данных: уникальные операции не теряются, дубликаты находятся.
+
+    :return: None
+    """
+    deduplicator = Deduplicator(expected=10000, bloom_error_rate=0.01)
+    unique = [{"id": number} for number in range(100000)]
+    unique += [{"description": f"без id {number}"} for number in range(10)]
+    assert len(list(deduplicator.filter(unique))) == len(unique)
+    assert deduplicator.bloom is not None and deduplicator.bloom.capacity >= 100000
+    assert list(deduplicator.filter(unique[::1000])) == []
+    assert deduplicator.duplicates == 101
+
+
+def test_run_batch_dedup(tmp_path: Any, transactions: List[Dict[str, Any]], capsys: Any) -> None:
+    """
+    Тестирует параметр --dedup пакетного режима для одинаковых операций из JSON и CSV.
+
+    :return: None
+    """
+    json_path = tmp_path / "operations.json"
+    json_path.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    csv_path = tmp_path / "transactions.csv"
+    csv_path.write_text("id;state;date;amount;currency_name;currency_code;from;to;description\n"
+                        "441945886;EXECUTED;2019-08-26T10:50:58Z;100000;руб.;RUB;;Счет 1;Перевод организации\n"
+                        "1;EXECUTED;2019-08-27T10:50:58Z;5;руб.;RUB;;Счет 1;Перевод организации\n",
+                        encoding="utf-8")
+    assert run_batch([str(json_path), str(csv_path), "--dedup", "--format", "json"]) == 0
+    captured = capsys.readouterr()
+    assert [row["id"] for row in json.loads(captured.out)] == [441945886, 41428829, 1]
+    assert "дубликатов: 1" in captured.err
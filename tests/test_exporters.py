@@ -0,0 +1,114 @@
+import copy
+import json
+import tempfile
+from typing import Any, Dict, List
+
+import pytest
+
+from src.exporters import EXPORT_FIELDS, CsvExporter, detect_export_format, export, flat_row, open_exporter
+from src.loaders import load_transactions
+from src.records import Transaction
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl", "xlsx"])
+def test_export_round_trip(tmp_path: Any, transactions: List[Dict[str, Any]], extension: str) -> None:
+    """
+    Тестирует, что выгрузка каждого формата читается загрузчиками в те же нормализованные записи.
+
+    :param extension: Расширение файла выгрузки.
+    :return: None
+    """
+    path = str(tmp_path / f"export.{extension}")
+    expected = copy.deepcopy(transactions)
+    assert export(load_transactions(str(tmp_path / "missing.json")) or expected, path) == 2
+    assert load_transactions(path) == expected
+
+
+def test_export_compact_records_from_generator(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует выгрузку компактных записей из генератора без промежуточного списка.
+
+    :return: None
+    """
+    path = tmp_path / "export.jsonl"
+    records = (Transaction.from_record(row) for row in transactions)
+    assert export(records, str(path)) == 2
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == transactions
+
+
+def test_exporter_writes_in_chunks(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что строки записываются в файл пачками по мере поступления, а остаток — при закрытии.
+
+    :return: None
+    """
+    path = tmp_path / "export.csv"
+    with CsvExporter(str(path), chunk_size=2) as exporter:
+        assert exporter.write_many(transactions * 2 + transactions[:1]) == 5
+        assert exporter.rows == 4
+    assert exporter.rows == 5
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ";".join(EXPORT_FIELDS)
+    assert len(lines) == 6
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl", "xlsx"])
+def test_exporter_discards_on_error(tmp_path: Any, transactions: List[Dict[str, Any]], extension: str) -> None:
+    """
+    Тестирует, что при исключении внутри блока with частичная выгрузка удаляется, а прежний файл сохраняется.
+
+    :return: None
+    """
+    path = tmp_path / f"export.{extension}"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError):
+        with open_exporter(str(path), chunk_size=1) as exporter:
+            exporter.write_many(transactions)
+            raise RuntimeError("boom")
+    assert path.read_bytes() == b"old"
+    assert [item.name for item in tmp_path.iterdir()] == [path.name]
+
+
+def test_xlsx_exporter_discard_removes_sheet_file(tmp_path: Any, monkeypatch: Any,
+                                                  transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что при отмене XLSX-выгрузки удаляется и временный файл листа, созданный openpyxl.
+
+    :return: None
+    """
+    temp_dir = tmp_path / "tmp"
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_dir))
+    exporter = open_exporter(str(tmp_path / "export.xlsx"), chunk_size=1)
+    exporter.write_many(transactions)
+    assert list(temp_dir.iterdir())
+    exporter.discard()
+    assert list(temp_dir.iterdir()) == []
+    assert [item.name for item in tmp_path.iterdir()] == [temp_dir.name]
+
+
+def test_flat_row_missing_fields() -> None:
+    """
+    Тестирует плоскую строку для записи без части полей.
+
+    :return: None
+    """
+    row = flat_row({"id": 1, "operationAmount": {"amount": "5.00", "currency": {"code": "RUB"}}})
+    assert row["amount"] == "5.00"
+    assert row["currency_code"] == "RUB"
+    assert row["from"] == ""
+    assert list(row) == EXPORT_FIELDS
+
+
+def test_export_format_errors(tmp_path: Any) -> None:
+    """
+    Тестирует определение формата выгрузки по расширению и ошибку для неподдерживаемых форматов.
+
+    :return: None
+    """
+    assert detect_export_format("result.NDJSON") == "jsonl"
+    with pytest.raises(ValueError):
+        open_exporter(str(tmp_path / "result.txt"))
+    with pytest.raises(ValueError):
+        open_exporter(str(tmp_path / "result.csv"), "parquet")
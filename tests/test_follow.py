@@ -0,0 +1,119 @@
+import json
+from typing import Any, List
+
+from src.aggregations import Aggregator
+from src.follow import follow, load_states, read_appended
+from src.main import run_batch
+
+HEADER = "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+ROWS = [
+    "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;"
+    "Перевод организации\n",
+    "3598919;EXECUTED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;Discover 0720428384694643;"
+    "Перевод с карты на карту\n",
+    "593027;CANCELED;2023-07-22T05:02:01Z;30368;Ruble;RUB;Visa 1959232722494097;Visa 6804119550473710;"
+    "Перевод с карты на карту\n",
+]
+
+
+def test_read_appended_only_new_rows(tmp_path: Any) -> None:
+    """
+    Тестирует чтение только дописанных строк и отложенную обработку незавершенной строки.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(HEADER + ROWS[0], encoding="utf-8")
+
+    first, state = read_appended(str(path))
+    assert [transaction["id"] for transaction in first] == [650703]
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(ROWS[1] + ROWS[2][:20])
+    second, state = read_appended(str(path), state)
+    assert [transaction["id"] for transaction in second] == [3598919]
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(ROWS[2][20:])
+    third, state = read_appended(str(path), state)
+    assert [transaction["id"] for transaction in third] == [593027]
+    assert read_appended(str(path), state)[0] == []
+
+
+def test_read_appended_keeps_separators_inside_values(tmp_path: Any) -> None:
+    """
+    Тестирует, что символы \\r, \\x1c и \\u2028 внутри значений не разбивают строку на части.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    row = ROWS[0].replace("Перевод организации", '"Перевод\u2028орга\x1cниза\rции"')
+    path.write_bytes((HEADER + row + ROWS[1][:20]).encode("utf-8"))
+
+    rows, state = read_appended(str(path))
+    assert [transaction["id"] for transaction in rows] == [650703]
+    assert rows[0]["description"] == "Перевод\u2028орга\x1cниза\rции"
+    assert state.offset == len((HEADER + row).encode("utf-8"))
+
+
+def test_read_appended_restarts_on_new_header(tmp_path: Any) -> None:
+    """
+    Тестирует, что при замене файла с другим заголовком чтение начинается сначала.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(HEADER + ROWS[0] + ROWS[1], encoding="utf-8")
+    _, state = read_appended(str(path))
+
+    path.write_text("id,state\n1,EXECUTED\n", encoding="utf-8")
+    rows, _ = read_appended(str(path), state)
+    assert [transaction["id"] for transaction in rows] == [1]
+
+
+def test_follow_feeds_aggregator(tmp_path: Any) -> None:
+    """
+    Тестирует, что follow передает новые строки в агрегатор и сохраняет позицию между запусками.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    state_file = str(tmp_path / "state.json")
+    path.write_text(HEADER + ROWS[0] + ROWS[1], encoding="utf-8")
+    aggregator = Aggregator(["state"])
+    batches: List[int] = []
+
+    def on_rows(rows: List[Any]) -> None:
+        batches.append(len(rows))
+        aggregator.update(rows)
+
+    follow(str(path), on_rows, state_file=state_file, interval=0, max_polls=2)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(ROWS[2])
+    follow(str(path), on_rows, state_file=state_file, interval=0, max_polls=1)
+
+    assert batches == [2, 1]
+    assert aggregator.result()[("CANCELED", "RUB")]["count"] == 1
+    assert load_states(state_file)[str(path)].offset == path.stat().st_size
+
+
+def test_run_batch_state_file(tmp_path: Any, capsys: Any) -> None:
+    """
+    Тестирует пакетный режим с файлом состояния: повторный запуск обрабатывает только новые строки.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    state_file = str(tmp_path / "state.json")
+    path.write_text(HEADER + ROWS[0], encoding="utf-8")
+    arguments = [str(path), "--state-file", state_file, "--format", "json"]
+
+    assert run_batch(arguments) == 0
+    assert [row["id"] for row in json.loads(capsys.readouterr().out)] == [650703]
+    assert run_batch(arguments) == 0
+    assert json.loads(capsys.readouterr().out) == []
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(ROWS[1])
+    assert run_batch(arguments) == 0
+    assert [row["id"] for row in json.loads(capsys.readouterr().out)] == [3598919]
@@ -0,0 +1,147 @@
+import json
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+from src.index import build_index, get_index, index_path, load_indexed
+from src.loaders import load_transactions
+from src.main import filter_transactions_by_status
+from src.processing import is_rub_transaction
+
+CSV_DATA = (
+    "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+    "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;"
+    "Перевод организации\n"
+    ";;;;;;;;\n"
+    "3598919;EXECUTED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;Discover 0720428384694643;"
+    "\"Перевод; с карты на карту\"\n"
+    "593027;CANCELED;2023-07-22T05:02:01Z;30368;Ruble;RUB;Visa 1959232722494097;Visa 6804119550473710;"
+    "Перевод с карты на карту\n"
+)
+
+
+@pytest.fixture
+def source_files(tmp_path: Any, transactions: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Фикстура с JSON- и CSV-файлами для индексации.
+
+    :return: Словарь {формат: путь к файлу}.
+    """
+    canceled = dict(transactions[1], id=1, state="CANCELED", description="Перевод «ёлка»")
+    json_path = tmp_path / "operations.json"
+    json_path.write_text(json.dumps(transactions + [{}, canceled], ensure_ascii=False, indent=4), encoding="utf-8")
+    csv_path = tmp_path / "transactions.csv"
+    csv_path.write_text(CSV_DATA, encoding="utf-8")
+    return {"json": str(json_path), "csv": str(csv_path)}
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv"])
+@pytest.mark.parametrize("state, currency", [
+    ("canceled", None), ("EXECUTED", None), ("executed", "rub"), (None, "USD"), (None, None),
+])
+def test_load_indexed_matches_full_load(source_files: Dict[str, str], fmt: str, state: Any, currency: Any) -> None:
+    """
+    Тестирует, что выборка по индексу совпадает с фильтрацией полностью загруженного файла.
+
+    :return: None
+    """
+    expected = load_transactions(source_files[fmt])
+    if state:
+        expected = filter_transactions_by_status(expected, state)
+    if currency:
+        expected = [t for t in expected if t["operationAmount"]["currency"]["code"] == currency.upper()]
+    assert load_indexed(source_files[fmt], state, currency) == expected
+    assert os.path.exists(index_path(source_files[fmt]))
+
+
+def test_index_rebuilt_when_source_changes(source_files: Dict[str, str]) -> None:
+    """
+    Тестирует, что устаревший индекс перестраивается.
+
+    :return: None
+    """
+    path = source_files["csv"]
+    assert len(build_index(path)) == 3
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("1;CANCELED;2023-07-22T05:02:01Z;1;Ruble;RUB;;;Открытие вклада\n")
+    assert get_index(path, build=False) is None
+    assert [t["id"] for t in load_indexed(path, "canceled", "rub")] == [593027, 1]
+    assert len(get_index(path, build=False) or []) == 4
+
+
+def test_rub_filter_through_index(source_files: Dict[str, str]) -> None:
+    """
+    Тестирует выборку рублевых операций через индекс.
+
+    :return: None
+    """
+    result = load_indexed(source_files["csv"], currency="RUB")
+    assert result and all(is_rub_transaction(transaction) for transaction in result)
+
+
+def test_build_index_unsupported_format(tmp_path: Any) -> None:
+    """
+    Тестирует ошибку при попытке индексировать XLSX-файл.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.xlsx"
+    path.write_bytes(b"PK\x03\x04")
+    with pytest.raises(ValueError):
+        build_index(str(path))
+
+
+def test_json_index_crlf(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует индекс JSON-файла с переводами строк \\r\\n: смещения считаются в байтах файла.
+
+    :return: None
+    """
+    path = tmp_path / "operations.json"
+    text = json.dumps(transactions * 3, ensure_ascii=False, indent=4).replace("\n", "\r\n")
+    path.write_bytes(text.encode("utf-8"))
+    assert load_indexed(str(path)) == load_transactions(str(path))
+    assert len(load_indexed(str(path), currency="usd")) == 3
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_json_index_small_chunks(source_files: Dict[str, str], monkeypatch: Any, chunk_size: int) -> None:
+    """
+    Тестирует, что индекс JSON-файла, читаемого маленькими частями, совпадает с индексом, построенным за одно чтение:
+    записи и многобайтовые символы разрезаются на границах частей.
+
+    :return: None
+    """
+    path = source_files["json"]
+    expected = build_index(path, save=False).to_dict()
+    monkeypatch.setattr("src.index.READ_CHUNK_SIZE", chunk_size)
+    assert build_index(path, save=False).to_dict() == expected
+    assert load_indexed(path, "canceled") == filter_transactions_by_status(load_transactions(path), "canceled")
+
+
+def test_empty_index_is_reused(tmp_path: Any, monkeypatch: Any) -> None:
+    """
+    Тестирует, что сохраненный пустой индекс не перестраивается при каждом запросе.
+
+    :return: None
+    """
+    path = tmp_path / "operations.json"
+    path.write_text("[]", encoding="utf-8")
+    assert load_indexed(str(path)) == []
+
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr("src.index.build_index", fail)
+    assert load_indexed(str(path)) == []
+
+
+def test_index_save_error_falls_back(source_files: Dict[str, str], monkeypatch: Any) -> None:
+    """
+    Тестирует, что ошибка сохранения индекса (папка только для чтения) не прерывает загрузку.
+
+    :return: None
+    """
+    monkeypatch.setattr("src.index.index_path", lambda file_path: os.path.join(file_path, "missing", "idx.json"))
+    assert [t["id"] for t in load_indexed(source_files["csv"], "canceled")] == [593027]
@@ -0,0 +1,129 @@
+import json
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from src import loaders
+from src.interning import EqualsIgnoreCase, RecordEncoder, StringPool
+from src.main import filter_transactions_by_status, run_batch
+from src.processing import rub_mask
+
+
+@pytest.fixture
+def intern_threshold() -> Iterator[None]:
+    """
+    Фикстура, восстанавливающая порог кодирования загрузчиков после теста.
+
+    :return: None
+    """
+    yield
+    loaders.set_intern_threshold(loaders.DEFAULT_CARDINALITY_THRESHOLD)
+
+
+def test_string_pool_returns_canonical_objects() -> None:
+    """
+    Тестирует замену одинаковых строк одним объектом и целочисленные коды значений.
+
+    :return: None
+    """
+    pool = StringPool()
+    first = pool.intern("".join(["EXEC", "UTED"]))
+    second = pool.intern("".join(["EXE", "CUTED"]))
+    assert first is second
+    assert pool.codes == {"EXECUTED": 0}
+    assert pool.intern(None) is None and pool.intern(5) == 5
+    assert len(pool) == 1
+
+
+def test_string_pool_cardinality_threshold() -> None:
+    """
+    Тестирует, что после превышения порога новые значения не добавляются, а известные по-прежнему кодируются.
+
+    :return: None
+    """
+    pool = StringPool(max_cardinality=2)
+    for value in ("a", "b", "c", "d"):
+        pool.intern(value)
+    assert pool.overflowed and len(pool) == 2
+    assert pool.intern("".join(["", "a"])) is pool.values[0]
+
+
+def test_string_pool_passes_unhashable_values() -> None:
+    """
+    Тестирует, что словари и списки в полях возвращаются без изменений, а не вызывают TypeError.
+
+    :return: None
+    """
+    pool = StringPool()
+    value: Dict[str, Any] = {"name": "руб."}
+    assert pool.intern(value) is value
+    assert pool.intern(["EXECUTED"]) == ["EXECUTED"]
+    assert RecordEncoder().encode({"state": ["EXECUTED"], "description": {}}) == {"state": ["EXECUTED"],
+                                                                                  "description": {}}
+
+
+def test_equals_ignore_case() -> None:
+    """
+    Тестирует проверку равенства без учета регистра с запоминанием результатов и ограничением их количества.
+
+    :return: None
+    """
+    matches = EqualsIgnoreCase("Executed", max_cardinality=2)
+    assert [matches[value] for value in ("EXECUTED", "executed", "CANCELED", None, "")] == [
+        True, True, False, False, False]
+    assert len(matches) == 2
+    assert matches("EXECUTED") and not matches(["EXECUTED"]) and not matches({}) and not matches(1)
+    assert matches.mask(["executed", None, "CANCELED"]) == [True, False, False]
+    assert matches.mask(["executed", ["executed"], {}]) == [True, False, False]
+    transactions = [{"state": "EXECUTED"}, {"state": ["EXECUTED"]}, {"state": "executed"}, {}]
+    assert filter_transactions_by_status(transactions, "executed") == [transactions[0], transactions[2]]
+    rows = [{"operationAmount": {"currency": {"code": code}}} for code in ("RUB", "usd", ["rub"], "rub")]
+    assert rub_mask(rows) == [True, False, False, True]
+
+
+def test_record_encoder_encodes_nested_currency(transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует кодирование статуса, описания и валюты нормализованных записей.
+
+    :return: None
+    """
+    encoder = RecordEncoder(max_cardinality=1)
+    first, second = (encoder.encode(json.loads(json.dumps(transaction))) for transaction in transactions)
+    assert first["state"] is second["state"] and first["description"] is second["description"]
+    assert encoder.cardinality() == {
+        "state": 1, "description": 1, "currency_name": None, "currency_code": None,
+    }
+    assert first == transactions[0]
+
+
+@pytest.mark.usefixtures("intern_threshold")
+@pytest.mark.parametrize("threshold, shared", [(1024, True), (0, False)])
+def test_loaders_share_repeated_strings(tmp_path: Any, transactions: List[Dict[str, Any]], threshold: int,
+                                        shared: bool) -> None:
+    """
+    Тестирует, что загрузчики возвращают один объект для повторяющихся значений, если кодирование включено.
+
+    :return: None
+    """
+    loaders.set_intern_threshold(threshold)
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions * 2, ensure_ascii=False), encoding="utf-8")
+    loaded = loaders.load_transactions(str(path))
+    assert (loaded[0]["description"] is loaded[2]["description"]) is shared
+    assert (loaded[1]["operationAmount"]["currency"]["code"] is loaded[3]["operationAmount"]["currency"]["code"]) \
+        is shared
+    assert loaded[:2] == loaders.load_transactions(str(path))[2:]
+
+
+@pytest.mark.usefixtures("intern_threshold")
+def test_run_batch_intern_threshold(tmp_path: Any, transactions: List[Dict[str, Any]], capsys: Any) -> None:
+    """
+    Тестирует параметр --intern-threshold пакетного режима.
+
+    :return: None
+    """
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    assert run_batch([str(path), "--intern-threshold", "0", "--format", "json"]) == 0
+    assert len(json.loads(capsys.readouterr().out)) == 2
+    assert loaders._intern_threshold == 0
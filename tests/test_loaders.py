@@ -0,0 +1,178 @@
+import bz2
+import gzip
+import json
+import lzma
+from typing import Any, Dict, List
+
+import openpyxl
+import pytest
+
+from src.amounts import get_amount_minor
+from src.loaders import (available_engines, benchmark_engines, detect_compression, detect_format, iter_transactions,
+                         load_transactions, normalize_record, source_extension)
+from src.utils import load_transactions_from_csv, load_transactions_from_json
+
+COMPRESSORS = {"gz": gzip.compress, "xz": lzma.compress, "bz2": bz2.compress}
+
+CSV_DATA = (
+    "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+    "441945886;EXECUTED;2019-08-26T10:50:58.294041;100000;руб.;RUB;Maestro 1596837868705199;"
+    "Счет 64686473678894779589;Перевод организации\n"
+    "41428829;EXECUTED;2019-07-03T18:35:29.512364;100;USD;USD;MasterCard 7158300734726758;"
+    "Счет 35383033474447895560;Перевод организации\n"
+    ";;;;;;;;\n"
+)
+
+
+@pytest.fixture
+def source_files(tmp_path: Any, transactions: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Фикстура, создающая одни и те же транзакции в форматах JSON, JSON Lines, CSV и XLSX.
+
+    :return: Словарь {формат: путь к файлу}.
+    """
+    json_path = tmp_path / "operations.json"
+    json_path.write_text(json.dumps(transactions + [{}], ensure_ascii=False), encoding="utf-8")
+
+    jsonl_path = tmp_path / "operations.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in transactions) + "\n\n",
+                          encoding="utf-8")
+
+    csv_path = tmp_path / "transactions.csv"
+    csv_path.write_text(CSV_DATA, encoding="utf-8")
+
+    xlsx_path = tmp_path / "transactions.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for line in CSV_DATA.splitlines()[:-1]:
+        sheet.append([int(value) if value.isdigit() else value for value in line.split(";")])
+    workbook.save(xlsx_path)
+
+    return {"json": str(json_path), "jsonl": str(jsonl_path), "csv": str(csv_path), "xlsx": str(xlsx_path)}
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv", "xlsx"])
+def test_load_transactions_same_shape(source_files: Dict[str, str], transactions: List[Dict[str, Any]],
+                                      fmt: str) -> None:
+    """
+    Тестирует, что все форматы загружаются в одинаковые нормализованные записи, а пустые строки пропускаются.
+
+    :param fmt: Формат исходного файла.
+    :return: None
+    """
+    assert load_transactions(source_files[fmt]) == transactions
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx"])
+def test_engines_return_same_records(source_files: Dict[str, str], fmt: str) -> None:
+    """
+    Тестирует, что все доступные движки формата возвращают одинаковые записи.
+
+    :param fmt: Формат исходного файла.
+    :return: None
+    """
+    results = [list(iter_transactions(source_files[fmt], engine=name)) for name in available_engines(fmt)]
+    assert len(results) >= 1
+    assert all(result == results[0] for result in results)
+
+
+def test_detect_format_by_content(tmp_path: Any, source_files: Dict[str, str]) -> None:
+    """
+    Тестирует определение формата по содержимому для файлов без расширения.
+
+    :return: None
+    """
+    for fmt, path in source_files.items():
+        renamed = tmp_path / f"export_{fmt}"
+        renamed.write_bytes(open(path, "rb").read())
+        assert detect_format(str(renamed)) == fmt
+
+
+def test_load_transactions_errors(tmp_path: Any) -> None:
+    """
+    Тестирует, что ошибки чтения не прерывают работу и приводят к пустому списку.
+
+    :return: None
+    """
+    broken = tmp_path / "broken.json"
+    broken.write_text("invalid json", encoding="utf-8")
+    broken_xlsx = tmp_path / "broken.xlsx"
+    broken_xlsx.write_text("not a workbook", encoding="utf-8")
+    assert load_transactions(str(tmp_path / "missing.csv")) == []
+    assert load_transactions(str(broken)) == []
+    assert load_transactions(str(broken_xlsx)) == []
+
+
+@pytest.mark.parametrize("suffix", ["gz", "xz", "bz2"])
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv"])
+def test_load_compressed(tmp_path: Any, source_files: Dict[str, str], fmt: str, suffix: str) -> None:
+    """
+    Тестирует потоковую распаковку: сжатие определяется по сигнатуре, формат — по внутреннему расширению
+    или по распакованному содержимому.
+
+    :param fmt: Формат исходного файла.
+    :param suffix: Расширение сжатия.
+    :return: None
+    """
+    with open(source_files[fmt], "rb") as file:
+        data = COMPRESSORS[suffix](file.read())
+    compressed = tmp_path / f"export.{fmt}.{suffix}"
+    compressed.write_bytes(data)
+    unnamed = tmp_path / f"export_{fmt}"
+    unnamed.write_bytes(data)
+    assert detect_compression(str(compressed)) == {"gz": "gzip"}.get(suffix, suffix)
+    assert detect_compression(source_files[fmt]) is None
+    assert source_extension(str(compressed)) == f".{fmt}"
+    assert detect_format(str(unnamed)) == fmt
+    expected = load_transactions(source_files[fmt])
+    assert load_transactions(str(compressed)) == expected
+    assert load_transactions(str(unnamed)) == expected
+
+
+def test_compressed_readers_and_errors(tmp_path: Any, source_files: Dict[str, str]) -> None:
+    """
+    Тестирует сжатые файлы в функциях load_transactions_from_* и ошибки: обрезанный архив и сжатый XLSX.
+
+    :return: None
+    """
+    csv_gz = tmp_path / "transactions.csv.gz"
+    csv_gz.write_bytes(gzip.compress(open(source_files["csv"], "rb").read()))
+    json_gz = tmp_path / "operations.json.gz"
+    json_gz.write_bytes(gzip.compress(open(source_files["json"], "rb").read()))
+    assert load_transactions_from_csv(str(csv_gz)) == load_transactions(source_files["csv"])
+    assert load_transactions_from_json(str(json_gz)) == load_transactions(source_files["json"])
+
+    truncated = tmp_path / "truncated.csv.xz"
+    truncated.write_bytes(lzma.compress(open(source_files["csv"], "rb").read())[:-20])
+    xlsx_gz = tmp_path / "transactions.xlsx.gz"
+    xlsx_gz.write_bytes(gzip.compress(open(source_files["xlsx"], "rb").read()))
+    assert load_transactions(str(truncated)) == []
+    assert load_transactions(str(xlsx_gz)) == []
+
+
+def test_normalize_record_flat_row() -> None:
+    """
+    Тестирует перенос суммы и валюты плоской записи во вложенный словарь operationAmount.
+
+    :return: None
+    """
+    record = normalize_record({"id": "1", "state": "EXECUTED", "amount": 16210.0, "currency_code": "PEN", "to": ""})
+    assert record == {
+        "id": 1,
+        "state": "EXECUTED",
+        "operationAmount": {"amount": "16210", "currency": {"name": "Не указана", "code": "PEN"}},
+    }
+    assert get_amount_minor(record) == 1621000
+    assert get_amount_minor(normalize_record({"id": 2, "amount": "Не указана"}) or {}) is None
+    assert normalize_record({"id": None, "state": ""}) is None
+
+
+def test_benchmark_engines(source_files: Dict[str, str]) -> None:
+    """
+    Тестирует, что сравнение движков возвращает время для каждого доступного движка.
+
+    :return: None
+    """
+    timings = benchmark_engines(source_files["csv"], repeat=1)
+    assert set(timings) == set(available_engines("csv"))
+    assert list(timings.values()) == sorted(timings.values())
@@ -0,0 +1,210 @@
+import json
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import pytest
+
+from src.external_api import get_exchange_rate
+from src.main import EXIT_LOAD_ERROR, EXIT_OK, run_batch
+
+
+@pytest.fixture
+def json_file(tmp_path: Any, transactions: List[Dict[str, Any]]) -> str:
+    """
+    Фикстура, создающая JSON-файл с тестовыми транзакциями.
+
+    :return: Путь к созданному файлу.
+    """
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def csv_file(tmp_path: Any) -> str:
+    """
+    Фикстура, создающая CSV-файл в формате выгрузки банка.
+
+    :return: Путь к созданному файлу.
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(
+        "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+        "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;"
+        "Перевод организации\n"
+        "3598919;CANCELED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;Discover 0720428384694643;"
+        "Перевод с карты на карту\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_run_batch_json_output(json_file: str, csv_file: str, capsys: Any) -> None:
+    """
+    Тестирует пакетную обработку нескольких файлов с фильтрацией и сортировкой.
+
+    :return: None
+    """
+    exit_code = run_batch([json_file, csv_file, "--status", "EXECUTED", "--sort", "asc", "--format", "json"])
+    captured = capsys.readouterr()
+    result = json.loads(captured.out)
+    assert exit_code == EXIT_OK
+    assert [record["id"] for record in result] == [41428829, 441945886, 650703]
+    assert all(set(record["operationAmount"]) == {"amount", "currency"} for record in result)
+    assert "Загружено строк: 4, выведено: 3" in captured.err
+
+
+def test_run_batch_sort_with_bad_date(tmp_path: Any, json_file: str, transactions: List[Dict[str, Any]],
+                                      capsys: Any) -> None:
+    """
+    Тестирует сортировку в пакетном режиме, когда у одной операции некорректная дата: она выводится последней.
+
+    :return: None
+    """
+    broken = tmp_path / "broken.json"
+    broken.write_text(json.dumps([dict(transactions[0], id=1, date="not-a-date")]), encoding="utf-8")
+    for order, expected in (("asc", [41428829, 441945886, 1]), ("desc", [441945886, 41428829, 1])):
+        assert run_batch([str(broken), json_file, "--sort", order, "--format", "json"]) == EXIT_OK
+        assert [record["id"] for record in json.loads(capsys.readouterr().out)] == expected
+
+
+def test_run_batch_rub_only_and_search(json_file: str, csv_file: str, capsys: Any) -> None:
+    """
+    Тестирует фильтрацию рублевых операций и поиск по описанию в пакетном режиме.
+
+    :return: None
+    """
+    exit_code = run_batch([json_file, csv_file, "--rub-only", "--search", "карты", "--format", "csv"])
+    lines = capsys.readouterr().out.splitlines()
+    assert exit_code == EXIT_OK
+    assert lines[0].startswith("id;state;date;amount")
+    assert len(lines) == 2
+    assert lines[1].startswith("3598919;CANCELED")
+
+
+def test_run_batch_multi_term_search(json_file: str, csv_file: str, capsys: Any) -> None:
+    """
+    Тестирует поиск по нескольким строкам в пакетном режиме (AND по умолчанию, OR с --search-any).
+
+    :return: None
+    """
+    run_batch([json_file, csv_file, "--search", "перевод", "--search", "карты", "--format", "json"])
+    all_terms = json.loads(capsys.readouterr().out)
+    run_batch([json_file, csv_file, "--search", "организации", "--search", "карты", "--search-any",
+               "--format", "json"])
+    any_term = json.loads(capsys.readouterr().out)
+    assert all_terms and all("карты" in row["description"] for row in all_terms)
+    assert len(any_term) > len(all_terms)
+
+
+def test_run_batch_glob_and_missing_files(tmp_path: Any, json_file: str, capsys: Any) -> None:
+    """
+    Тестирует раскрытие glob-шаблонов и код завершения при ненайденных файлах.
+
+    :return: None
+    """
+    exit_code = run_batch([str(tmp_path / "*.json"), str(tmp_path / "missing_*.csv")])
+    captured = capsys.readouterr()
+    assert exit_code == EXIT_LOAD_ERROR
+    assert "Перевод организации" in captured.out
+    assert "ошибок: 1" in captured.err
+
+
+def test_run_batch_reuses_rates(tmp_path: Any, json_file: str, capsys: Any) -> None:
+    """
+    Тестирует, что курс валюты запрашивается один раз для всех файлов пакета.
+
+    :return: None
+    """
+    copy_path = tmp_path / "operations_copy.json"
+    copy_path.write_text(open(json_file, encoding="utf-8").read(), encoding="utf-8")
+    get_exchange_rate.cache_clear()
+    with patch("src.external_api.convert_currency", return_value=90.0) as mock_convert:
+        exit_code = run_batch([json_file, str(copy_path), "--in-rub", "--format", "json"])
+    result = json.loads(capsys.readouterr().out)
+    assert exit_code == EXIT_OK
+    assert [record["amount_rub"] for record in result] == [100000.0, 9000.0, 100000.0, 9000.0]
+    mock_convert.assert_called_once_with(1, "USD")
+
+
+def test_run_batch_offline_rates(tmp_path: Any, json_file: str, csv_file: str, capsys: Any) -> None:
+    """
+    Тестирует пересчет в рубли по таблице исторических курсов без обращения к API.
+
+    :return: None
+    """
+    rates_path = tmp_path / "rates.csv"
+    rates_path.write_text("date,currency,rate\n2019-07-01,USD,65\n", encoding="utf-8")
+    with patch("src.external_api.convert_currency") as mock_convert:
+        exit_code = run_batch([json_file, csv_file, "--in-rub", "--rates", str(rates_path), "--offline",
+                               "--format", "json"])
+    result = json.loads(capsys.readouterr().out)
+    assert exit_code == EXIT_OK
+    assert [record["amount_rub"] for record in result] == [100000.0, 6500.0, None, 29740.0]
+    mock_convert.assert_not_called()
+
+
+@pytest.mark.parametrize("sort", [[], ["--sort", "asc"]])
+def test_run_batch_output_file(tmp_path: Any, json_file: str, csv_file: str, capsys: Any, sort: List[str]) -> None:
+    """
+    Тестирует запись результата пакетного режима в файл вместо stdout (потоково и с сортировкой).
+
+    :param sort: Дополнительные аргументы сортировки.
+    :return: None
+    """
+    output = tmp_path / "result.jsonl"
+    exit_code = run_batch([json_file, csv_file, "--status", "executed", "--output", str(output)] + sort)
+    captured = capsys.readouterr()
+    ids = [json.loads(line)["id"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert exit_code == EXIT_OK
+    assert captured.out == ""
+    assert "выведено: 3" in captured.err
+    assert ids == ([41428829, 441945886, 650703] if sort else [441945886, 41428829, 650703])
+
+
+@pytest.mark.parametrize("extra", [["--format", "json"], ["--in-rub"]])
+def test_run_batch_output_rejects_stdout_options(tmp_path: Any, json_file: str, extra: List[str]) -> None:
+    """
+    Тестирует, что --output нельзя сочетать с параметрами, которые действуют только на вывод в stdout.
+
+    :param extra: Несовместимый параметр.
+    :return: None
+    """
+    output = tmp_path / "result.jsonl"
+    with pytest.raises(SystemExit):
+        run_batch([json_file, "--output", str(output)] + extra)
+    assert not output.exists()
+
+
+def test_run_batch_output_discarded_on_error(tmp_path: Any, json_file: str) -> None:
+    """
+    Тестирует, что при ошибке во время записи существующий файл не изменяется, а временный удаляется.
+
+    :return: None
+    """
+    output = tmp_path / "result.csv"
+    output.write_text("old", encoding="utf-8")
+    with patch("src.main.apply_filters", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            run_batch([json_file, "--output", str(output)])
+    assert output.read_text(encoding="utf-8") == "old"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["operations.json", "result.csv"]
+
+
+@pytest.mark.parametrize("filters", [["--status", "executed"], ["--rub-only"], ["--search", "КАРТЫ"],
+                                     ["--search", "перевод", "--search", "организации"]])
+def test_run_batch_scan_engine(json_file: str, csv_file: str, capsys: Any, filters: List[str]) -> None:
+    """
+    Тестирует, что просмотр CSV через mmap (--engine scan) дает тот же результат, что и полная загрузка.
+
+    :param filters: Аргументы фильтрации.
+    :return: None
+    """
+    outputs = []
+    for engine in ("load", "scan"):
+        assert run_batch([json_file, csv_file, "--engine", engine, "--format", "json"] + filters) == EXIT_OK
+        outputs.append(json.loads(capsys.readouterr().out))
+    assert outputs[0] == outputs[1]
+    assert outputs[0]
+    with pytest.raises(SystemExit):
+        run_batch([csv_file, "--engine", "scan", "--use-index"])
@@ -0,0 +1,83 @@
+from typing import Any
+
+from src.main import run_batch
+from src.memprofile import MemoryReport, check_budget, profile, profile_file, run
+from src.synthetic import write_dataset
+
+
+def test_profile_reports_peak_and_rows() -> None:
+    """
+    Тестирует замер пиковой памяти, байт на строку и мест выделения памяти.
+
+    :return: None
+    """
+    result, report = profile(lambda: [str(number) * 10 for number in range(10000)], "strings", top=3)
+    assert len(result) == 10000
+    assert report.label == "strings"
+    assert report.rows == 10000
+    assert report.peak_bytes >= report.retained_bytes > 10000 * 50
+    assert report.bytes_per_row is not None and report.bytes_per_row > 50
+    assert 0 < len(report.top) <= 3
+    assert report.top[0][0].startswith(__file__)
+
+
+def test_profile_without_rows() -> None:
+    """
+    Тестирует отчет для функции, результат которой не имеет длины.
+
+    :return: None
+    """
+    result, report = profile(lambda: 42, "answer", top=0, sample_rss=False)
+    assert result == 42
+    assert report.rows is None and report.bytes_per_row is None
+    assert report.top == [] and report.rss_peak_bytes is None
+    assert check_budget(report, 0)
+    assert report.as_dict()["label"] == "answer"
+
+
+def test_check_budget() -> None:
+    """
+    Тестирует проверку бюджета памяти на строку.
+
+    :return: None
+    """
+    report = MemoryReport("load", 10, 1000, 500, None, [])
+    assert check_budget(report, 100)
+    assert not check_budget(report, 99)
+
+
+def test_profile_file_all_engines(tmp_path: Any) -> None:
+    """
+    Тестирует замер всех движков загрузки и шагов обработки для файла.
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / "transactions.csv"), "csv", 100)
+    labels = [report.label for report in profile_file(path, top=1)]
+    assert "load[csv/stdlib]" in labels
+    assert "utils.read_transactions_csv" in labels
+    assert labels[-2:] == ["processing.filter_by_state", "processing.sort_by_date"]
+
+
+def test_run_budget_exit_code(tmp_path: Any, capsys: Any) -> None:
+    """
+    Тестирует код завершения командной строки при превышении бюджета.
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / "transactions.json"), "json", 50)
+    assert run([path, "--top", "1"]) == 0
+    assert "load[json/stdlib]" in capsys.readouterr().out
+    assert run([path, "--budget", "1"]) == 1
+    assert "BUDGET EXCEEDED" in capsys.readouterr().err
+
+
+def test_run_batch_memprofile(tmp_path: Any, capsys: Any) -> None:
+    """
+    Тестирует вывод отчета о памяти в пакетном режиме.
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / "transactions.csv"), "csv", 20)
+    assert run_batch([path, "--memprofile", "--format", "json"]) == 0
+    assert f"load {path}: строк 20" in capsys.readouterr().err
@@ -0,0 +1,113 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from src.loaders import load_transactions
+from src.pipeline import IngestionPipeline, collect_sources, ingest, read_manifest, run
+from src.synthetic import write_dataset
+
+
+@pytest.fixture
+def exports(tmp_path: Any) -> Dict[str, str]:
+    """
+    Фикстура с каталогом выгрузок в разных форматах и одним поврежденным файлом.
+
+    :return: Словарь {имя: путь}.
+    """
+    (tmp_path / "branch").mkdir()
+    files = {
+        "json": write_dataset(str(tmp_path / "a.json"), "json", 30, seed=1),
+        "csv": write_dataset(str(tmp_path / "branch" / "b.csv"), "csv", 2500, seed=2),
+        "xlsx": write_dataset(str(tmp_path / "branch" / "c.xlsx"), "xlsx", 20, seed=3),
+        "broken": str(tmp_path / "d.xlsx"),
+    }
+    (tmp_path / "d.xlsx").write_text("not a workbook", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("пропускается", encoding="utf-8")
+    files["dir"] = str(tmp_path)
+    return files
+
+
+def test_collect_sources_and_manifest(exports: Dict[str, str], tmp_path: Any) -> None:
+    """
+    Тестирует обход каталога и чтение манифеста с относительными путями и комментариями.
+
+    :return: None
+    """
+    assert collect_sources([exports["dir"]]) == [exports["json"], exports["broken"], exports["csv"], exports["xlsx"]]
+    manifest = tmp_path / "nightly.txt"
+    manifest.write_text("# ночная выгрузка\na.json\n\nbranch/b.csv\n", encoding="utf-8")
+    assert read_manifest(str(manifest)) == [exports["json"], exports["csv"]]
+    assert collect_sources([exports["json"]], str(manifest)) == [exports["json"], exports["csv"]]
+    (tmp_path / "branch" / "e.csv.gz").write_bytes(b"")
+    assert str(tmp_path / "branch" / "e.csv.gz") in collect_sources([exports["dir"]])
+
+
+def test_ingest_loads_all_formats(exports: Dict[str, str]) -> None:
+    """
+    Тестирует параллельную загрузку: записи совпадают с последовательной загрузкой, ошибка попадает в отчет.
+
+    :return: None
+    """
+    transactions, reports = ingest([exports["dir"]], threads=2, processes=1)
+    expected = [record for key in ("json", "csv", "xlsx") for record in load_transactions(exports[key])]
+    assert len(transactions) == len(expected)
+    assert sorted(t["id"] for t in transactions) == sorted(t["id"] for t in expected)
+
+    by_path = {report.path: report for report in reports}
+    assert by_path[exports["csv"]].rows == 2500 and by_path[exports["csv"]].ok
+    assert by_path[exports["xlsx"]].rows == 20 and by_path[exports["xlsx"]].fmt == "xlsx"
+    assert not by_path[exports["broken"]].ok and by_path[exports["broken"]].rows == 0
+    assert all(report.seconds > 0 for report in reports)
+
+
+def test_pipeline_backpressure(exports: Dict[str, str]) -> None:
+    """
+    Тестирует, что очередь ограничена: загрузчики ждут потребителя, а не накапливают все записи.
+
+    :return: None
+    """
+    pipeline = IngestionPipeline([exports["csv"]], queue_size=2, batch_size=100)
+    sizes: List[int] = []
+    for _, batch in pipeline.iter_batches():
+        sizes.append(pipeline._queue.qsize())
+        assert len(batch) <= 100
+    assert max(sizes) <= 2
+    assert pipeline.reports[exports["csv"]].rows == 2500
+
+
+def test_pipeline_stops_when_consumer_stops(exports: Dict[str, str]) -> None:
+    """
+    Тестирует остановку загрузчиков, если потребитель прекратил чтение.
+
+    :return: None
+    """
+    pipeline = IngestionPipeline([exports["csv"], exports["json"]], queue_size=1, batch_size=10)
+    batches = pipeline.iter_batches()
+    next(batches)
+    batches.close()
+    assert pipeline._cancelled.is_set()
+    assert pipeline.reports[exports["csv"]].rows < 2500
+
+
+def test_pipeline_missing_file(tmp_path: Any) -> None:
+    """
+    Тестирует отчет об отсутствующем файле.
+
+    :return: None
+    """
+    transactions, reports = ingest([str(tmp_path / "missing.json")])
+    assert transactions == [] and not reports[0].ok
+
+
+def test_run_cli(exports: Dict[str, str], capsys: Any) -> None:
+    """
+    Тестирует командную строку: записи в stdout, отчеты по файлам и код ошибки.
+
+    :return: None
+    """
+    assert run([exports["json"], exports["xlsx"], "--processes", "0"]) == 0
+    captured = capsys.readouterr()
+    assert len(json.loads(captured.out)) == 50
+    assert f"{exports['xlsx']} [xlsx]: строк 20" in captured.err
+    assert run([exports["broken"]]) == 1
@@ -0,0 +1,168 @@
+import json
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+from src.amounts import MINOR_UNITS, get_amount_minor
+from src.loaders import iter_transactions
+from src.preview import (CountMinSketch, Estimate, HyperLogLog, Reservoir, format_preview, preview_file, preview_seek,
+                         preview_stream, run)
+from src.synthetic import write_dataset
+
+
+def test_estimate_format() -> None:
+    """
+    Тестирует границы и текстовое представление оценки.
+
+    :return: None
+    """
+    estimate = Estimate(100.0, 150.0)
+    assert estimate.low == 0.0
+    assert estimate.high == 250.0
+    assert estimate.format() == "≈ 100 ± 150"
+    assert Estimate(2.0).format(1) == "2.0"
+
+
+def test_hyperloglog_count() -> None:
+    """
+    Тестирует оценку количества различных значений: повторы не учитываются.
+
+    :return: None
+    """
+    sketch = HyperLogLog()
+    for number in range(1000):
+        sketch.add(f"Счет {number % 300}")
+    assert abs(sketch.count() - 300) < 300 * 0.05
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=20)
+
+
+def test_count_min_sketch_top() -> None:
+    """
+    Тестирует Count-Min: оценка частоты не меньше истинной, самые частые значения находятся.
+
+    :return: None
+    """
+    sketch = CountMinSketch(candidates=4)
+    for number in range(50):
+        sketch.add(f"редкое {number}")
+    sketch.add("частое", 100)
+    sketch.add("второе", 60)
+    assert sketch.total == 210
+    assert sketch.count("частое") >= 100
+    assert sketch.count("редкое 1") >= 1
+    top = sketch.top(2)
+    assert [value for value, _ in top] == ["частое", "второе"]
+    assert top[0][1].error == pytest.approx(0.001 * 210)
+
+
+def test_reservoir_sample() -> None:
+    """
+    Тестирует выборку-резервуар: размер фиксирован, все элементы берутся из потока и покрывают его целиком.
+
+    :return: None
+    """
+    reservoir = Reservoir(100, seed=1)
+    for number in range(10000):
+        reservoir.add(number)
+    assert reservoir.seen == 10000
+    assert len(reservoir.items) == 100
+    assert len(set(reservoir.items)) == 100
+    assert sum(number < 5000 for number in reservoir.items) in range(30, 71)
+    with pytest.raises(ValueError):
+        Reservoir(0)
+
+
+def test_preview_stream_exact(transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует потоковый обзор, когда выборка содержит все строки: оценки точные.
+
+    :param transactions: Фикстура с тестовыми данными.
+    :return: None
+    """
+    preview = preview_stream(transactions, "test.json")
+    assert preview.rows.value == 2 and preview.rows.error == 0
+    count = preview.count("executed", "usd")
+    assert count.value == pytest.approx(1.0) and count.error == pytest.approx(0.0)
+    total = preview.total("RUB")
+    assert total.value == pytest.approx(100000.0) and total.error == pytest.approx(0.0)
+    assert round(preview.distinct_accounts().value) == 4
+    assert preview.top_descriptions(1)[0][0] == "Перевод организации"
+    assert "Операций: 2" in format_preview(preview, "executed", "USD")
+
+
+@pytest.fixture
+def dataset(tmp_path: Any) -> Dict[str, Any]:
+    """
+    Фикстура, создающая синтетическую выгрузку CSV и считающая точные значения по ней.
+
+    :return: Словарь с путем к файлу и точными значениями.
+    """
+    file_path = write_dataset(str(tmp_path / "data.csv"), "csv", 5000, seed=3)
+    rows = list(iter_transactions(file_path))
+    executed = [row for row in rows if row.get("state") == "EXECUTED"]
+    return {
+        "path": file_path,
+        "rows": len(rows),
+        "executed": len(executed),
+        "total": sum(get_amount_minor(row) or 0 for row in executed
+                     if row["operationAmount"]["currency"]["code"] == "RUB") / MINOR_UNITS,
+    }
+
+
+@pytest.mark.parametrize("method", ["stream", "seek"])
+def test_preview_estimates(dataset: Dict[str, Any], method: str) -> None:
+    """
+    Тестирует, что точные значения попадают в границы погрешности (с запасом) в обоих режимах.
+
+    :param dataset: Фикстура с синтетической выгрузкой.
+    :param method: Способ чтения.
+    :return: None
+    """
+    preview = preview_file(dataset["path"], sample_size=1000, method=method, seed=5)
+    assert preview.method == method
+    assert len(preview.sample) <= 1000
+    for estimate, exact in ((preview.rows, dataset["rows"]), (preview.count("executed"), dataset["executed"]),
+                            (preview.total("RUB", "executed"), dataset["total"])):
+        assert abs(estimate.value - exact) <= 2 * estimate.error + 1e-6
+    if method == "stream":
+        assert preview.distinct_accounts() is not None
+        assert preview.rows.value == dataset["rows"]
+    else:
+        assert preview.distinct_accounts() is None
+
+
+def test_preview_jsonl(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует обзор JSON Lines случайными переходами и потоковым чтением.
+
+    :param tmp_path: Временная папка pytest.
+    :param transactions: Фикстура с тестовыми данными.
+    :return: None
+    """
+    file_path = tmp_path / "data.jsonl"
+    file_path.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in transactions * 50) + "\n",
+                         encoding="utf-8")
+    seek = preview_seek(str(file_path), "jsonl", 200, seed=2)
+    assert abs(seek.rows.value - 100) <= 2 * seek.rows.error + 1e-6
+    assert preview_file(str(file_path), method="stream").rows.value == 100
+    with pytest.raises(ValueError):
+        preview_seek(str(file_path), "json")
+    with pytest.raises(ValueError):
+        preview_file(str(file_path), method="full")
+
+
+def test_run(dataset: Dict[str, Any], capsys: Any) -> None:
+    """
+    Тестирует точку входа python -m src.preview.
+
+    :param dataset: Фикстура с синтетической выгрузкой.
+    :param capsys: Фикстура pytest для перехвата вывода.
+    :return: None
+    """
+    assert run([dataset["path"], "--status", "executed", "--currency", "rub", "--sample", "500"]) == 0
+    output = capsys.readouterr().out
+    assert "Приблизительный обзор" in output
+    assert "Сумма EXECUTED RUB" in output
+    assert run([os.path.join(os.path.dirname(dataset["path"]), "missing.csv")]) == 1
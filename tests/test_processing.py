@@ -1,6 +1,7 @@
 import pytest
 
-from src.processing import filter_by_state, sort_by_date
+from src.date_index import DateIndex
+from src.processing import filter_by_date_range, filter_by_state, sort_by_date
 
 
 @pytest.mark.parametrize("records, state, expected", [
@@ -43,3 +44,9 @@ def test_test_sort_by_date_descending(records_descending):
         {'id': 594226727, 'state': 'CANCELED', 'date': '2018-09-12T21:27:25.241689'},
         {'id': 615064591, 'state': 'CANCELED', 'date': '2018-10-14T08:21:33.419441'}
     ], False) == records_descending
+
+
+def test_filter_by_date_range(records_ascending):
+    records = records_ascending[::-1]
+    assert list(filter_by_date_range(records, '2018-09-01', '2019-01-01')) == records_ascending[1:3]
+    assert list(filter_by_date_range(DateIndex(records), '2018-09-01', state='executed')) == records_ascending[3:]
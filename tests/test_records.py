@@ -0,0 +1,164 @@
+import json
+import pickle
+from typing import Any, Dict, List
+
+import pytest
+
+from src.aggregations import group_by
+from src.amounts import total_amount
+from src.loaders import load_transactions, normalize_record
+from src.main import apply_filters, format_transaction, write_output
+from src.processing import filter_by_state, is_rub_transaction, sort_by_date
+from src.records import Transaction, as_dict, as_export_dict, date_sort_key
+from src.utils import count_transactions_by_category, search_transactions
+
+
+@pytest.fixture
+def records(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Фикстура с нормализованными транзакциями (как после загрузчика).
+
+    :return: Список словарей.
+    """
+    return [normalize_record(json.loads(json.dumps(transaction))) for transaction in transactions]
+
+
+def test_transaction_reads_like_dict(records: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует интерфейс словаря: вложенные operationAmount и currency, get, in, равенство со словарем.
+
+    :return: None
+    """
+    record = dict(records[0])
+    del record["from"]
+    transaction = Transaction.from_record(record)
+    assert transaction == record
+    assert transaction["operationAmount"]["currency"]["code"] == "RUB"
+    assert transaction.amount_minor == 10000000 and "amount_minor" not in transaction["operationAmount"]
+    assert transaction.to_dict() == record
+    assert transaction.get("operationAmount", {}).get("currency", {}).get("name") == "руб."
+    assert "from" not in transaction and transaction.get("from", "Не указано") == "Не указано"
+    assert list(transaction) == ["id", "state", "date", "operationAmount", "description", "to"]
+    with pytest.raises(KeyError):
+        transaction["from"]
+
+
+def test_transaction_to_dict_round_trip(records: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует преобразование в обычный словарь и сериализацию в JSON и pickle.
+
+    :return: None
+    """
+    for record in records:
+        transaction = Transaction.from_record(record)
+        assert as_dict(transaction) == record
+        assert json.loads(json.dumps(as_dict(transaction))) == record
+        assert pickle.loads(pickle.dumps(transaction)) == record
+    assert as_dict(records[0]) == records[0]
+
+
+def test_transaction_has_no_instance_dict(records: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что запись хранится в __slots__, а повторяющиеся строки интернированы.
+
+    :return: None
+    """
+    first = Transaction.from_record(records[0])
+    second = Transaction.from_record(json.loads(json.dumps(records[0])))
+    assert not hasattr(first, "__dict__")
+    assert first.state is second.state and first.description is second.description
+
+
+def test_transaction_extra_fields_and_fallback() -> None:
+    """
+    Тестирует дополнительные поля и возврат словаря для нестандартной структуры operationAmount.
+
+    :return: None
+    """
+    record = normalize_record({"id": "1", "amount": "5", "category": "Такси"})
+    transaction = Transaction.from_record(record)
+    assert transaction["category"] == "Такси" and transaction == record
+    odd = {"id": 2, "operationAmount": {"amount": "1", "rate": 2}}
+    assert Transaction.from_record(odd) is odd
+
+
+def test_transaction_date_ts() -> None:
+    """
+    Тестирует дату в виде UNIX-времени для дат с суффиксом Z и без часового пояса.
+
+    :return: None
+    """
+    assert Transaction(date="2023-09-05T11:30:32Z").date_ts == Transaction(date="2023-09-05T11:30:32").date_ts
+    assert Transaction().date_ts is None
+
+
+def test_as_export_dict_drops_amount_minor(records: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует вывод в формате выгрузки банка: amount_minor не попадает в вывод, исходная запись не меняется.
+
+    :param records: Фикстура с записями.
+    :return: None
+    """
+    for record in records + [Transaction.from_record(record) for record in records]:
+        exported = as_export_dict(record)
+        assert exported["operationAmount"] == {"amount": record["operationAmount"]["amount"],
+                                               "currency": dict(record["operationAmount"]["currency"])}
+    record = dict(records[0], operationAmount={**records[0]["operationAmount"], "amount_minor": 10000000})
+    assert "amount_minor" not in as_export_dict(record)["operationAmount"]
+    assert record["operationAmount"]["amount_minor"] == 10000000
+
+
+def test_date_sort_key_tolerates_bad_dates() -> None:
+    """
+    Тестирует ключ сортировки по дате: некорректные даты идут последними в обоих направлениях.
+
+    :return: None
+    """
+    rows = [{"id": 1, "date": "not-a-date"}, {"id": 2, "date": "2020-01-01T00:00:00Z"}, {"id": 3},
+            {"id": 4, "date": "2019-01-01T03:00:00.000001"}]
+    assert [row["id"] for row in sorted(rows, key=date_sort_key)] == [3, 4, 2, 1]
+    assert [row["id"] for row in sorted(rows, key=lambda row: date_sort_key(row, descending=True))] == [2, 4, 3, 1]
+
+
+def test_processing_functions_accept_transactions(records: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что функции обработки дают одинаковый результат для словарей и компактных записей.
+
+    :return: None
+    """
+    compact = [Transaction.from_record(record) for record in records]
+    assert filter_by_state(compact) == filter_by_state(records)
+    assert sort_by_date(compact, False) == sort_by_date(records, False)
+    assert search_transactions(compact, "счета") == search_transactions(records, "счета")
+    assert count_transactions_by_category(compact, ["Перевод"]) == count_transactions_by_category(records, ["Перевод"])
+    assert group_by(compact, ["currency"]) == group_by(records, ["currency"])
+    assert total_amount(compact) == total_amount(records)
+    assert [is_rub_transaction(t) for t in compact] == [True, False]
+    assert format_transaction(compact[1]) == format_transaction(records[1])
+    assert apply_filters(compact, "executed", True) == apply_filters(records, "executed", True)
+
+
+@pytest.mark.parametrize("output_format", ["json", "csv", "text"])
+def test_write_output_compact(records: List[Dict[str, Any]], output_format: str, capsys: Any) -> None:
+    """
+    Тестирует вывод компактных записей во всех форматах.
+
+    :return: None
+    """
+    write_output(records, output_format)
+    expected = capsys.readouterr().out
+    write_output([Transaction.from_record(record) for record in records], output_format)
+    assert capsys.readouterr().out == expected
+
+
+def test_load_transactions_compact(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует загрузку сразу в компактные записи.
+
+    :return: None
+    """
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions + [{}], ensure_ascii=False), encoding="utf-8")
+    loaded = load_transactions(str(path), compact=True)
+    assert all(isinstance(transaction, Transaction) for transaction in loaded)
+    assert loaded == load_transactions(str(path))
@@ -0,0 +1,105 @@
+from typing import Any
+
+import pytest
+
+from src.loaders import load_transactions
+from src.scan import CsvScanner, count_csv, scan_csv
+
+CSV_DATA = (
+    "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+    "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;"
+    "Перевод организации\n"
+    "3598919;EXECUTED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;Discover 0720428384694643;"
+    "Перевод с карты на карту\n"
+    "593027;CANCELED;2023-07-22T05:02:01Z;30368;Ruble;RUB;Visa 1959232722494097;Visa 6804119550473710;"
+    "Перевод с карты на карту\n"
+    "366176;EXECUTED;2020-08-02T09:35:18Z;29482;Ruble;RUB;;Счет 90417871337969064865;\"Открытие вклада; EXECUTED\"\n"
+    ";;;;;;;;\n"
+    "5380041;CANCELED;2021-02-01T11:54:58Z;23789;Peso;UYU;;Счет 23294994494356835683;Открытие вклада"
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path: Any) -> str:
+    """
+    Фикстура, создающая CSV-файл в формате выгрузки банка.
+
+    :return: Путь к файлу.
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(CSV_DATA, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("status, currency, contains, expected_ids", [
+    ("executed", None, None, [650703, 3598919, 366176]),
+    (None, "rub", None, [3598919, 593027, 366176]),
+    ("EXECUTED", "RUB", "карты", [3598919]),
+    (None, None, "вклада", [366176, 5380041]),
+    ("canceled", "USD", None, []),
+])
+def test_scan_csv(csv_path: str, status: Any, currency: Any, contains: Any, expected_ids: list) -> None:
+    """
+    Тестирует фильтрацию по статусу, валюте и подстроке описания на байтах файла.
+
+    :return: None
+    """
+    result = scan_csv(csv_path, status, currency, contains)
+    assert [transaction["id"] for transaction in result] == expected_ids
+    assert count_csv(csv_path, status, currency, contains) == len(expected_ids)
+
+
+def test_scan_csv_same_records_as_loader(csv_path: str) -> None:
+    """
+    Тестирует, что найденные строки декодируются в те же записи, что возвращает загрузчик.
+
+    :return: None
+    """
+    assert scan_csv(csv_path) == load_transactions(csv_path)
+
+
+def test_scan_csv_ignore_case(csv_path: str) -> None:
+    """
+    Тестирует поиск подстроки без учета регистра.
+
+    :return: None
+    """
+    assert count_csv(csv_path, contains="ПЕРЕВОД") == 0
+    assert count_csv(csv_path, contains="ПЕРЕВОД", ignore_case=True) == 3
+
+
+def test_scan_csv_empty_and_missing_column(tmp_path: Any) -> None:
+    """
+    Тестирует пустой файл и фильтр по отсутствующей колонке.
+
+    :return: None
+    """
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+    assert scan_csv(str(empty)) == []
+
+    no_state = tmp_path / "no_state.csv"
+    no_state.write_text("id,description\n1,Перевод организации\n", encoding="utf-8")
+    with CsvScanner(str(no_state)) as scanner:
+        assert scanner.count(contains="Перевод") == 1
+        with pytest.raises(ValueError):
+            scanner.count(status="EXECUTED")
+
+
+def test_scan_csv_mixed_case_values(tmp_path: Any) -> None:
+    """
+    Тестирует, что статус и валюта в любом регистре находятся так же, как при полной загрузке.
+
+    :return: None
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(
+        "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+        "1;executed;2023-09-05T11:30:32Z;100;Ruble;rub;;Счет 1;Перевод\n"
+        "2;EXECUTED;2023-09-06T11:30:32Z;200;Ruble;RUB;;Счет 2;Перевод\n"
+        "3;Executed;2023-09-07T11:30:32Z;300;Ruble;Rub;;Счет 3;Перевод\n",
+        encoding="utf-8",
+    )
+    for status, currency in (("executed", None), ("EXECUTED", "rub"), (None, "RUB")):
+        assert [row["id"] for row in scan_csv(str(path), status, currency)] == [1, 2, 3]
+        assert count_csv(str(path), status, currency) == 3
@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import threading
+from typing import Any, Dict, Iterator, List
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pytest
+
+from src.service import DatasetStore, handle_query, make_server
+
+CSV_HEADER = "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+CSV_ROW = "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;" \
+          "Перевод с карты на карту\n"
+CSV_APPENDED = "3598919;CANCELED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;" \
+               "Discover 0720428384694643;Перевод с карты на карту\n"
+
+
+@pytest.fixture
+def store(tmp_path: Any, transactions: List[Dict[str, Any]]) -> DatasetStore:
+    """
+    Фикстура, создающая набор данных из каталога с JSON- и CSV-файлом.
+
+    :return: Набор данных службы.
+    """
+    (tmp_path / "operations.json").write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "transactions.csv").write_text(CSV_HEADER + CSV_ROW, encoding="utf-8")
+    return DatasetStore([str(tmp_path)], check_interval=3600)
+
+
+@pytest.fixture
+def server_url(store: DatasetStore) -> Iterator[str]:
+    """
+    Фикстура, запускающая HTTP-сервер службы на свободном порту.
+
+    :return: Базовый адрес сервера.
+    """
+    server = make_server(store, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_snapshot_select(store: DatasetStore) -> None:
+    """
+    Тестирует фильтры, поиск и сортировку по снимку набора данных.
+
+    :return: None
+    """
+    snapshot = store.snapshot
+    assert len(snapshot) == 3
+    assert [row["id"] for row in snapshot.select(sort="asc")] == [41428829, 441945886, 650703]
+    assert [row["id"] for row in snapshot.select(sort="desc", rub_only=True)] == [441945886]
+    assert [row["id"] for row in snapshot.select(status="Executed", search=["КАРТЫ"])] == [650703]
+    assert [row["id"] for row in snapshot.select(search=["организации", "карты"], search_mode="any")] == \
+        [441945886, 41428829, 650703]
+    assert snapshot.select(status="pending") == []
+
+
+def test_http_queries(server_url: str) -> None:
+    """
+    Тестирует запросы к HTTP-серверу: состояние, операции с пагинацией, итоги по группам и ошибки.
+
+    :return: None
+    """
+    health = json.load(urlopen(f"{server_url}/health"))
+    assert health["files"] == 2 and health["rows"] == 3
+    page = json.load(urlopen(f"{server_url}/transactions?sort=desc&limit=1&offset=1&search={quote('перевод')}"))
+    assert page["total"] == 3
+    assert [row["id"] for row in page["transactions"]] == [441945886]
+    assert "amount_minor" not in page["transactions"][0]["operationAmount"]
+    groups = json.load(urlopen(f"{server_url}/aggregate?group_by=currency&status=executed"))["groups"]
+    assert {row["currency"]: row["count"] for row in groups} == {"PEN": 1, "RUB": 1, "USD": 1}
+    for path, code in (("/transactions?sort=up", 400), ("/aggregate?group_by=color", 400), ("/missing", 404)):
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{server_url}{path}")
+        assert error.value.code == code
+
+
+def test_reload_changed_files(tmp_path: Any, store: DatasetStore) -> None:
+    """
+    Тестирует перезагрузку по mtime: дописанные строки CSV добавляются, старый снимок не изменяется,
+    удаленные файлы исключаются.
+
+    :return: None
+    """
+    old = store.snapshot
+    assert store.refresh() is False
+    csv_path = tmp_path / "transactions.csv"
+    with open(csv_path, "a", encoding="utf-8") as file:
+        file.write(CSV_APPENDED)
+    assert store.refresh() is True
+    assert len(store.snapshot) == 4
+    assert store.snapshot.version == old.version + 1
+    assert len(old) == 3 and len(old.select()) == 3
+    os.remove(tmp_path / "operations.json")
+    store.refresh()
+    assert [row["id"] for row in store.snapshot.select()] == [650703, 3598919]
+
+
+def test_unix_socket_server(tmp_path: Any, store: DatasetStore) -> None:
+    """
+    Тестирует ответ службы через Unix-сокет.
+
+    :return: None
+    """
+    socket_path = str(tmp_path / "service.sock")
+    server = make_server(store, socket_path=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+            response = b""
+            while chunk := client.recv(65536):
+                response += chunk
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.startswith(b"HTTP/1.0 200")
+    assert json.loads(response.split(b"\r\n\r\n", 1)[1])["rows"] == 3
+
+
+def test_handle_query_checks_files_on_interval(tmp_path: Any, store: DatasetStore) -> None:
+    """
+    Тестирует, что запросы сами проверяют изменения файлов после check_interval.
+
+    :return: None
+    """
+    with open(tmp_path / "transactions.csv", "a", encoding="utf-8") as file:
+        file.write(CSV_APPENDED)
+    assert handle_query(store, "/health", "")[1]["rows"] == 3
+    store.check_interval = 0
+    assert handle_query(store, "/health", "")[1]["rows"] == 4
+
+
+def test_page_endpoint(store: DatasetStore) -> None:
+    """
+    Тестирует постраничную выдачу по курсору: страницы продолжаются с места курсора и покрывают всю выборку.
+
+    :return: None
+    """
+    status, first = handle_query(store, "/page", "page_size=2&sort=desc")
+    assert status == 200
+    assert [row["id"] for row in first["transactions"]] == [650703, 441945886]
+    status, second = handle_query(store, "/page", f"page_size=2&sort=desc&cursor={first['next_cursor']}")
+    assert [row["id"] for row in second["transactions"]] == [41428829]
+    assert second["next_cursor"] is None
+    assert handle_query(store, "/page", f"page_size=2&status=executed&cursor={first['next_cursor']}")[0] == 400
+
+
+def test_account_endpoint(store: DatasetStore) -> None:
+    """
+    Тестирует выписку по счету: операции обоих направлений, маскированный номер и оборот.
+
+    :return: None
+    """
+    status, body = handle_query(store, "/account", "number=58803664561298323391")
+    assert status == 200
+    assert body["account"] == "Счет **3391"
+    assert [row["id"] for row in body["transactions"]] == [650703]
+    assert body["balance"] == {"PEN": "-16210.00"}
+    assert handle_query(store, "/account", "number=39745660563456619397&direction=out")[1]["total"] == 0
+    assert handle_query(store, "/account", "number=1")[0] == 404
+    assert handle_query(store, "/account", "number=58803664561298323391&direction=sideways")[0] == 400
+
+
+def test_store_tolerates_bad_dates(tmp_path: Any, transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует запуск службы, когда у операции некорректная дата: операция идет последней в порядке дат.
+
+    :return: None
+    """
+    rows = [dict(transactions[0], id=1, date="not-a-date")] + transactions
+    (tmp_path / "operations.json").write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+    store = DatasetStore([str(tmp_path)], check_interval=3600)
+    status, body = handle_query(store, "/transactions", "sort=asc")
+    assert status == 200
+    assert [row["id"] for row in body["transactions"]] == [41428829, 441945886, 1]
+
+
+def test_refresh_error_keeps_snapshot(tmp_path: Any, store: DatasetStore, monkeypatch: Any) -> None:
+    """
+    Тестирует, что ошибка при построении снимка оставляет предыдущий снимок, а непредвиденная ошибка
+    запроса возвращается как ответ 500.
+
+    :return: None
+    """
+    old = store.snapshot
+    with open(tmp_path / "transactions.csv", "a", encoding="utf-8") as file:
+        file.write(CSV_APPENDED)
+
+    def fail(*args: Any) -> None:
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr("src.service.Snapshot.__init__", fail)
+    assert store.refresh() is False
+    assert store.snapshot is old
+    monkeypatch.undo()
+    assert store.refresh() is True
+    assert len(store.snapshot) == 4
+    monkeypatch.setattr(store, "current", fail)
+    assert handle_query(store, "/health", "") == (500, {"error": "Internal error"})
@@ -0,0 +1,113 @@
+import copy
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from src import processing, utils
+from src.storage import COLUMNS, TransactionStore, from_row, run, to_row
+
+
+@pytest.fixture
+def store(transactions: List[Dict[str, Any]]) -> Iterator[TransactionStore]:
+    """
+    Фикстура, создающая хранилище в памяти с тестовыми транзакциями и двумя дополнительными операциями.
+
+    :return: Хранилище операций.
+    """
+    extra = [
+        {"id": 650703, "state": "CANCELED", "date": "2023-09-05T11:30:32Z",
+         "operationAmount": {"amount": "16210", "currency": {"name": "Sol", "code": "PEN"}},
+         "description": "Перевод с карты на карту", "to": "Счет 39745660563456619397"},
+        {"id": "A-1", "state": "executed", "date": "2018-01-01T00:00:00",
+         "operationAmount": {"amount": "5", "currency": {"name": "руб.", "code": "rub"}},
+         "description": "Открытие вклада", "to": "Счет 1", "channel": "web"},
+    ]
+    with TransactionStore() as transaction_store:
+        transaction_store.import_transactions(copy.deepcopy(transactions) + extra, batch_size=2)
+        yield transaction_store
+
+
+def test_row_round_trip(transactions: List[Dict[str, Any]]) -> None:
+    """
+    Тестирует, что операция сохраняется в строку таблицы и восстанавливается без изменений.
+
+    :return: None
+    """
+    record = copy.deepcopy(transactions[0])
+    record["channel"] = "web"
+    row = to_row(record)
+    assert row[COLUMNS.index("amount_minor")] == 10000000
+    assert from_row(row[:3] + row[4:]) == record
+
+
+def test_import_and_filters(store: TransactionStore) -> None:
+    """
+    Тестирует импорт пачками и фильтры по статусу и валюте.
+
+    :return: None
+    """
+    assert len(store) == 4
+    assert [row["id"] for row in store.filter_by_state("EXECUTED")] == [441945886, 41428829]
+    assert [row["id"] for row in store.query(state="executed")] == [441945886, 41428829, "A-1"]
+    assert [row["id"] for row in store.rub_transactions()] == [441945886, "A-1"]
+    assert store.query(state="executed", rub_only=True, limit=1).__next__()["id"] == 441945886
+    assert [row["channel"] for row in store.query(search="вклада")] == ["web"]
+
+
+def test_sort_and_search(store: TransactionStore) -> None:
+    """
+    Тестирует сортировку по дате (с учетом часового пояса) и поиск по описанию без учета регистра.
+
+    :return: None
+    """
+    assert [row["id"] for row in store.sort_by_date()] == ["A-1", 41428829, 441945886, 650703]
+    assert [row["id"] for row in store.query(sort="desc", limit=2)] == [650703, 441945886]
+    assert [row["id"] for row in store.search_transactions("ОРГАНИЗАЦ")] == [441945886, 41428829]
+    assert [row["id"] for row in store.search_transactions(["перевод", "карты"])] == [650703]
+    assert [row["id"] for row in store.search_transactions(["вклада", "карты"], "any")] == [650703, "A-1"]
+    # Строки короче трех символов ищутся без полнотекстового индекса
+    assert [row["id"] for row in store.search_transactions(["на", "перевод"])] == [650703]
+
+
+def test_queries_use_indexes(store: TransactionStore) -> None:
+    """
+    Тестирует, что фильтры и сортировка выполняются по индексам, а поиск — по индексу FTS5.
+
+    :return: None
+    """
+    assert "INDEX transactions_state" in " ".join(store.explain(state="EXECUTED"))
+    assert "INDEX transactions_currency" in " ".join(store.explain(rub_only=True))
+    assert "INDEX transactions_ts" in " ".join(store.explain(sort="asc"))
+    if store.fts:
+        assert "transactions_fts" in " ".join(store.explain(search="карты"))
+
+
+def test_processing_and_utils_push_down(store: TransactionStore) -> None:
+    """
+    Тестирует, что processing и utils принимают хранилище и выполняют запросы в базе.
+
+    :return: None
+    """
+    assert [row["id"] for row in processing.filter_by_state(store, "CANCELED")] == [650703]
+    assert processing.sort_by_date(store, is_ascending=False)[0]["id"] == 650703
+    assert [row["id"] for row in utils.search_transactions(store, "карты")] == [650703]
+
+
+def test_cli_import_and_query(tmp_path: Any, capsys: Any) -> None:
+    """
+    Тестирует импорт файла в базу и запрос из командной строки.
+
+    :return: None
+    """
+    csv_path = tmp_path / "transactions.csv"
+    csv_path.write_text(
+        "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+        "3598919;CANCELED;2020-12-06T23:00:58Z;29740;Ruble;RUB;Discover 3172601889670065;Discover 0720428384694643;"
+        "Перевод с карты на карту\n",
+        encoding="utf-8",
+    )
+    database = str(tmp_path / "transactions.db")
+    assert run(["import", database, str(csv_path)]) == 0
+    assert run(["query", database, "--status", "canceled", "--search", "карты", "--format", "csv"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].startswith("3598919;CANCELED")
@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+import pytest
+
+from src.loaders import load_transactions
+from src.synthetic import CSV_FIELDS, generate_transactions, write_dataset
+
+
+def test_generate_transactions_deterministic() -> None:
+    """
+    Тестирует, что одинаковый seed дает одинаковые операции, а разный — разные.
+
+    :return: None
+    """
+    assert list(generate_transactions(50, seed=1)) == list(generate_transactions(50, seed=1))
+    assert list(generate_transactions(50, seed=1)) != list(generate_transactions(50, seed=2))
+
+
+def test_generate_transactions_schema() -> None:
+    """
+    Тестирует, что сгенерированные операции имеют схему JSON-выгрузки.
+
+    :return: None
+    """
+    for transaction in generate_transactions(200):
+        assert set(transaction) <= {"id", "state", "date", "operationAmount", "description", "from", "to"}
+        assert transaction["state"] in ("EXECUTED", "CANCELED", "PENDING")
+        assert float(transaction["operationAmount"]["amount"]) > 0
+        assert set(transaction["operationAmount"]["currency"]) == {"name", "code"}
+        assert transaction["to"].split()[-1].isdigit()
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv", "xlsx"])
+def test_write_dataset_loads_back(tmp_path: Any, fmt: str) -> None:
+    """
+    Тестирует, что файлы всех форматов загружаются обратно в одинаковые операции.
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / f"transactions.{fmt}"), fmt, 30, seed=3)
+    loaded = load_transactions(path)
+    expected = list(generate_transactions(30, seed=3))
+    assert [t["id"] for t in loaded] == [t["id"] for t in expected]
+    assert [t["operationAmount"]["amount"] for t in loaded] == [t["operationAmount"]["amount"] for t in expected]
+    assert [t.get("from") for t in loaded] == [t.get("from") for t in expected]
+
+
+def test_write_csv_header(tmp_path: Any) -> None:
+    """
+    Тестирует заголовок CSV-файла и разделитель ';'.
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / "transactions.csv"), "csv", 1)
+    assert open(path, encoding="utf-8").readline().rstrip("\n") == ";".join(CSV_FIELDS)
+
+
+def test_write_json_is_valid(tmp_path: Any) -> None:
+    """
+    Тестирует, что потоковая запись JSON дает корректный массив (в том числе пустой).
+
+    :return: None
+    """
+    path = write_dataset(str(tmp_path / "empty.json"), "json", 0)
+    assert json.load(open(path, encoding="utf-8")) == []
+
+
+def test_write_dataset_unknown_format(tmp_path: Any) -> None:
+    """
+    Тестирует ошибку для неподдерживаемого формата.
+
+    :return: None
+    """
+    with pytest.raises(ValueError):
+        write_dataset(str(tmp_path / "transactions.txt"), "txt", 1)
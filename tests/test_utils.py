@@ -1,10 +1,13 @@
+import csv
 import json
 from typing import Any, Dict, List
 from unittest.mock import Mock, mock_open, patch
 
 import pandas as pd
+import pytest
 
-from src.utils import read_transactions_csv, read_transactions_excel, read_transactions_json
+from src.utils import (casefold_descriptions, compile_search_pattern, read_transactions_csv, read_transactions_excel,
+                       read_transactions_json, search_transactions)
 
 
 def test_read_transactions_json_valid_file(transactions: List[Dict[str, Any]]) -> None:
@@ -221,20 +224,39 @@ def test_read_transactions_csv_valid_file(mock_logger: Mock) -> None:
     :param mock_logger: Замоканный объект логгера.
     :return: None
     """
-    # Создаем DataFrame
-    data = pd.DataFrame([{"id": 1, "amount": 100}, {"id": 2, "amount": 200}])
+    csv_data = "id;state;amount;currency_code\n1;EXECUTED;100.5;RUB\n2;;200;\n"
 
-    # Используем patch для имитации pandas.read_csv и os.path.exists
-    with patch("pandas.read_csv", return_value=data) as mock_read_csv:
+    # Используем mock_open для имитации открытия файла и чтения корректных данных
+    with patch("builtins.open", mock_open(read_data=csv_data)):
         with patch("os.path.exists", return_value=True):
             # Вызываем тестируемую функцию и проверяем результат
             result = read_transactions_csv("dummy_path.csv")
-            expected_result = data.to_dict(orient="records")
-            assert result == expected_result
-            mock_read_csv.assert_called_once_with("dummy_path.csv")
+            assert result == [
+                {"id": 1, "state": "EXECUTED", "amount": 100.5, "currency_code": "RUB"},
+                {"id": 2, "state": None, "amount": 200.0, "currency_code": None},
+            ]
             mock_logger.info.assert_called_once_with("Successfully read CSV file: dummy_path.csv")
 
 
+def test_read_transactions_csv_matches_pandas(tmp_path: Any) -> None:
+    """
+    Тестирует, что read_transactions_csv возвращает те же записи, что и pandas, не импортируя его.
+
+    :param tmp_path: Временная директория.
+    :return: None
+    """
+    csv_path = tmp_path / "transactions.csv"
+    csv_path.write_text("id,amount,description,extra\n1,100,Перевод организации,7\n2,0.5,Открытие вклада,x\n",
+                        encoding="utf-8")
+    with patch.dict("sys.modules", {"pandas": None}):
+        result = read_transactions_csv(str(csv_path))
+    assert result == pd.read_csv(csv_path).to_dict(orient="records")
+
+    df = read_transactions_csv(str(csv_path), as_dataframe=True)
+    assert isinstance(df, pd.DataFrame)
+    assert df.to_dict(orient="records") == result
+
+
 @patch("src.utils.utils_logger")
 def test_read_transactions_csv_empty_file(mock_logger: Mock) -> None:
     """
@@ -243,14 +265,14 @@ def test_read_transactions_csv_empty_file(mock_logger: Mock) -> None:
     :param mock_logger: Замоканный объект логгера.
     :return: None.
     """
-    # Используем patch для имитации pandas.read_csv и возвращения пустого DataFrame
-    with patch("pandas.read_csv", return_value=pd.DataFrame()):
+    # Используем mock_open для имитации открытия пустого файла
+    with patch("builtins.open", mock_open(read_data="")):
         with patch("os.path.exists") as mock_exists:
             mock_exists.return_value = True
             # Вызываем тестируемую функцию и проверяем результат
             result = read_transactions_csv("dummy_path.csv")
             assert result == []
-            mock_logger.warning.assert_called_once_with("File is empty or not a DataFrame: dummy_path.csv")
+            mock_logger.warning.assert_called_once_with("File is empty: dummy_path.csv")
 
 
 @patch("src.utils.utils_logger")
@@ -261,16 +283,16 @@ def test_read_transactions_csv_parse_error(mock_logger: Mock) -> None:
     :param mock_logger: Замоканный объект логгера.
     :return: None.
     """
-    # Создаем некорректный CSV-формат
-    csv_data = "id,amount\n1,100\n2,"
+    # Создаем некорректный CSV-формат: незакрытая кавычка в строгом режиме
+    csv_data = 'id,amount\n1,100\n2,"200'
 
     # Используем mock_open для имитации открытия файла и чтения некорректных данных
     mocked_open = mock_open(read_data=csv_data)
     with patch("builtins.open", mocked_open):
         with patch("os.path.exists") as mock_exists:
             mock_exists.return_value = True
-            # Используем контекстный менеджер и аргумент side_effect для имитации чтения и генерации исключения
-            with patch("pandas.read_csv", side_effect=pd.errors.ParserError("Mock ParserError")):
+            # Используем контекстный менеджер и аргумент side_effect для имитации ошибки разбора
+            with patch("csv.reader", side_effect=csv.Error("Mock csv.Error")):
                 # Вызываем тестируемую функцию и проверяем результат
                 result = read_transactions_csv("dummy_path.csv")
                 assert result == []
@@ -372,3 +394,58 @@ def test_read_transactions_excel_io_error(mock_logger: Mock) -> None:
             result = read_transactions_excel("dummy_path.xlsx")
             assert result == []
             mock_logger.error.assert_called_once_with("Unexpected error: Mock IOError")
+
+
+SEARCH_DATA = [
+    {"id": 1, "description": "Перевод организации"},
+    {"id": 2, "description": "Перевод с карты на карту"},
+    {"id": 3, "description": "Открытие вклада"},
+    {"id": 4, "description": "ПЕРЕВОД СО СЧЕТА НА СЧЕТ"},
+    {"id": 5},
+]
+
+
+@pytest.mark.parametrize("search, mode, expected", [
+    ("перевод", "all", [1, 2, 4]),
+    ("КАРТЫ", "all", [2]),
+    ("a.b", "all", []),
+    (["на", "перевод"], "all", [2, 4]),
+    (["карту", "организации"], "all", []),
+    (["карту", "организации"], "any", [1, 2]),
+    (["вклада", "счета"], "any", [3, 4]),
+    ([], "all", [1, 2, 3, 4, 5]),
+])
+def test_search_transactions(search: Any, mode: str, expected: List[int]) -> None:
+    """
+    Тестирует поиск без учета регистра по одной и нескольким строкам (AND/OR),
+    в том числе по заранее приведенной casefold-колонке описаний.
+
+    :return: None
+    """
+    assert [t["id"] for t in search_transactions(SEARCH_DATA, search, mode)] == expected
+    folded = casefold_descriptions(SEARCH_DATA)
+    assert [t["id"] for t in search_transactions(SEARCH_DATA, search, mode, folded=folded)] == expected
+
+
+def test_compile_search_pattern_cached() -> None:
+    """
+    Тестирует кэширование скомпилированных выражений и проверку режима поиска.
+
+    :return: None
+    """
+    compile_search_pattern.cache_clear()
+    assert compile_search_pattern(("карты",), "all") is compile_search_pattern(("карты",), "all")
+    assert compile_search_pattern.cache_info().hits == 1
+    search_transactions(SEARCH_DATA, "карты")
+    assert compile_search_pattern.cache_info().hits == 2
+    with pytest.raises(ValueError):
+        compile_search_pattern(("карты",), "none")
+
+
+def test_casefold_descriptions() -> None:
+    """
+    Тестирует колонку описаний, приведенных casefold().
+
+    :return: None
+    """
+    assert casefold_descriptions(SEARCH_DATA[3:]) == ["перевод со счета на счет", ""]
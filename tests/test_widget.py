@@ -1,6 +1,6 @@
 import pytest
 
-from src.widget import get_data, mask_account_card
+from src.widget import get_data, mask_account_card, split_account_card
 
 
 @pytest.mark.parametrize("card_or_account_inform, expected", [
@@ -17,3 +17,9 @@ def test_mask_account_card(card_or_account_inform, expected):
 
 def test_get_data(ISO_8601):
     assert get_data("2018-07-11T02:26:18.671407") == ISO_8601
+
+
+def test_split_account_card():
+    assert split_account_card("Visa Classic 1596837868705199") == ("Visa Classic", "1596837868705199")
+    with pytest.raises(ValueError):
+        split_account_card("1596837868705199")